@@ -2,9 +2,10 @@
 Configurações centralizadas da aplicação MoniPersonal
 """
 import os
-from passlib.context import CryptContext
 from collections import deque
 from datetime import datetime
+
+from app.utils.system import available_cpus
 try:
     from zoneinfo import ZoneInfo  # Python 3.9+
 except ImportError:
@@ -30,8 +31,14 @@ SECURE_COOKIE_CONFIG = {
 # Nome unificado do cookie de sessão
 SESSION_COOKIE_NAME = "session_token"
 
-# Configurar contexto de criptografia com bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hash de senhas (bcrypt). O custo é escolhido pelo tempo de verificação na
+# instância de produção: `make password-cost` mede e sugere BCRYPT_ROUNDS.
+# 11 rounds ≈ 210ms por verificação em 1 vCPU; hashes com outro custo (ou os
+# SHA256 legados) são regravados no próximo login bem-sucedido.
+PASSWORD_HASH = {
+    "rounds": int(os.getenv("BCRYPT_ROUNDS", "11")),
+    "target_ms": float(os.getenv("PASSWORD_HASH_TARGET_MS", "250")),  # alvo da calibração
+}
 
 # ============= CONFIGURAÇÕES DE TIMEZONE =============
 
@@ -48,6 +55,151 @@ RATE_LIMITS = {
     "generous": "60/minute",   # Health checks, ping - monitoramento
 }
 
+# ============= CONFIGURAÇÕES DO POOL DE CONEXÕES =============
+
+# Número de workers do servidor (cada worker tem seu próprio pool).
+# Sem WORKERS/WEB_CONCURRENCY: WORKERS_PER_CPU por CPU da cota do container.
+WORKERS_PER_CPU = max(1, int(os.getenv("WORKERS_PER_CPU", "2")))
+WORKERS = max(1, int(os.getenv("WORKERS", os.getenv("WEB_CONCURRENCY", "0"))) or available_cpus() * WORKERS_PER_CPU)
+
+# Orçamento total de conexões da instância, dividido entre os workers
+DB_CONNECTION_BUDGET = max(1, int(os.getenv("DB_CONNECTION_BUDGET", "16")))
+
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # segundos aguardando conexão livre
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))  # idade máxima da conexão
+DB_POOL_MAX_IDLE = int(os.getenv("DB_POOL_MAX_IDLE", "300"))  # ociosidade máxima antes de reciclar
+DB_POOL_VALIDATE_INTERVAL = int(os.getenv("DB_POOL_VALIDATE_INTERVAL", "60"))  # intervalo do validador
+
+
+# ============= CONTROLE DE ADMISSÃO (LOAD SHEDDING) =============
+
+LOAD_SHEDDING = {
+    "max_in_flight": int(os.getenv("LOAD_SHED_MAX_IN_FLIGHT", "32")),  # requisições simultâneas
+    "max_pool_waiters": int(os.getenv("LOAD_SHED_MAX_POOL_WAITERS", "2")),  # aguardando conexão
+    "retry_after": int(os.getenv("LOAD_SHED_RETRY_AFTER", "5")),  # segundos
+}
+
+# Rotas sempre admitidas, mesmo sob saturação
+CRITICAL_PATHS = ("/health", "/ping", "/readiness", "/login", "/formulario")
+
+# Rotas não críticas (relatórios, estatísticas, exportações) recusadas sob saturação
+SHEDDABLE_PATH_PREFIXES = ("/admin/stats", "/admin/relatorios", "/admin/backup", "/comparar/")
+
+
+# ============= CACHE DOS DASHBOARDS / CIRCUIT BREAKER =============
+
+DASHBOARD_CACHE = {
+    "ttl": float(os.getenv("DASHBOARD_CACHE_TTL", "30")),  # segundos até revalidar
+    "deadline": float(os.getenv("DASHBOARD_QUERY_DEADLINE", "2.0")),  # espera máxima pela consulta
+}
+
+DASHBOARD_BREAKER = {
+    "failure_threshold": int(os.getenv("DASHBOARD_BREAKER_FAILURES", "3")),
+    "reset_timeout": float(os.getenv("DASHBOARD_BREAKER_RESET", "30")),
+}
+
+# Análises de coorte em /admin/relatorios (recalculadas após novas avaliações)
+ANALYTICS_CACHE_TTL = float(os.getenv("ANALYTICS_CACHE_TTL", "600"))
+
+# Índice de prefixos dos alunos ativos (typeahead dos formulários administrativos).
+# Atualizado no commit deste processo; o TTL recarrega alterações feitas por outros workers.
+STUDENT_INDEX = {
+    "ttl": float(os.getenv("STUDENT_INDEX_TTL", "300")),
+    "max_results": int(os.getenv("STUDENT_INDEX_MAX_RESULTS", "10")),
+}
+
+# Linhas de Aluno/Usuario do usuário autenticado (resolvidas uma vez por requisição).
+# Invalidadas no commit deste processo; o TTL curto cobre alterações de outros workers.
+IDENTITY_CACHE = {
+    "ttl": float(os.getenv("IDENTITY_CACHE_TTL", "30")),
+    "max_entries": int(os.getenv("IDENTITY_CACHE_MAX_ENTRIES", "4096")),
+}
+
+# E-mails sem conta ativa (tentativas de login em série não chegam ao banco).
+# Só entram no cache após `min_misses` falhas seguidas dentro do TTL, então quem
+# tentou entrar uma vez e se cadastrou não é barrado pelos outros workers (o
+# cadastro só limpa o cache do worker que o atendeu).
+LOGIN_NEGATIVE_CACHE = {
+    "ttl": float(os.getenv("LOGIN_NEGATIVE_CACHE_TTL", "30")),
+    "min_misses": int(os.getenv("LOGIN_NEGATIVE_CACHE_MIN_MISSES", "3")),
+    "max_entries": int(os.getenv("LOGIN_NEGATIVE_CACHE_MAX_ENTRIES", "10000")),
+}
+
+# Séries dos gráficos de progresso por aluno. Cada leitura confere a versão do
+# aluno (quantidade e maior id das avaliações), então inserções e exclusões
+# feitas em qualquer worker invalidam a entrada; o TTL cobre edições.
+SERIES_CACHE = {
+    "ttl": float(os.getenv("SERIES_CACHE_TTL", "300")),
+    "max_entries": int(os.getenv("SERIES_CACHE_MAX_ENTRIES", "1024")),
+}
+
+
+
+# ============= RELATÓRIOS EM PDF =============
+
+REPORTS = {
+    "workers": int(os.getenv("REPORT_WORKERS", "1")),  # processos de renderização
+    "max_pending": int(os.getenv("REPORT_MAX_PENDING", "8")),  # fila limitada
+    "artifact_dir": os.getenv("REPORT_ARTIFACT_DIR", "/tmp/monipersonal-reports"),
+    "artifact_max_bytes": int(os.getenv("REPORT_ARTIFACT_MAX_MB", "200")) * 1024 * 1024,
+    "wait_seconds": float(os.getenv("REPORT_WAIT_SECONDS", "10")),  # espera antes de responder 202
+    "batch_workers": int(os.getenv("REPORT_BATCH_WORKERS", "0")),  # 0 = todos os núcleos disponíveis
+    # Lote disparado pelo painel roda dentro do worker web: 0 = núcleos disponíveis menos um
+    "batch_server_workers": int(os.getenv("REPORT_BATCH_SERVER_WORKERS", "0")),
+    "batch_dir": os.getenv("REPORT_BATCH_DIR", "/tmp/monipersonal-reports/lotes"),
+}
+
+
+# ============= JOBS AGENDADOS =============
+
+SCHEDULER = {
+    "enabled": os.getenv("SCHEDULER_ENABLED", "true").lower() == "true",
+    "tick": float(os.getenv("SCHEDULER_TICK", "30")),  # intervalo entre ciclos do agendador
+    "lock_ttl": float(os.getenv("SCHEDULER_LOCK_TTL", "120")),  # lease do líder (SQLite)
+}
+
+# Aluno sem avaliação há mais de N dias recebe lembrete de reavaliação
+REAVALIACAO = {
+    "dias": int(os.getenv("REAVALIACAO_DIAS", "30")),
+    "intervalo": float(os.getenv("REAVALIACAO_JOB_INTERVAL", "3600")),
+}
+
+# Reconciliação noturna da tabela daily_activity (0 dias = reconstrução completa)
+ATIVIDADE_DIARIA = {
+    "hora": int(os.getenv("ATIVIDADE_RECONCILIAR_HORA", "3")),
+    "dias": int(os.getenv("ATIVIDADE_RECONCILIAR_DIAS", "0")),
+}
+
+
+# ============= INICIALIZAÇÃO =============
+
+# Esquema e usuários padrão são aplicados no deploy por `python -m app.core.migrate`;
+# AUTO_MIGRATE repete a migração no startup (padrão apenas fora de produção; o
+# app.yaml liga no App Engine, que não tem etapa de migração antes do tráfego)
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "false" if IS_PRODUCTION else "true").lower() == "true"
+
+# Orçamento de cold start: do exec do processo ao primeiro byte respondido
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "3000"))
+# Orçamento para `import main` (python -X importtime), verificado por benchmarks/import_time.py
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1800"))
+
+
+# ============= SERVIDOR (GUNICORN) =============
+
+# `python -m app.core.server`: gunicorn com workers uvicorn e app pré-carregado
+# no master (páginas compartilhadas por copy-on-write entre os workers)
+SERVER = {
+    "bind": os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '8080')}"),
+    "preload": os.getenv("SERVER_PRELOAD", "true").lower() == "true",
+    "max_requests": int(os.getenv("SERVER_MAX_REQUESTS", "2000")),  # reciclagem do worker (0 = nunca)
+    "max_requests_jitter": int(os.getenv("SERVER_MAX_REQUESTS_JITTER", "200")),  # evita reciclar todos juntos
+    "timeout": int(os.getenv("SERVER_TIMEOUT", "120")),
+    "graceful_timeout": int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30")),
+    "keepalive": int(os.getenv("SERVER_KEEPALIVE", "5")),
+    "log_level": os.getenv("SERVER_LOG_LEVEL", "info"),
+}
+
+
 # ============= ARMAZENAMENTO TEMPORÁRIO =============
 
 # Dicionário temporário para armazenar sessões (em produção usar Redis ou banco)
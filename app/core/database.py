@@ -1,55 +1,116 @@
+from starlette.exceptions import HTTPException
 from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 
+from app.core.config import (
+    WORKERS, DB_CONNECTION_BUDGET, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    DB_POOL_MAX_IDLE, DB_POOL_VALIDATE_INTERVAL
+)
+from app.core.pool import (
+    InstrumentedQueuePool, PoolValidator, compute_pool_size, instrument_engine, pool_metrics
+)
+
 # Para desenvolvimento/teste rápido, usar SQLite
 DATABASE_URL = os.getenv(
     "DATABASE_URL",
     "sqlite:///./monipersonal.db"
 )
 
-# Debug: log da DATABASE_URL (mascarar senha)
-print(f"🔍 DATABASE_URL: {DATABASE_URL[:50]}...")
-print(f"🔍 Is PostgreSQL: {DATABASE_URL.startswith('postgresql')}")
+IS_POSTGRESQL = DATABASE_URL.startswith("postgresql")
 
-# Se for PostgreSQL na produção
-if DATABASE_URL.startswith("postgresql"):
-    print("✅ Usando PostgreSQL (Supabase)")
+# Tamanho do pool derivado do orçamento de conexões e do número de workers
+POOL_SIZE, MAX_OVERFLOW = compute_pool_size(DB_CONNECTION_BUDGET, WORKERS)
+
+POSTGRES_CONNECT_ARGS = {
+    "sslmode": "require",
+    "connect_timeout": 30,
+    "application_name": "monipersonal-api",
+    "options": "-c statement_timeout=30000"  # 30 segundos
+}
 
+# Se for PostgreSQL na produção
+if IS_POSTGRESQL:
     # Configuração específica para Supabase
+    # Sem pool_pre_ping: conexões ociosas são validadas em background (PoolValidator)
     engine = create_engine(
         DATABASE_URL,
         echo=False,
-        pool_size=3,  # Reduzir para Free Tier
-        max_overflow=5,
-        pool_pre_ping=True,
-        pool_recycle=3600,  # 1 hora
-        connect_args={
-            "sslmode": "require",
-            "connect_timeout": 30,
-            "application_name": "monipersonal-api",
-            "options": "-c statement_timeout=30000"  # 30 segundos
-        }
+        poolclass=InstrumentedQueuePool,
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        connect_args=POSTGRES_CONNECT_ARGS
     )
 else:
     # SQLite
-    print("⚠️ Usando SQLite (fallback)")
     engine = create_engine(
         DATABASE_URL,
         connect_args={"check_same_thread": False},
-        echo=False
+        echo=False,
+        poolclass=InstrumentedQueuePool,
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT
     )
 
+instrument_engine(engine)
+
+# Validador de conexões ociosas (iniciado no startup da aplicação)
+pool_validator = PoolValidator(
+    engine,
+    interval=DB_POOL_VALIDATE_INTERVAL,
+    max_age=DB_POOL_RECYCLE,
+    max_idle=DB_POOL_MAX_IDLE
+)
+
+
+def create_dedicated_engine(application_name: str):
+    """
+    Engine sem pool (NullPool) para conexões mantidas abertas por muito tempo,
+    como a do advisory lock do agendador: não ocupam vaga do pool das requisições
+    """
+    if IS_POSTGRESQL:
+        connect_args = {**POSTGRES_CONNECT_ARGS, "application_name": application_name}
+    else:
+        connect_args = {"check_same_thread": False}
+    return create_engine(DATABASE_URL, echo=False, poolclass=NullPool, connect_args=connect_args)
+
+def describe_database() -> str:
+    """Descrição do banco para o log de startup (sem senha, sem abrir conexão)"""
+    return (
+        f"{engine.url.render_as_string(hide_password=True)} "
+        f"({'PostgreSQL' if IS_POSTGRESQL else 'SQLite (fallback)'}, pool {POOL_SIZE}+{MAX_OVERFLOW} por worker)"
+    )
+
+
+def get_pool_stats() -> dict:
+    """Retorna as métricas atuais do pool de conexões"""
+    return pool_metrics.snapshot(engine.pool)
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def run_in_session(fn, *args, **kwargs):
+    """Executa fn(db, ...) numa sessão própria (para uso fora do ciclo da requisição)"""
+    with SessionLocal() as db:
+        return fn(db, *args, **kwargs)
+
+
 # Dependency para obter sessão do banco
 def get_db():
     db = SessionLocal()
     try:
         yield db
+    except HTTPException:
+        # Respostas HTTP (login exigido, 403, 404) não são erros do banco
+        db.rollback()
+        raise
     except Exception as e:
         print(f"❌ Erro na sessão do banco: {str(e)}")
         db.rollback()
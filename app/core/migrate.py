@@ -1,132 +1,244 @@
 #!/usr/bin/env python3
 """
-Script de migração para adicionar colunas faltantes na tabela avaliacoes
+Script de migração: cria tabelas, adiciona colunas faltantes e os usuários padrão
+
+Executado no deploy, antes de a nova revisão receber tráfego; a aplicação não
+mexe no esquema no startup (exceto com AUTO_MIGRATE, padrão fora de produção e
+ligado no App Engine, que não tem etapa de release). No PostgreSQL a migração
+roda sob um advisory lock, então workers e instâncias que sobem juntos a
+executam um de cada vez.
+
+Uso:
+    python -m app.core.migrate [--recalcular-composicao] [--reconstruir-atividade]
 """
+import argparse
 import os
 import sys
-from sqlalchemy import create_engine, text, Column, Text
-from sqlalchemy.orm import sessionmaker
 import traceback
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+# Permite executar também como `python app/core/migrate.py`
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.core.database import engine, SessionLocal, Base
+from app.utils.logging import info_log
+
+
+# Colunas adicionadas depois da criação original das tabelas: (tabela, coluna, tipo SQL)
+ADDED_COLUMNS = [
+    ("avaliacoes", "meta_agua_melhorar", "TEXT"),
+    ("avaliacoes", "rotina_treino", "TEXT"),
+    ("avaliacoes", "dobra_peitoral", "FLOAT"),
+    ("avaliacoes", "dobra_axilar_media", "FLOAT"),
+    ("avaliacoes", "densidade_corporal", "FLOAT"),
+    ("avaliacoes", "massa_gorda_kg", "FLOAT"),
+    ("avaliacoes", "massa_magra_kg", "FLOAT"),
+    ("avaliacoes", "relacao_cintura_quadril", "FLOAT"),
+    ("avaliacoes", "protocolo_composicao", "VARCHAR(10)"),
+    ("alunos", "sexo", "VARCHAR(1)"),
+    ("alunos", "nome_normalizado", "VARCHAR(100)"),
+]
+
+# Índices adicionados depois da criação das tabelas: (nome, tabela, colunas)
+ADDED_INDEXES = [
+    ("ix_avaliacoes_aluno_id_data", "avaliacoes", "aluno_id, data"),
+    ("ix_alunos_nome_normalizado", "alunos", "nome_normalizado"),
+]
+
+# Chave do advisory lock que serializa migrações concorrentes (PostgreSQL)
+MIGRATION_LOCK_KEY = zlib.crc32(b"monipersonal-migrate")
+
+
+@contextmanager
+def migration_lock(bind: Engine = engine):
+    """PostgreSQL: aguarda a vez de migrar (os demais processos esperam o primeiro terminar)"""
+    if bind.dialect.name != "postgresql":
+        yield
+        return
+    with bind.connect() as connection:
+        connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        connection.commit()
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            connection.commit()
+
+
+def ensure_column(connection: Connection, table: str, column: str, ddl_type: str) -> bool:
+    """Adiciona a coluna se ela não existir (SQLite e PostgreSQL); retorna True se criou"""
+    existing = {c["name"] for c in inspect(connection).get_columns(table)}
+    if column in existing:
+        return False
+    connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+    info_log(f"➕ MIGRATE: Coluna {table}.{column} adicionada")
+    return True
+
+
+def ensure_index(connection: Connection, name: str, table: str, columns: str) -> bool:
+    """Cria o índice se ele não existir; retorna True se criou"""
+    existing = {i["name"] for i in inspect(connection).get_indexes(table)}
+    if name in existing:
+        return False
+    connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+    info_log(f"➕ MIGRATE: Índice {name} criado")
+    return True
+
+
+def ensure_trigram_index(connection: Connection) -> bool:
+    """PostgreSQL: índice GIN de trigramas para a busca aproximada de nomes; retorna True se criou"""
+    if connection.dialect.name != "postgresql":
+        return False
+    existing = {i["name"] for i in inspect(connection).get_indexes("alunos")}
+    if "ix_alunos_nome_normalizado_trgm" in existing:
+        return False
+    connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_alunos_nome_normalizado_trgm "
+        "ON alunos USING gin (nome_normalizado gin_trgm_ops)"
+    ))
+    info_log("➕ MIGRATE: Índice ix_alunos_nome_normalizado_trgm (pg_trgm) criado")
+    return True
 
-# Importar configurações do projeto
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from database import engine, SessionLocal
 
-def migrate_database():
-    """Inicializa o banco e adiciona as colunas faltantes na tabela avaliacoes"""
+def backfill_normalized_names(connection: Connection) -> int:
+    """Preenche alunos.nome_normalizado das linhas anteriores à coluna"""
+    from app.utils.text import normalize_name
+
+    rows = connection.execute(
+        text("SELECT id, nome FROM alunos WHERE nome_normalizado IS NULL")
+    ).all()
+    if rows:
+        connection.execute(
+            text("UPDATE alunos SET nome_normalizado = :normalizado WHERE id = :id"),
+            [{"id": row_id, "normalizado": normalize_name(nome)} for row_id, nome in rows]
+        )
+        info_log(f"🔤 MIGRATE: {len(rows)} nomes normalizados")
+    return len(rows)
+
+
+def ensure_schema(bind: Engine = engine) -> List[str]:
+    """
+    Cria tabelas ausentes, adiciona as colunas/índices de ADDED_COLUMNS e
+    ADDED_INDEXES, preenche alunos.nome_normalizado das linhas antigas e cria
+    os índices textuais (trigramas dos nomes no SQLite e anotações das avaliações)
+    """
+    import app.models  # noqa: F401  (registra os modelos no metadata)
+    from app.services.note_search import ensure_fulltext
+    from app.services.student_search import ensure_trigram_table
+
+    Base.metadata.create_all(bind=bind)
+    added = []
+    with bind.begin() as connection:
+        for table, column, ddl_type in ADDED_COLUMNS:
+            if ensure_column(connection, table, column, ddl_type):
+                added.append(f"{table}.{column}")
+        for name, table, columns in ADDED_INDEXES:
+            if ensure_index(connection, name, table, columns):
+                added.append(name)
+        if ensure_trigram_index(connection):
+            added.append("ix_alunos_nome_normalizado_trgm")
+        backfill_normalized_names(connection)
+        if ensure_trigram_table(connection):
+            added.append("alunos_nome_fts")
+        if ensure_fulltext(connection):
+            added.append("avaliacoes_fts")
+    return added
+
+
+def seed_default_users() -> bool:
+    """Cria os usuários padrão se a tabela de usuários estiver vazia; retorna True se criou"""
+    from app.models import Usuario
+    from app.services.auth_service import hash_password
+
+    with SessionLocal() as db:
+        if db.query(Usuario.id).first() is not None:
+            return False
+
+        db.add(Usuario(
+            email="admin@monipersonal.com",
+            nome="Administrador",
+            senha_hash=hash_password("Monica@1985"),
+            tipo="admin",
+            ativo=True,
+            created_at=datetime.now()
+        ))
+        db.add(Usuario(
+            email="rafaelmarzulo@gmail.com",
+            nome="Rafael Marzulo",
+            senha_hash=hash_password("teste123"),
+            tipo="aluno",
+            ativo=True,
+            created_at=datetime.now()
+        ))
+        db.commit()
+
+    info_log("✅ Usuários padrão criados:")
+    info_log("   - Admin: admin@monipersonal.com / Monica@1985")
+    info_log("   - Aluno: rafaelmarzulo@gmail.com / teste123")
+    return True
+
+
+def migrate_database(recalcular_composicao: bool = False, reconstruir_atividade: bool = False) -> bool:
+    """Inicializa o banco e aplica as colunas faltantes"""
     try:
         print("🔄 Iniciando migração do banco de dados...")
+        print(f"🔍 Banco detectado: {engine.dialect.name}")
 
-        # Primeiro, criar todas as tabelas se não existirem
-        from models import Base
-        print("📋 Criando tabelas se necessário...")
-        Base.metadata.create_all(bind=engine)
-        print("✅ Tabelas criadas/verificadas")
-
-        # Conectar ao banco
-        with engine.connect() as connection:
-            print("📋 Verificando tipo de banco de dados...")
-
-            # Detectar se é SQLite ou PostgreSQL
-            try:
-                # Tentar comando PostgreSQL
-                result = connection.execute(text("SELECT version()"))
-                db_version = result.fetchone()[0]
-                is_postgresql = "PostgreSQL" in db_version
-                print(f"🔍 Banco detectado: {'PostgreSQL' if is_postgresql else 'SQLite'}")
-            except:
-                is_postgresql = False
-                print("🔍 Banco detectado: SQLite")
-
-            # Verificar e adicionar colunas com sintaxe apropriada
-            if is_postgresql:
-                # PostgreSQL - usar information_schema
-                print("📋 Verificando colunas com sintaxe PostgreSQL...")
-
-                # Verificar meta_agua_melhorar
-                result = connection.execute(text("""
-                    SELECT column_name
-                    FROM information_schema.columns
-                    WHERE table_name='avaliacoes' AND column_name='meta_agua_melhorar'
-                """))
-                if not result.fetchone():
-                    print("➕ Adicionando coluna meta_agua_melhorar...")
-                    connection.execute(text("ALTER TABLE avaliacoes ADD COLUMN meta_agua_melhorar TEXT"))
-                    print("✅ Coluna meta_agua_melhorar adicionada")
-                else:
-                    print("ℹ️  Coluna meta_agua_melhorar já existe")
-
-                # Verificar rotina_treino
-                result = connection.execute(text("""
-                    SELECT column_name
-                    FROM information_schema.columns
-                    WHERE table_name='avaliacoes' AND column_name='rotina_treino'
-                """))
-                if not result.fetchone():
-                    print("➕ Adicionando coluna rotina_treino...")
-                    connection.execute(text("ALTER TABLE avaliacoes ADD COLUMN rotina_treino TEXT"))
-                    print("✅ Coluna rotina_treino adicionada")
-                else:
-                    print("ℹ️  Coluna rotina_treino já existe")
-
-            else:
-                # SQLite - usar PRAGMA
-                print("📋 Verificando colunas com sintaxe SQLite...")
-
-                result = connection.execute(text("PRAGMA table_info(avaliacoes)"))
-                existing_columns = [row[1] for row in result.fetchall()]
-                print(f"📋 Colunas existentes: {existing_columns}")
-
-                # Adicionar meta_agua_melhorar se não existir
-                if 'meta_agua_melhorar' not in existing_columns:
-                    print("➕ Adicionando coluna meta_agua_melhorar...")
-                    connection.execute(text("ALTER TABLE avaliacoes ADD COLUMN meta_agua_melhorar TEXT"))
-                    print("✅ Coluna meta_agua_melhorar adicionada")
-                else:
-                    print("ℹ️  Coluna meta_agua_melhorar já existe")
-
-                # Adicionar rotina_treino se não existir
-                if 'rotina_treino' not in existing_columns:
-                    print("➕ Adicionando coluna rotina_treino...")
-                    connection.execute(text("ALTER TABLE avaliacoes ADD COLUMN rotina_treino TEXT"))
-                    print("✅ Coluna rotina_treino adicionada")
-                else:
-                    print("ℹ️  Coluna rotina_treino já existe")
-
-            # Commit das mudanças
-            connection.commit()
-            print("🎉 Migração concluída com sucesso!")
-
-            # Verificar estrutura final
-            print("\n📊 Verificando estrutura final da tabela:")
-            if is_postgresql:
-                result = connection.execute(text("""
-                    SELECT column_name, data_type, is_nullable
-                    FROM information_schema.columns
-                    WHERE table_name='avaliacoes'
-                    ORDER BY ordinal_position
-                """))
-                for row in result:
-                    print(f"  - {row[0]} ({row[1]}) {'NULL' if row[2] == 'YES' else 'NOT NULL'}")
-            else:
-                result = connection.execute(text("PRAGMA table_info(avaliacoes)"))
-                for row in result.fetchall():
-                    print(f"  - {row[1]} ({row[2]}) {'NULL' if row[3] == 0 else 'NOT NULL'}")
+        with migration_lock():
+            added = ensure_schema()
+            print(f"✅ Tabelas verificadas, {len(added)} colunas/índices adicionados")
+
+            if seed_default_users():
+                print("👤 Usuários padrão criados")
+
+        if recalcular_composicao:
+            from app.services.body_composition import BodyCompositionService
+            print("🧮 Recalculando composição corporal das avaliações...")
+            with SessionLocal() as db:
+                total = BodyCompositionService.recompute_all(db)
+            print(f"✅ {total} avaliações recalculadas")
+
+        if reconstruir_atividade:
+            from app.services.activity_service import ActivityService
+            print("📅 Reconstruindo agregados diários de atividade...")
+            with SessionLocal() as db:
+                total = ActivityService.reconcile(db)
+            print(f"✅ {total} dias agregados")
+
+        print("🎉 Migração concluída com sucesso!")
+        return True
 
     except Exception as e:
         print(f"💥 Erro durante migração: {e}")
         print(f"📋 Detalhes: {traceback.format_exc()}")
         return False
 
-    return True
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migração do banco de dados MoniPersonal")
+    parser.add_argument(
+        "--recalcular-composicao", action="store_true",
+        help="Recalcula densidade, %% gordura, massas e RCQ de todas as avaliações"
+    )
+    parser.add_argument(
+        "--reconstruir-atividade", action="store_true",
+        help="Reconstrói a tabela daily_activity a partir de avaliacoes e alunos"
+    )
+    args = parser.parse_args()
+
     print("🚀 Executando migração do banco de dados MoniPersonal")
-    success = migrate_database()
+    success = migrate_database(args.recalcular_composicao, args.reconstruir_atividade)
 
     if success:
         print("✅ Migração executada com sucesso!")
         sys.exit(0)
     else:
         print("❌ Falha na migração!")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
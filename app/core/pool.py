@@ -0,0 +1,255 @@
+"""
+Observabilidade e validação em background do pool de conexões do banco
+"""
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Dict, Tuple
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.util import queue as sqla_queue
+
+from app.utils.logging import error_log
+
+
+def compute_pool_size(budget: int, workers: int) -> Tuple[int, int]:
+    """
+    Divide o orçamento de conexões da instância entre os workers
+
+    Returns:
+        Tuple[int, int]: (pool_size, max_overflow) para cada worker
+    """
+    per_worker = max(1, budget // max(1, workers))
+    pool_size = max(1, (per_worker + 1) // 2)
+    return pool_size, per_worker - pool_size
+
+
+class PoolMetrics:
+    """Contadores do pool de conexões (checkout, espera, idade das conexões)"""
+
+    def __init__(self, sample_size: int = 500):
+        self._lock = threading.Lock()
+        self._wait_samples = deque(maxlen=sample_size)
+        self._records = weakref.WeakSet()
+        self.waiters = 0
+        self.max_waiters = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.connections_created = 0
+        self.connections_recycled = 0
+        self.validation_failures = 0
+
+    def begin_wait(self):
+        """Checkout bloqueado: pool vazio e overflow esgotado"""
+        with self._lock:
+            self.waiters += 1
+            self.max_waiters = max(self.max_waiters, self.waiters)
+
+    def end_wait(self):
+        with self._lock:
+            self.waiters -= 1
+
+    def record_checkout(self, elapsed: float, acquired: bool = True, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            if not acquired:
+                return
+            self.checkouts += 1
+            self.wait_time_total += elapsed
+            self.wait_time_max = max(self.wait_time_max, elapsed)
+            self._wait_samples.append(elapsed)
+
+    def track_connection(self, record):
+        with self._lock:
+            self.connections_created += 1
+            self._records.add(record)
+
+    def record_validation(self, recycled: int, failures: int):
+        with self._lock:
+            self.connections_recycled += recycled
+            self.validation_failures += failures
+
+    def connection_ages(self) -> list:
+        """Idade (em segundos) de cada conexão DBAPI aberta no pool"""
+        now = time.time()
+        with self._lock:
+            records = list(self._records)
+        return [
+            now - record.starttime
+            for record in records
+            if record.dbapi_connection is not None
+        ]
+
+    def snapshot(self, pool: QueuePool) -> Dict[str, Any]:
+        """Retorna um dicionário serializável com o estado atual do pool"""
+        ages = self.connection_ages()
+        with self._lock:
+            samples = sorted(self._wait_samples)
+            checkouts = self.checkouts
+            stats = {
+                "waiters": self.waiters,
+                "max_waiters": self.max_waiters,
+                "checkouts": checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(self.wait_time_total / checkouts * 1000, 3) if checkouts else 0.0,
+                "wait_ms_max": round(self.wait_time_max * 1000, 3),
+                "wait_ms_p95": round(samples[int(len(samples) * 0.95) - 1] * 1000, 3) if samples else 0.0,
+                "connections_created": self.connections_created,
+                "connections_recycled": self.connections_recycled,
+                "validation_failures": self.validation_failures,
+            }
+
+        stats.update({
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+            "max_overflow": pool._max_overflow,
+            "connection_age_s_max": round(max(ages), 1) if ages else 0.0,
+            "connection_age_s_avg": round(sum(ages) / len(ages), 1) if ages else 0.0,
+        })
+        return stats
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool que mede o tempo de checkout e o número de requisições aguardando
+
+    Só conta como aguardando (`waiters`, usado pelo controle de admissão) o
+    checkout que vai bloquear na fila: nenhuma conexão ociosa e overflow
+    esgotado. Checkouts imediatos ou que abrem conexão nova não entram.
+    """
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_metrics.record_checkout(time.perf_counter() - start, acquired=False, timed_out=True)
+            raise
+        except Exception:
+            pool_metrics.record_checkout(time.perf_counter() - start, acquired=False)
+            raise
+        pool_metrics.record_checkout(time.perf_counter() - start)
+        return connection
+
+    def _do_get(self):
+        blocking = self._pool.empty() and -1 < self._max_overflow <= self._overflow
+        if not blocking:
+            return super()._do_get()
+        pool_metrics.begin_wait()
+        try:
+            return super()._do_get()
+        finally:
+            pool_metrics.end_wait()
+
+
+def instrument_engine(engine):
+    """Registra os eventos do pool que alimentam as métricas e o validador"""
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        pool_metrics.track_connection(connection_record)
+        connection_record.info["created_at"] = connection_record.info["last_used"] = time.time()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        connection_record.info["last_used"] = time.time()
+
+
+class PoolValidator:
+    """
+    Valida conexões ociosas fora do caminho das requisições
+
+    Substitui o pool_pre_ping: em vez de um round-trip a cada checkout, uma
+    thread percorre periodicamente as conexões paradas no pool, recicla as
+    que passaram da idade/ociosidade máxima e faz ping nas demais.
+    """
+
+    def __init__(self, engine, interval: int, max_age: int, max_idle: int):
+        self.engine = engine
+        self.interval = interval
+        self.max_age = max_age
+        self.max_idle = max_idle
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="db-pool-validator", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.validate_idle_connections()
+            except Exception as e:
+                error_log(f"⚠️ Validador do pool: {str(e)}")
+
+    def validate_idle_connections(self) -> int:
+        """
+        Percorre uma vez as conexões ociosas; retorna quantas foram recicladas
+
+        Só pega do pool o que estiver livre sem esperar, uma conexão por vez,
+        e para assim que o pool esvazia: nunca abre conexão de overflow nem
+        disputa conexões com as requisições.
+        """
+        idle = self.engine.pool._pool  # fila de registros ociosos do QueuePool
+        recycled = failures = 0
+        # QueuePool é FIFO: devolver ao fim da fila percorre cada conexão ociosa uma vez
+        for _ in range(idle.qsize()):
+            try:
+                record = idle.get_nowait()
+            except sqla_queue.Empty:
+                break  # requisições pegaram as conexões restantes
+            try:
+                if record.dbapi_connection is None:
+                    continue  # já invalidada; reconecta no próximo checkout
+                if self._should_recycle(record.info):
+                    record.invalidate()
+                    recycled += 1
+                elif not self._ping(record.dbapi_connection):
+                    record.invalidate()
+                    recycled += 1
+                    failures += 1
+            finally:
+                idle.put_nowait(record)
+
+        pool_metrics.record_validation(recycled, failures)
+        return recycled
+
+    def _should_recycle(self, info: dict) -> bool:
+        now = time.time()
+        idle = now - info.get("last_used", now)
+        age = now - info.get("created_at", now)
+        return idle > self.max_idle or age > self.max_age
+
+    @staticmethod
+    def _ping(dbapi_connection) -> bool:
+        """SELECT 1 seguido de rollback: a conexão volta ao pool sem transação aberta"""
+        try:
+            cursor = dbapi_connection.cursor()
+            try:
+                cursor.execute("SELECT 1")
+            finally:
+                cursor.close()
+                dbapi_connection.rollback()
+            return True
+        except Exception:
+            return False
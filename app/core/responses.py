@@ -0,0 +1,101 @@
+"""
+Respostas JSON serializadas com orjson
+
+FastJSONResponse é a classe de resposta padrão da aplicação. O orjson
+serializa nativamente datetime/date (ISO 8601), dataclasses, UUID e arrays e
+escalares do numpy; `orjson_default` cobre o restante do que as rotas
+devolvem: Decimal, linhas de consultas do SQLAlchemy (Row, como objeto com os
+rótulos das colunas), objetos com __slots__ (DTOs), conjuntos e modelos
+pydantic.
+
+Com FastJSONRoute, o retorno da rota vai direto para o orjson, sem passar
+pelo jsonable_encoder do FastAPI (que percorre e copia o resultado inteiro
+antes do json.dumps).
+"""
+import asyncio
+from decimal import Decimal
+from functools import wraps
+from typing import Any, Callable
+
+import orjson
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from sqlalchemy.engine import Row
+from starlette.responses import Response
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _slots(cls) -> tuple:
+    return tuple(name for klass in cls.__mro__ for name in getattr(klass, "__slots__", ()))
+
+
+def orjson_default(obj: Any) -> Any:
+    """Tipos que o orjson não serializa sozinho"""
+    if isinstance(obj, Row):
+        return obj._asdict()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    slots = _slots(type(obj))
+    if slots:
+        return {name: getattr(obj, name, None) for name in slots if not name.startswith("_")}
+    raise TypeError(f"Tipo não serializável em JSON: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=orjson_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse renderizada pelo orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class FastJSONRoute(APIRoute):
+    """
+    Rota que entrega o retorno do endpoint direto à FastJSONResponse
+
+    Vale para rotas JSON sem response_model e sem parâmetro `response: Response`
+    (cujos headers/status o FastAPI só aplica no caminho padrão). O status_code
+    declarado na rota é preservado.
+    """
+
+    def get_route_handler(self) -> Callable:
+        response_class = self.response_class
+        if isinstance(response_class, DefaultPlaceholder):
+            response_class = response_class.value
+        if (
+            issubclass(response_class, FastJSONResponse)
+            and self.response_field is None
+            and self.dependant.response_param_name is None
+            and not getattr(self.dependant.call, "_fast_json", False)
+        ):
+            self.dependant.call = self._direct(self.dependant.call, response_class, self.status_code)
+        return super().get_route_handler()
+
+    @staticmethod
+    def _direct(call: Callable, response_class, status_code) -> Callable:
+        def respond(result: Any) -> Any:
+            if isinstance(result, Response):
+                return result
+            return response_class(result, status_code=status_code or 200)
+
+        if asyncio.iscoroutinefunction(call):
+            @wraps(call)
+            async def endpoint(*args, **kwargs):
+                return respond(await call(*args, **kwargs))
+        else:
+            @wraps(call)
+            def endpoint(*args, **kwargs):
+                return respond(call(*args, **kwargs))
+
+        endpoint._fast_json = True
+        return endpoint
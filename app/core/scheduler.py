@@ -0,0 +1,287 @@
+"""
+Agendador de jobs em processo com eleição de líder
+
+Cada worker/réplica roda o agendador, mas só o líder executa os jobs. No
+PostgreSQL a liderança é um advisory lock de sessão (liberado automaticamente
+se o processo morrer); no SQLite é um lease numa linha de `scheduler_locks`
+renovado a cada ciclo.
+"""
+import os
+import socket
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import text, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import SAO_PAULO_TZ
+from app.models import SchedulerLock
+from app.utils.logging import info_log, error_log
+
+
+def _owner_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class AdvisoryLockLeader:
+    """
+    Liderança via pg_try_advisory_lock mantido numa conexão dedicada
+
+    `engine` deve ser um engine próprio sem pool (ver create_dedicated_engine):
+    a conexão fica aberta enquanto o processo for líder e não pode sair do
+    pool das requisições.
+    """
+
+    def __init__(self, engine, name: str):
+        self.engine = engine
+        self.name = name
+        self.key = zlib.crc32(name.encode())  # chave estável entre processos
+        self._connection = None
+
+    def acquire(self) -> bool:
+        """Tenta obter (ou confirmar) a liderança; retorna True se este processo é o líder"""
+        if self._connection is not None:
+            try:
+                self._connection.execute(text("SELECT 1"))
+                self._connection.commit()  # não deixa a sessão "idle in transaction"
+                return True
+            except Exception:
+                self._discard()  # conexão perdida: o lock foi liberado pelo servidor
+
+        connection = self.engine.connect()
+        try:
+            acquired = connection.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}
+            ).scalar()
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if acquired:
+            self._connection = connection  # mantém a sessão (e o lock) aberta
+            return True
+        connection.close()
+        return False
+
+    def release(self):
+        if self._connection is None:
+            return
+        try:
+            self._connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            self._connection.commit()
+        except Exception:
+            pass
+        self._discard()
+
+    def _discard(self):
+        try:
+            self._connection.close()
+        except Exception:
+            pass
+        self._connection = None
+
+
+class LockRowLeader:
+    """Liderança via lease numa linha (para bancos sem advisory lock)"""
+
+    def __init__(self, session_factory, name: str, ttl: float):
+        self.session_factory = session_factory
+        self.name = name
+        self.ttl = ttl
+        self.owner = _owner_id()
+
+    def acquire(self) -> bool:
+        now = time.time()
+        with self.session_factory() as db:
+            renewed = db.execute(
+                update(SchedulerLock)
+                .where(SchedulerLock.name == self.name)
+                .where((SchedulerLock.owner == self.owner) | (SchedulerLock.expires_at < now))
+                .values(owner=self.owner, expires_at=now + self.ttl)
+            ).rowcount
+            if renewed:
+                db.commit()
+                return True
+            try:
+                db.add(SchedulerLock(name=self.name, owner=self.owner, expires_at=now + self.ttl))
+                db.commit()
+                return True
+            except IntegrityError:
+                db.rollback()  # outro processo detém o lease
+                return False
+
+    def release(self):
+        with self.session_factory() as db:
+            db.execute(
+                update(SchedulerLock)
+                .where(SchedulerLock.name == self.name, SchedulerLock.owner == self.owner)
+                .values(expires_at=0)
+            )
+            db.commit()
+
+
+class ScheduledJob:
+    """Job periódico registrado no agendador"""
+
+    def __init__(self, name: str, interval: float, func: Callable[[], Any], run_at_start: bool,
+                 at_hour: Optional[int] = None):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.at_hour = at_hour  # job diário: roda sempre neste horário (America/Sao_Paulo)
+        self.next_run = time.time() if run_at_start else self.following_run(time.time())
+        self.last_run: Optional[float] = None
+        self.last_duration_ms: Optional[float] = None
+        self.last_result: Any = None
+        self.last_error: Optional[str] = None
+        self.runs = 0
+        self.failures = 0
+
+    def following_run(self, after: float) -> float:
+        """Próxima execução depois de `after` (epoch)"""
+        if self.at_hour is None:
+            return after + self.interval
+        local = datetime.fromtimestamp(after, SAO_PAULO_TZ)
+        candidate = local.replace(hour=self.at_hour, minute=0, second=0, microsecond=0)
+        if candidate <= local:
+            candidate += timedelta(days=1)
+        return candidate.timestamp()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "interval_s": self.interval,
+            "at_hour": self.at_hour,
+            "next_run": self.next_run,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_run": self.last_run,
+            "last_duration_ms": self.last_duration_ms,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+        }
+
+
+class Scheduler:
+    """
+    Executa jobs periódicos numa thread em background, apenas no líder
+
+    A cada `tick` segundos a thread confirma a liderança e roda, em sequência,
+    os jobs vencidos. Jobs abrem a própria sessão e devem ser idempotentes:
+    após uma troca de líder um job pode rodar de novo antes do intervalo.
+    """
+
+    def __init__(self, leader, tick: float = 30.0):
+        self.leader = leader
+        self.tick = tick
+        self.is_leader = False
+        self._jobs: List[ScheduledJob] = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def every(self, name: str, interval: float, func: Callable[[], Any], run_at_start: bool = False) -> ScheduledJob:
+        """Registra `func` para rodar a cada `interval` segundos (nomes repetidos são ignorados)"""
+        for job in self._jobs:
+            if job.name == name:
+                return job
+        job = ScheduledJob(name, interval, func, run_at_start)
+        self._jobs.append(job)
+        return job
+
+    def daily(self, name: str, hour: int, func: Callable[[], Any], run_at_start: bool = False) -> ScheduledJob:
+        """Registra `func` para rodar uma vez por dia às `hour` horas (America/Sao_Paulo)"""
+        for job in self._jobs:
+            if job.name == name:
+                return job
+        job = ScheduledJob(name, 24 * 3600, func, run_at_start, at_hour=hour)
+        self._jobs.append(job)
+        return job
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+        self._thread.start()
+        info_log(f"⏰ Scheduler: iniciado com {len(self._jobs)} jobs")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+        if self.is_leader:
+            try:
+                self.leader.release()
+            except Exception as e:
+                error_log(f"❌ Scheduler: Erro ao liberar liderança: {str(e)}")
+            self.is_leader = False
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.run_pending()
+            self._stop.wait(self.tick)
+
+    def run_pending(self) -> int:
+        """Um ciclo: confirma liderança e executa os jobs vencidos; retorna quantos rodaram"""
+        try:
+            leader = self.leader.acquire()
+        except Exception as e:
+            error_log(f"❌ Scheduler: Erro na eleição de líder: {str(e)}")
+            leader = False
+
+        if leader != self.is_leader:
+            info_log(f"⏰ Scheduler: {'assumiu' if leader else 'perdeu'} a liderança")
+            self.is_leader = leader
+        if not leader:
+            return 0
+
+        executed = 0
+        for job in self._jobs:
+            if self._stop.is_set():
+                break
+            if time.time() < job.next_run:
+                continue
+            self._execute(job)
+            executed += 1
+        return executed
+
+    def _execute(self, job: ScheduledJob):
+        started = time.perf_counter()
+        job.last_run = time.time()
+        try:
+            job.last_result = job.func()
+            job.last_error = None
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            error_log(f"❌ Scheduler: Job {job.name} falhou: {str(e)}")
+        finally:
+            job.runs += 1
+            job.last_duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            job.next_run = job.following_run(job.last_run)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "leader": self.is_leader,
+            "running": bool(self._thread and self._thread.is_alive()),
+            "jobs": [job.snapshot() for job in self._jobs],
+        }
+
+
+def create_scheduler(engine, session_factory, is_postgresql: bool, tick: float, lock_ttl: float) -> Scheduler:
+    """
+    Agendador com a estratégia de liderança adequada ao banco
+
+    Args:
+        engine: engine dedicado (NullPool) do advisory lock no PostgreSQL
+        session_factory: sessões dos jobs e do lease no SQLite
+    """
+    if is_postgresql:
+        leader = AdvisoryLockLeader(engine, "monipersonal-scheduler")
+    else:
+        leader = LockRowLeader(session_factory, "monipersonal-scheduler", ttl=lock_ttl)
+    return Scheduler(leader, tick=tick)
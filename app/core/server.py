@@ -0,0 +1,113 @@
+"""
+Servidor de produção: gunicorn com workers uvicorn e app pré-carregado
+
+    python -m app.core.server
+
+Com preload o master importa main:app uma única vez (rotas, templates,
+modelos, limiter) e os workers herdam essas páginas por copy-on-write em vez
+de repetir o import. O engine criado no master é descartado em cada worker
+logo após o fork (sem fechar conexões herdadas, que pertencem ao master), e
+os objetos do import são congelados (gc.freeze) para que a coleta de lixo
+dos workers não toque nelas e force cópias.
+
+Quantidade de workers: WORKERS (ver app.core.config, derivado da cota de CPU
+do container). Cada worker é reciclado após SERVER["max_requests"]
+requisições (com jitter) e registra seu uso de memória (RSS/PSS) ao iniciar
+e ao sair; o valor atual também aparece em /admin/metrics.
+"""
+import gc
+import os
+from typing import Any, Dict
+
+from gunicorn.app.base import BaseApplication
+
+from app.core.config import SERVER, WORKERS
+from app.utils.logging import info_log
+from app.utils.system import cpu_quota, memory_usage
+
+WORKER_CLASS = "uvicorn.workers.UvicornWorker"
+
+
+def _format_memory(usage: Dict[str, Any]) -> str:
+    return ", ".join(
+        f"{name[:-3]}={value / 1024:.1f}MiB" for name, value in usage.items() if value is not None
+    )
+
+
+# ============= HOOKS DO GUNICORN =============
+
+def when_ready(server):
+    """Master: app já importado, antes do primeiro fork"""
+    gc.freeze()
+    info_log(
+        f"🧊 Servidor: master pronto com {WORKERS} workers (cota de CPU: {cpu_quota() or 'sem limite'}); "
+        f"memória do master: {_format_memory(memory_usage())}"
+    )
+
+
+def post_fork(server, worker):
+    """
+    Worker: descarta o pool herdado do master (as conexões não podem ser
+    compartilhadas) e recomeça a medição do cold start no fork
+    """
+    from app.core.database import engine
+    from app.core.startup import startup_timer
+
+    engine.dispose(close=False)
+    startup_timer.restart_after_fork()
+
+
+def post_worker_init(worker):
+    info_log(f"👷 Servidor: worker {os.getpid()} iniciado; memória: {_format_memory(memory_usage())}")
+
+
+def worker_exit(server, worker):
+    # Com UvicornWorker o limite max_requests é contado pelo próprio uvicorn
+    info_log(f"♻️ Servidor: worker {worker.pid} encerrado; memória: {_format_memory(memory_usage())}")
+
+
+def gunicorn_options() -> Dict[str, Any]:
+    """Configuração do gunicorn a partir de SERVER/WORKERS"""
+    return {
+        "bind": SERVER["bind"],
+        "workers": WORKERS,
+        "worker_class": WORKER_CLASS,
+        "preload_app": SERVER["preload"],
+        "max_requests": SERVER["max_requests"],
+        "max_requests_jitter": SERVER["max_requests_jitter"],
+        "timeout": SERVER["timeout"],
+        "graceful_timeout": SERVER["graceful_timeout"],
+        "keepalive": SERVER["keepalive"],
+        "loglevel": SERVER["log_level"],
+        "accesslog": "-",
+        "errorlog": "-",
+        "forwarded_allow_ips": "*",
+        "when_ready": when_ready,
+        "post_fork": post_fork,
+        "post_worker_init": post_worker_init,
+        "worker_exit": worker_exit,
+    }
+
+
+class Server(BaseApplication):
+    """Aplicação gunicorn que carrega main:app"""
+
+    def __init__(self, options: Dict[str, Any]):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from main import app
+        return app
+
+
+def run():
+    Server(gunicorn_options()).run()
+
+
+if __name__ == "__main__":
+    run()
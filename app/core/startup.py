@@ -0,0 +1,90 @@
+"""
+Medição do cold start: do exec do processo ao primeiro byte respondido
+
+Os marcos são registrados em milissegundos desde o exec do processo (lido de
+/proc no Linux). O relatório fica em /admin/metrics e é logado uma única vez,
+quando a primeira resposta começa a ser enviada.
+
+Com o app pré-carregado no master do gunicorn, cada worker recomeça a
+contagem no fork (`restart_after_fork`): o exec do master pode ter sido horas
+antes de um worker reciclado. Os marcos do master ficam à parte no relatório.
+"""
+import os
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import STARTUP_BUDGET_MS
+from app.utils.logging import info_log, error_log
+
+
+def process_start_time() -> float:
+    """Epoch do exec deste processo (fora do Linux: o momento do import deste módulo)"""
+    try:
+        with open("/proc/self/stat") as f:
+            campos = f.read().rsplit(")", 1)[1].split()
+        start_ticks = int(campos[19])  # campo 22 (starttime), contado após "(comm)"
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        idade = uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+        return time.time() - max(idade, 0.0)
+    except (OSError, ValueError, IndexError):
+        return time.time()
+
+
+class StartupTimer:
+    """Marcos do cold start de um worker e comparação com o orçamento"""
+
+    def __init__(self, budget_ms: float):
+        self.budget_ms = budget_ms
+        self.process_start = process_start_time()
+        self.origin = "exec"
+        self.marks: Dict[str, float] = {}
+        self.master_marks: Dict[str, float] = {}
+        self.first_byte_ms: Optional[float] = None
+        self.first_path: Optional[str] = None
+        self.mark("python")  # interpretador pronto e primeiros imports da aplicação
+
+    def elapsed_ms(self) -> float:
+        return round((time.time() - self.process_start) * 1000, 1)
+
+    def mark(self, name: str):
+        self.marks[name] = self.elapsed_ms()
+
+    def restart_after_fork(self):
+        """Worker recém-criado: a contagem passa a valer a partir do fork"""
+        self.master_marks = dict(self.marks)
+        self.marks = {}
+        self.process_start = time.time()
+        self.origin = "fork"
+        self.first_byte_ms = None
+        self.first_path = None
+        self.mark("fork")
+
+    def record_first_byte(self, path: str):
+        if self.first_byte_ms is not None:
+            return
+        self.first_byte_ms = self.elapsed_ms()
+        self.first_path = path
+        message = (
+            f"⏱️ Startup: primeiro byte em {self.first_byte_ms:.0f}ms desde o {self.origin} ({path}); "
+            f"marcos: {', '.join(f'{k}={v:.0f}ms' for k, v in self.marks.items())}"
+        )
+        if self.first_byte_ms > self.budget_ms:
+            error_log(f"{message} - acima do orçamento de {self.budget_ms:.0f}ms")
+        else:
+            info_log(message)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "origin": self.origin,
+            "marks_ms": dict(self.marks),
+            "master_marks_ms": dict(self.master_marks),
+            "first_byte_ms": self.first_byte_ms,
+            "first_path": self.first_path,
+            "budget_ms": self.budget_ms,
+            "within_budget": None if self.first_byte_ms is None else self.first_byte_ms <= self.budget_ms,
+        }
+
+
+startup_timer = StartupTimer(STARTUP_BUDGET_MS)
@@ -1,12 +1,17 @@
 """
 Middleware e decoradores de autenticação
 """
-from fastapi import Request, HTTPException, status
-from fastapi.responses import RedirectResponse, HTMLResponse
+import inspect
+from fastapi import Request, HTTPException, Depends
+from fastapi.responses import HTMLResponse
 from functools import wraps
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Optional
 
 from app.services.auth_service import verify_session, verify_simple_jwt
+from app.services.identity_cache import USER_MODELS, identity_cache
 from app.core.config import SESSION_COOKIE_NAME
+from app.core.database import get_db
 from app.utils.logging import debug_log
 
 
@@ -16,95 +21,123 @@ def render_safe_error(request: Request, title: str, message: str, error_details:
     return HTMLResponse(content=safe_html, status_code=500)
 
 
-def require_auth(user_types: list = None):
+_UNRESOLVED = object()
+
+
+class Principal:
+    """Usuário autenticado da requisição (resolvido uma única vez)"""
+
+    __slots__ = ("user_type", "user_id", "source", "claims", "user")
+
+    def __init__(self, user_type: str, user_id: Optional[int], source: str, claims: Dict[str, Any]):
+        self.user_type = user_type
+        self.user_id = user_id
+        self.source = source  # "session" ou "jwt"
+        self.claims = claims
+        self.user = None  # Aluno/Usuario, quando a dependência pede o carregamento
+
+
+class LoginRequired(HTTPException):
+    """Redireciona para o login adequado (admin ou aluno)"""
+
+    def __init__(self, request: Request):
+        url = "/admin-login" if request.url.path.startswith("/admin") else "/login"
+        # 303 depois de POST para o navegador não reenviar o formulário ao login
+        status_code = 307 if request.method in ("GET", "HEAD") else 303
+        super().__init__(status_code=status_code, detail="Não autenticado", headers={"Location": url})
+
+
+def resolve_principal(request: Request) -> Optional[Principal]:
+    """Valida o cookie de sessão uma vez e guarda o resultado em request.state"""
+    cached = getattr(request.state, "principal", _UNRESOLVED)
+    if cached is not _UNRESOLVED:
+        return cached
+
+    principal = None
+    session_token = request.cookies.get(SESSION_COOKIE_NAME)
+    session_data = verify_session(session_token)
+    if session_data:
+        principal = Principal(session_data.get("user_type"), session_data.get("user_id"), "session", session_data)
+    else:
+        jwt_data = verify_simple_jwt(session_token)
+        if jwt_data:
+            principal = Principal(jwt_data.get("user_type"), jwt_data.get("user_id"), "jwt", jwt_data)
+
+    if principal:
+        debug_log(f"✅ AUTH: {principal.user_type} {principal.user_id} autenticado via {principal.source}")
+    request.state.principal = principal
+    return principal
+
+
+def get_principal(request: Request) -> Optional[Principal]:
+    """Dependência: usuário autenticado ou None (rotas públicas)"""
+    return resolve_principal(request)
+
+
+def require_principal(user_types: list = None, load_user: bool = False):
     """
-    Decorator para proteger rotas que requerem autenticação
+    Dependência para rotas que requerem autenticação
 
     Args:
         user_types: Lista de tipos de usuário permitidos (ex: ['admin', 'aluno'])
                    Se None, permite qualquer usuário autenticado
+        load_user: Carrega principal.user (Aluno/Usuario) pelo cache de identidade;
+                   sem a linha no banco, o usuário volta para o login
+    """
+    def authorize(request: Request) -> Principal:
+        principal = resolve_principal(request)
+        if not principal:
+            debug_log("❌ AUTH: Token inválido ou expirado")
+            raise LoginRequired(request)
+
+        if user_types and principal.user_type not in user_types:
+            debug_log(f"❌ AUTH: Tipo de usuário não permitido: {principal.user_type}")
+            raise HTTPException(status_code=403, detail="Acesso negado")
+        return principal
+
+    if not load_user:
+        return authorize
+
+    # A sessão só é aberta depois da checagem do token e do tipo de usuário
+    def load(request: Request, principal: Principal = Depends(authorize),
+             db: Session = Depends(get_db)) -> Principal:
+        if principal.user is None:
+            model = USER_MODELS.get(principal.user_type)
+            principal.user = identity_cache.load(db, model, principal.user_id) if model and principal.user_id else None
+            if principal.user is None:
+                debug_log(f"❌ AUTH: {principal.user_type} {principal.user_id} não encontrado")
+                raise LoginRequired(request)
+        return principal
+
+    return load
+
+
+def require_auth(user_types: list = None):
+    """
+    Decorator para rotas que ainda recebem session_data/jwt_data
+
+    A autenticação é feita pela dependência require_principal (declarada na
+    assinatura da rota); o decorator apenas repassa os dados do token.
     """
     def decorator(func):
+        signature = inspect.signature(func)
+        parameters = [
+            p for name, p in signature.parameters.items() if name not in ("session_data", "jwt_data")
+        ]
+        parameters.append(inspect.Parameter(
+            "_principal", inspect.Parameter.KEYWORD_ONLY, default=Depends(require_principal(user_types))
+        ))
+
         @wraps(func)
-        async def wrapper(*args, **kwargs):
-            # Encontrar o objeto Request nos argumentos e kwargs
-            request = None
-            session_token = None
-
-            # Primeiro buscar nos args
-            for arg in args:
-                if isinstance(arg, Request):
-                    request = arg
-                    break
-
-            # Se não encontrou, buscar nos kwargs
-            if not request:
-                request = kwargs.get('request')
-
-            # Se ainda não encontrou, buscar por nome de parâmetro comum
-            if not request:
-                for key, value in kwargs.items():
-                    if isinstance(value, Request):
-                        request = value
-                        break
-
-            # Como último recurso, verificar se o primeiro argumento tem cookies (pode ser Request)
-            if not request and args and hasattr(args[0], 'cookies'):
-                request = args[0]
-
-            if not request:
-                debug_log(f"❌ REQUIRE_AUTH: Request não encontrado - args: {len(args)}, kwargs: {list(kwargs.keys())}")
-                raise HTTPException(status_code=500, detail="Request object not found")
-
-            # Obter token de sessão do cookie ou parâmetro
-            session_token = request.cookies.get(SESSION_COOKIE_NAME)
-            if not session_token:
-                session_token = kwargs.get('session_token')
-
-            debug_log(f"🔍 REQUIRE_AUTH: session_token={session_token}")
-
-            # Verificar autenticação por sessão
-            session_data = verify_session(session_token)
-            if session_data:
-                debug_log(f"✅ REQUIRE_AUTH: Usuário autenticado via sessão: {session_data}")
-
-                # Verificar tipo de usuário se especificado
-                if user_types and session_data.get('user_type') not in user_types:
-                    debug_log(f"❌ REQUIRE_AUTH: Tipo de usuário não permitido: {session_data.get('user_type')}")
-                    raise HTTPException(status_code=403, detail="Acesso negado")
-
-                # Adicionar dados da sessão aos kwargs para uso na função
-                kwargs['session_data'] = session_data
-                return await func(*args, **kwargs)
-
-            # Verificar autenticação por JWT
-            jwt_data = verify_simple_jwt(session_token)
-            if jwt_data:
-                debug_log(f"🔍 REQUIRE_AUTH: jwt_data={jwt_data}")
-
-                # Verificar tipo de usuário se especificado
-                if user_types and jwt_data.get('user_type') not in user_types:
-                    debug_log(f"❌ REQUIRE_AUTH: Tipo de usuário JWT não permitido: {jwt_data.get('user_type')}")
-                    raise HTTPException(status_code=403, detail="Acesso negado")
-
-                debug_log(f"✅ REQUIRE_AUTH: {jwt_data.get('user_type', 'Usuario').title()} autenticado via JWT")
-
-                # Adicionar dados do JWT aos kwargs
-                kwargs['jwt_data'] = jwt_data
-                return await func(*args, **kwargs)
-
-            debug_log("❌ REQUIRE_AUTH: Token inválido ou expirado")
-
-            # Se chegou aqui, não está autenticado
-            if request.url.path.startswith('/admin'):
-                return RedirectResponse(url="/admin-login")
-            else:
-                return RedirectResponse(url="/login")
+        async def wrapper(*args, _principal: Principal, **kwargs):
+            kwargs[f"{_principal.source}_data"] = _principal.claims
+            return await func(*args, **kwargs)
 
+        wrapper.__signature__ = signature.replace(parameters=parameters)
         return wrapper
     return decorator
 
 
 def require_admin():
     """Decorator específico para rotas administrativas"""
-    return require_auth(['admin'])
\ No newline at end of file
+    return require_auth(['admin'])
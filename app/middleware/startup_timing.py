@@ -0,0 +1,23 @@
+"""
+Registra o instante do primeiro byte respondido pelo worker (cold start)
+"""
+
+
+class FirstByteMiddleware:
+    """Middleware ASGI que avisa o StartupTimer no primeiro http.response.start e depois só repassa"""
+
+    def __init__(self, app, timer):
+        self.app = app
+        self.timer = timer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.timer.first_byte_ms is not None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                self.timer.record_first_byte(scope["path"])
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Boolean, ForeignKey, Float, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from datetime import datetime
@@ -52,6 +52,15 @@ class Avaliacao(Base):
     dobra_suprailiaca = Column(Float, nullable=True)
     dobra_abdominal = Column(Float, nullable=True)
     dobra_coxa = Column(Float, nullable=True)
+    dobra_peitoral = Column(Float, nullable=True)
+    dobra_axilar_media = Column(Float, nullable=True)
+
+    # Composição corporal derivada (app/services/body_composition.py)
+    densidade_corporal = Column(Float, nullable=True)
+    massa_gorda_kg = Column(Float, nullable=True)
+    massa_magra_kg = Column(Float, nullable=True)
+    relacao_cintura_quadril = Column(Float, nullable=True)
+    protocolo_composicao = Column(String(10), nullable=True)  # JP7, JP3, manual
 
     # Outros dados
     imc = Column(Float, nullable=True)
@@ -72,6 +81,11 @@ class Avaliacao(Base):
     # Relacionamento com aluno
     aluno = relationship("Aluno", back_populates="avaliacoes")
 
+    # Última avaliação por aluno (MAX(data) GROUP BY aluno_id) e históricos ordenados
+    __table_args__ = (
+        Index("ix_avaliacoes_aluno_id_data", "aluno_id", "data"),
+    )
+
     def __repr__(self):
         return f"<Avaliacao(id={self.id}, nome='{self.nome}', data='{self.data}')>"
 
@@ -80,10 +94,12 @@ class Aluno(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     nome = Column(String(100), nullable=False, index=True)
+    nome_normalizado = Column(String(100), nullable=True, index=True)  # sem acentos, minúsculo (busca)
     email = Column(String(100), unique=True, index=True, nullable=False)
     telefone = Column(String(20))
     senha_hash = Column(String(255), nullable=False)
     data_nascimento = Column(DateTime)
+    sexo = Column(String(1), nullable=True)  # M, F (usado nas fórmulas de composição corporal)
     ativo = Column(Boolean, default=True)
     created_at = Column(DateTime, default=now_sao_paulo, nullable=False)
 
@@ -105,4 +121,53 @@ class Usuario(Base):
     created_at = Column(DateTime, default=now_sao_paulo)
 
     def __repr__(self):
-        return f"<Usuario(id={self.id}, email='{self.email}', nome='{self.nome}', tipo='{self.tipo}')>"
\ No newline at end of file
+        return f"<Usuario(id={self.id}, email='{self.email}', nome='{self.nome}', tipo='{self.tipo}')>"
+
+
+class Lembrete(Base):
+    """Fila de lembretes gerada pelos jobs agendados (ex.: reavaliação em atraso)"""
+    __tablename__ = "lembretes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    aluno_id = Column(Integer, ForeignKey("alunos.id"), nullable=False, index=True)
+    tipo = Column(String(30), nullable=False)  # reavaliacao
+    referencia = Column(DateTime, nullable=True)  # ex.: data da última avaliação
+    status = Column(String(20), default="pendente", nullable=False, index=True)  # pendente, enviado
+    created_at = Column(DateTime, default=now_sao_paulo, nullable=False)
+    enviado_em = Column(DateTime, nullable=True)
+
+    # Um lembrete por aluno/tipo/referência: o job pode rodar várias vezes
+    __table_args__ = (
+        UniqueConstraint("aluno_id", "tipo", "referencia", name="uq_lembretes_aluno_tipo_referencia"),
+    )
+
+    def __repr__(self):
+        return f"<Lembrete(id={self.id}, aluno_id={self.aluno_id}, tipo='{self.tipo}', status='{self.status}')>"
+
+
+class SchedulerLock(Base):
+    """Lease de liderança do agendador quando não há advisory lock (SQLite)"""
+    __tablename__ = "scheduler_locks"
+
+    name = Column(String(50), primary_key=True)
+    owner = Column(String(100), nullable=False)
+    expires_at = Column(Float, nullable=False)  # epoch (time.time())
+
+
+class DailyActivity(Base):
+    """Agregados diários de atividade (mantidos no insert e reconciliados por job noturno)"""
+    __tablename__ = "daily_activity"
+
+    dia = Column(Date, primary_key=True)  # data local (America/Sao_Paulo)
+    avaliacoes = Column(Integer, default=0, nullable=False)
+    novos_alunos = Column(Integer, default=0, nullable=False)
+
+    # Avaliações do dia por faixa de IMC (OMS) e soma dos IMCs para a média
+    imc_baixo_peso = Column(Integer, default=0, nullable=False)
+    imc_normal = Column(Integer, default=0, nullable=False)
+    imc_sobrepeso = Column(Integer, default=0, nullable=False)
+    imc_obesidade = Column(Integer, default=0, nullable=False)
+    imc_soma = Column(Float, default=0.0, nullable=False)
+
+    def __repr__(self):
+        return f"<DailyActivity(dia='{self.dia}', avaliacoes={self.avaliacoes}, novos_alunos={self.novos_alunos})>"
@@ -2,21 +2,44 @@
 Rotas administrativas do sistema MoniPersonal
 """
 from fastapi import APIRouter, Request, Depends, HTTPException, Form
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, FileResponse
 from fastapi.templating import Jinja2Templates
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import Boolean, case, func, type_coerce
+from datetime import date, datetime
+from typing import Optional
+import os
 import structlog
 
-from app.core.database import get_db
+from app.core.database import get_db, get_pool_stats, run_in_session
+from app.core.responses import FastJSONResponse, FastJSONRoute
+from app.core.startup import startup_timer
 from app.models import Aluno, Avaliacao
 from app.middleware.auth import require_admin
+from app.middleware.load_shedding import admission_metrics
 from app.utils.logging import info_log, debug_log, error_log
 from app.utils.datetime_utils import now_sao_paulo, utc_to_sao_paulo
-from app.core.config import app_logs
+from app.utils.resilience import CircuitBreaker, StaleWhileRevalidateCache
+from app.utils.singleflight import default_group as single_flight_group
+from app.utils.lazy_import import lazy_import_stats
+from app.utils.system import memory_usage
+from app.services.student_service import AdminService
+from app.services.student_search import StudentSearchService, student_index
+from app.services.note_search import NoteSearchService
+from app.services.series_service import SeriesService, series_cache
+from app.services.identity_cache import identity_cache
+from app.services.login_service import unknown_emails
+from app.services.auth_service import hash_password
+from app.services.password_service import password_metrics
+from app.services.report_service import report_manager
+from app.services.batch_report_service import BatchConflictError, monthly_batches
+from app.services.analytics_service import AnalyticsService, analytics_cache
+from app.services.jobs import scheduler
+from app.core.config import app_logs, DASHBOARD_CACHE, DASHBOARD_BREAKER
 
 # Configurar router
-router = APIRouter(prefix="/admin", tags=["admin"])
+router = APIRouter(prefix="/admin", tags=["admin"], route_class=FastJSONRoute)
 
 # Configurar templates
 templates = Jinja2Templates(directory="templates")
@@ -24,6 +47,10 @@ templates = Jinja2Templates(directory="templates")
 # Logger
 logger = structlog.get_logger()
 
+# Agregados do dashboard e de /admin/stats: último valor bom + circuit breaker
+dashboard_breaker = CircuitBreaker("admin_dashboard", **DASHBOARD_BREAKER)
+dashboard_cache = StaleWhileRevalidateCache("admin_dashboard", breaker=dashboard_breaker, **DASHBOARD_CACHE)
+
 
 @router.get("/dashboard", response_class=HTMLResponse)
 @require_admin()
@@ -37,19 +64,16 @@ async def admin_dashboard(
     try:
         debug_log("🎯 ADMIN/DASHBOARD: Rota acessada com sucesso")
 
-        # Carregar estatísticas básicas para exibição imediata
-        total_alunos = db.query(Aluno).count()
-        total_avaliacoes = db.query(Avaliacao).count()
-        alunos_ativos = db.query(Aluno).filter(Aluno.ativo == True).count()
-
-        # Avaliações recentes (últimos 30 dias)
-        from datetime import timedelta
-        data_limite = now_sao_paulo() - timedelta(days=30)
-        avaliacoes_recentes = db.query(Avaliacao).filter(
-            Avaliacao.data >= data_limite
-        ).count()
+        # Carregar estatísticas básicas para exibição imediata (com fallback para o último valor bom)
+        try:
+            counters, stale = await dashboard_cache.get(
+                "dashboard", lambda: run_in_session(AdminService.get_dashboard_counters)
+            )
+        except Exception as e:
+            error_log(f"❌ ADMIN/DASHBOARD: Estatísticas indisponíveis: {str(e)}")
+            counters, stale = {}, True
 
-        info_log(f"📊 ADMIN/DASHBOARD: Estatísticas carregadas - {total_alunos} alunos, {total_avaliacoes} avaliações")
+        info_log(f"📊 ADMIN/DASHBOARD: Estatísticas carregadas - {counters.get('total_alunos')} alunos, {counters.get('total_avaliacoes')} avaliações{' (stale)' if stale else ''}")
 
         return templates.TemplateResponse(
             "admin_dashboard.html",
@@ -57,10 +81,11 @@ async def admin_dashboard(
                 "request": request,
                 "title": "Dashboard Administrativo",
                 "message": "Sistema MoniPersonal operacional",
-                "total_alunos": total_alunos,
-                "total_avaliacoes": total_avaliacoes,
-                "alunos_ativos": alunos_ativos,
-                "avaliacoes_recentes": avaliacoes_recentes,
+                "total_alunos": counters.get("total_alunos"),
+                "total_avaliacoes": counters.get("total_avaliacoes"),
+                "alunos_ativos": counters.get("alunos_ativos"),
+                "avaliacoes_recentes": counters.get("avaliacoes_recentes"),
+                "stale": stale,
                 "is_admin": True
             }
         )
@@ -70,6 +95,21 @@ async def admin_dashboard(
         raise HTTPException(status_code=500, detail="Erro interno do servidor")
 
 
+@router.get("/alunos/buscar")
+@require_admin()
+async def admin_buscar_alunos(
+    request: Request,
+    q: str = "",
+    limite: int = 10,
+    db: Session = Depends(get_db),
+    session_data=None,
+    jwt_data=None
+):
+    """Typeahead de alunos ativos por prefixo do nome (qualquer palavra) ou e-mail"""
+    student_index.ensure_fresh(db)
+    return {"resultados": student_index.search(q, limite)}
+
+
 @router.get("/alunos", response_class=HTMLResponse)
 @require_admin()
 async def admin_lista_alunos(
@@ -163,19 +203,8 @@ async def admin_historico_aluno(
         nome_decodificado = urllib.parse.unquote(nome)
         debug_log(f"🎯 ADMIN/ALUNO/{nome_decodificado}: Carregando histórico")
 
-        # Buscar aluno com nome exato ou similar
-        aluno = db.query(Aluno).filter(
-            Aluno.nome.ilike(f"%{nome_decodificado}%")
-        ).first()
-
-        # Se não encontrar, tentar sem acentos
-        if not aluno:
-            # Remover acentos para busca mais flexível
-            import unicodedata
-            nome_sem_acentos = unicodedata.normalize('NFD', nome_decodificado).encode('ascii', 'ignore').decode('ascii')
-            aluno = db.query(Aluno).filter(
-                Aluno.nome.ilike(f"%{nome_sem_acentos}%")
-            ).first()
+        # Id ou nome normalizado exato; busca aproximada ranqueada só como fallback
+        aluno = StudentSearchService.resolve(db, nome_decodificado)
 
         if not aluno:
             raise HTTPException(status_code=404, detail="Aluno não encontrado")
@@ -210,6 +239,32 @@ async def admin_historico_aluno(
         raise HTTPException(status_code=500, detail="Erro interno do servidor")
 
 
+@router.get("/alunos/{aluno_id}/series")
+@require_admin()
+async def admin_series_aluno(
+    request: Request,
+    aluno_id: int,
+    metricas: str = "peso_kg,imc",
+    pontos: int = 100,
+    inicio: Optional[date] = None,
+    fim: Optional[date] = None,
+    db: Session = Depends(get_db),
+    session_data=None,
+    jwt_data=None
+):
+    """Séries temporais de qualquer aluno (gráficos do histórico administrativo)"""
+    try:
+        metrics = SeriesService.parse_metrics(metricas)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return SeriesService.get_student_series(
+        db, aluno_id, metrics, pontos,
+        inicio=datetime.combine(inicio, datetime.min.time()) if inicio else None,
+        fim=datetime.combine(fim, datetime.max.time()) if fim else None
+    )
+
+
 @router.get("/debug-alunos")
 @require_admin()
 async def admin_debug_alunos(
@@ -222,28 +277,25 @@ async def admin_debug_alunos(
     try:
         debug_log("🔧 ADMIN/DEBUG: Verificando configuração de alunos")
 
-        alunos = db.query(Aluno).all()
-
-        debug_info = []
-        for aluno in alunos:
-            aluno_info = {
-                "id": aluno.id,
-                "nome": aluno.nome,
-                "email": aluno.email,
-                "ativo": aluno.ativo,
-                "tem_senha": bool(aluno.senha_hash),
-                "tamanho_hash": len(aluno.senha_hash) if aluno.senha_hash else 0,
-                "tipo_hash": "bcrypt" if aluno.senha_hash and aluno.senha_hash.startswith("$2") else "sha256"
-            }
-            debug_info.append(aluno_info)
+        # Projeção direta (linhas serializadas como objetos pelo orjson)
+        tamanho_hash = func.coalesce(func.length(Aluno.senha_hash), 0)
+        alunos = db.query(
+            Aluno.id,
+            Aluno.nome,
+            Aluno.email,
+            Aluno.ativo,
+            type_coerce(tamanho_hash > 0, Boolean).label("tem_senha"),
+            tamanho_hash.label("tamanho_hash"),
+            case((Aluno.senha_hash.like("$2%"), "bcrypt"), else_="sha256").label("tipo_hash")
+        ).order_by(Aluno.id).all()
 
         info_log(f"🔧 ADMIN/DEBUG: {len(alunos)} alunos analisados")
 
         return {
             "success": True,
             "total_alunos": len(alunos),
-            "alunos": debug_info,
-            "timestamp": now_sao_paulo().isoformat()
+            "alunos": alunos,
+            "timestamp": now_sao_paulo()
         }
 
     except Exception as e:
@@ -270,6 +322,34 @@ async def test_database_connection(db: Session = Depends(get_db)):
         return {"error": str(e), "success": False}
 
 
+@router.get("/metrics")
+@require_admin()
+async def admin_metricas(
+    request: Request,
+    session_data=None,
+    jwt_data=None
+):
+    """Métricas operacionais da instância (pool, controle de admissão, circuit breakers)"""
+    return {
+        "pool": get_pool_stats(),
+        "admission": admission_metrics.snapshot(),
+        "dashboard_cache": dashboard_cache.snapshot(),
+        "single_flight": single_flight_group.snapshot(),
+        "series_cache": series_cache.snapshot(),
+        "reports": report_manager.snapshot(),
+        "analytics_cache": analytics_cache.snapshot(),
+        "scheduler": scheduler.snapshot(),
+        "student_index": student_index.snapshot(),
+        "identity_cache": identity_cache.snapshot(),
+        "login_negative_cache": unknown_emails.snapshot(),
+        "passwords": password_metrics.snapshot(),
+        "startup": startup_timer.report(),
+        "lazy_imports": lazy_import_stats(),
+        "process": {"pid": os.getpid(), **memory_usage()},
+        "timestamp": now_sao_paulo().isoformat()
+    }
+
+
 @router.get("/stats")
 @require_admin()
 async def admin_estatisticas(
@@ -282,128 +362,13 @@ async def admin_estatisticas(
     try:
         debug_log("📊 ADMIN/STATS: Iniciando cálculo de estatísticas detalhadas")
 
-        # Testar conexão com banco primeiro
-        try:
-            from sqlalchemy import text
-            db.execute(text("SELECT 1")).fetchone()
-            debug_log("✅ ADMIN/STATS: Conexão com banco OK")
-        except Exception as e:
-            error_log(f"❌ ADMIN/STATS: Falha na conexão com banco: {str(e)}")
-            raise HTTPException(status_code=500, detail="Erro de conexão com banco de dados")
-
-        # Estatísticas básicas
-        try:
-            debug_log("📊 ADMIN/STATS: Calculando total de alunos")
-            total_alunos = db.query(Aluno).count()
-            debug_log(f"✅ ADMIN/STATS: Total alunos: {total_alunos}")
-        except Exception as e:
-            error_log(f"❌ ADMIN/STATS: Erro ao contar alunos: {str(e)}")
-            total_alunos = 0
-
-        try:
-            debug_log("📊 ADMIN/STATS: Calculando total de avaliações")
-            total_avaliacoes = db.query(Avaliacao).count()
-            debug_log(f"✅ ADMIN/STATS: Total avaliações: {total_avaliacoes}")
-        except Exception as e:
-            error_log(f"❌ ADMIN/STATS: Erro ao contar avaliações: {str(e)}")
-            total_avaliacoes = 0
-
-        try:
-            debug_log("📊 ADMIN/STATS: Calculando alunos ativos")
-            alunos_ativos = db.query(Aluno).filter(Aluno.ativo == True).count()
-            debug_log(f"✅ ADMIN/STATS: Alunos ativos: {alunos_ativos}")
-        except Exception as e:
-            error_log(f"❌ ADMIN/STATS: Erro ao contar alunos ativos: {str(e)}")
-            alunos_ativos = 0
-
-        # Avaliações recentes (últimos 30 dias)
-        from datetime import timedelta
-        data_limite_30d = now_sao_paulo() - timedelta(days=30)
-        avaliacoes_recentes = db.query(Avaliacao).filter(
-            Avaliacao.data >= data_limite_30d
-        ).count()
-
-        # Avaliações desta semana
-        data_limite_7d = now_sao_paulo() - timedelta(days=7)
-        avaliacoes_semana = db.query(Avaliacao).filter(
-            Avaliacao.data >= data_limite_7d
-        ).count()
-
-        # Avaliações de hoje
-        data_hoje = now_sao_paulo().replace(hour=0, minute=0, second=0, microsecond=0)
-        avaliacoes_hoje = db.query(Avaliacao).filter(
-            Avaliacao.data >= data_hoje
-        ).count()
-
-        # Estatísticas de IMC
-        avaliacoes_com_imc = db.query(Avaliacao).filter(
-            Avaliacao.imc.isnot(None)
-        ).all()
-
-        imc_stats = {
-            "normal": 0,
-            "sobrepeso": 0,
-            "obesidade": 0,
-            "baixo_peso": 0
-        }
-
-        for avaliacao in avaliacoes_com_imc:
-            imc = avaliacao.imc
-            if imc < 18.5:
-                imc_stats["baixo_peso"] += 1
-            elif imc < 25:
-                imc_stats["normal"] += 1
-            elif imc < 30:
-                imc_stats["sobrepeso"] += 1
-            else:
-                imc_stats["obesidade"] += 1
-
-        # Média de avaliações por aluno
-        media_avaliacoes = total_avaliacoes / total_alunos if total_alunos > 0 else 0
-
-        # Alunos com progresso (mais de 1 avaliação) - Query otimizada
-        try:
-            alunos_com_progresso = db.query(Aluno.id).join(Avaliacao).group_by(Aluno.id).having(
-                func.count(Avaliacao.id) > 1
-            ).count()
-        except Exception as e:
-            error_log(f"❌ Erro ao calcular alunos com progresso: {str(e)}")
-            alunos_com_progresso = 0
-
-        # Top 5 alunos mais ativos (por número de avaliações) - Query otimizada
-        try:
-            top_alunos = db.query(
-                Aluno.nome,
-                func.count(Avaliacao.id).label('total_avaliacoes')
-            ).join(Avaliacao).group_by(Aluno.id, Aluno.nome).order_by(
-                func.count(Avaliacao.id).desc()
-            ).limit(5).all()
-        except Exception as e:
-            error_log(f"❌ Erro ao calcular top alunos: {str(e)}")
-            top_alunos = []
-
-        stats = {
-            "total_alunos": total_alunos,
-            "alunos_ativos": alunos_ativos,
-            "total_avaliacoes": total_avaliacoes,
-            "avaliacoes_recentes": avaliacoes_recentes,
-            "avaliacoes_semana": avaliacoes_semana,
-            "avaliacoes_hoje": avaliacoes_hoje,
-            "media_avaliacoes": round(media_avaliacoes, 1),
-            "alunos_com_progresso": alunos_com_progresso,
-            "imc_stats": imc_stats,
-            "top_alunos": [
-                {"nome": nome, "avaliacoes": total}
-                for nome, total in top_alunos
-            ],
-            "percentual_ativos": round((alunos_ativos / total_alunos * 100) if total_alunos > 0 else 0, 1),
-            "percentual_com_progresso": round((alunos_com_progresso / total_alunos * 100) if total_alunos > 0 else 0, 1),
-            "timestamp": now_sao_paulo().isoformat()
-        }
+        stats, stale = await dashboard_cache.get(
+            "stats", lambda: run_in_session(AdminService.get_detailed_stats)
+        )
 
-        info_log(f"📊 ADMIN/STATS: Estatísticas detalhadas calculadas - {total_alunos} alunos, {total_avaliacoes} avaliações, {avaliacoes_recentes} recentes")
+        info_log(f"📊 ADMIN/STATS: Estatísticas detalhadas calculadas - {stats['total_alunos']} alunos, {stats['total_avaliacoes']} avaliações, {stats['avaliacoes_recentes']} recentes{' (stale)' if stale else ''}")
 
-        return stats
+        return {**stats, "stale": stale}
 
     except Exception as e:
         error_log(f"❌ ADMIN/STATS: Erro: {str(e)}")
@@ -422,16 +387,11 @@ async def admin_reset_passwords(
     try:
         debug_log("🔑 ADMIN/RESET-PASSWORDS: Rota acessada")
 
-        # Buscar todos os alunos para seleção
-        alunos = db.query(Aluno).filter(Aluno.ativo == True).order_by(Aluno.nome).all()
-
-        info_log(f"🔑 ADMIN/RESET-PASSWORDS: {len(alunos)} alunos ativos encontrados")
-
+        # Alunos são buscados sob demanda em /admin/alunos/buscar
         return templates.TemplateResponse(
             "admin_reset_passwords.html",
             {
                 "request": request,
-                "alunos": alunos,
                 "is_admin": True
             }
         )
@@ -460,13 +420,8 @@ async def admin_reset_senha_aluno(
         if not aluno:
             return {"error": "Aluno não encontrado"}
 
-        # Hash da nova senha
-        from passlib.context import CryptContext
-        pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-        senha_hash = pwd_context.hash(nova_senha)
-
         # Atualizar senha
-        aluno.senha_hash = senha_hash
+        aluno.senha_hash = await run_in_threadpool(hash_password, nova_senha)
         db.commit()
 
         info_log(f"✅ ADMIN/RESET-SENHA: Senha resetada para {aluno.nome}")
@@ -478,6 +433,21 @@ async def admin_reset_senha_aluno(
         return {"error": f"Erro ao resetar senha: {str(e)}"}
 
 
+@router.get("/avaliacoes/buscar")
+@require_admin()
+async def admin_buscar_avaliacoes(
+    request: Request,
+    q: str = "",
+    pagina: int = 1,
+    por_pagina: int = 20,
+    db: Session = Depends(get_db),
+    session_data=None,
+    jwt_data=None
+):
+    """Busca textual (ranqueada, paginada e com destaque) nas anotações das avaliações"""
+    return NoteSearchService.search(db, q, pagina, por_pagina)
+
+
 @router.get("/avaliacoes", response_class=HTMLResponse)
 @require_admin()
 async def admin_todas_avaliacoes(
@@ -529,25 +499,9 @@ async def admin_relatorios(
     try:
         debug_log("📈 ADMIN/RELATORIOS: Rota acessada")
 
-        # Estatísticas para relatórios
-        total_alunos = db.query(Aluno).count()
-        total_avaliacoes = db.query(Avaliacao).count()
-        count_alunos_ativos = db.query(Aluno).filter(Aluno.ativo == True).count()
-
-        # Dados dos últimos 30 dias
-        from datetime import timedelta
-        data_limite = now_sao_paulo() - timedelta(days=30)
-        avaliacoes_recentes = db.query(Avaliacao).filter(
-            Avaliacao.data >= data_limite
-        ).count()
-
-        # Top 5 alunos mais ativos (para o template)
-        top_alunos_ativos = db.query(
-            Aluno.nome,
-            func.count(Avaliacao.id).label('total_avaliacoes')
-        ).join(Avaliacao).group_by(Aluno.id, Aluno.nome).order_by(
-            func.count(Avaliacao.id).desc()
-        ).limit(5).all()
+        # Estatísticas para relatórios (requisições simultâneas compartilham a mesma consulta)
+        agregados = await run_in_threadpool(run_in_session, AdminService.get_report_aggregates)
+        analises = await run_in_threadpool(run_in_session, AnalyticsService.get_cohort_analytics)
 
         info_log("📈 ADMIN/RELATORIOS: Dados carregados")
 
@@ -555,11 +509,14 @@ async def admin_relatorios(
             "admin_relatorios.html",
             {
                 "request": request,
-                "total_alunos": total_alunos,
-                "total_avaliacoes": total_avaliacoes,
-                "count_alunos_ativos": count_alunos_ativos,
-                "alunos_ativos": top_alunos_ativos,  # Lista para iteração no template
-                "avaliacoes_recentes": avaliacoes_recentes,
+                "total_alunos": agregados["total_alunos"],
+                "total_avaliacoes": agregados["total_avaliacoes"],
+                "count_alunos_ativos": agregados["count_alunos_ativos"],
+                "alunos_ativos": agregados["top_alunos_ativos"],  # Lista para iteração no template
+                "avaliacoes_recentes": agregados["avaliacoes_recentes"],
+                "analises": AnalyticsService.to_json(analises),
+                "lote_mensal": monthly_batches.current(),
+                "mes_atual": now_sao_paulo(),
                 "is_admin": True
             }
         )
@@ -569,6 +526,78 @@ async def admin_relatorios(
         raise HTTPException(status_code=500, detail="Erro interno do servidor")
 
 
+@router.get("/relatorios/analises")
+@require_admin()
+async def admin_analises_coorte(
+    request: Request,
+    session_data=None,
+    jwt_data=None
+):
+    """Análises de coorte (percentis, variação mensal, tendências, histogramas) em JSON"""
+    try:
+        analises = await run_in_threadpool(run_in_session, AnalyticsService.get_cohort_analytics)
+        return AnalyticsService.to_json(analises)
+    except Exception as e:
+        error_log(f"❌ ADMIN/ANALISES: Erro: {str(e)}")
+        return FastJSONResponse({"error": f"Erro ao calcular análises: {str(e)}"}, status_code=500)
+
+
+@router.post("/relatorios/mensal")
+@require_admin()
+async def admin_gerar_relatorios_mensais(
+    request: Request,
+    ano: int = Form(...),
+    mes: int = Form(...),
+    formato: str = Form("pdf"),
+    session_data=None,
+    jwt_data=None
+):
+    """Dispara a geração em lote dos relatórios do mês (um zip com todos os alunos)"""
+    try:
+        lote = monthly_batches.start(ano, mes, formato)
+    except ValueError as e:
+        return FastJSONResponse({"error": str(e)}, status_code=400)
+    except BatchConflictError as e:
+        return FastJSONResponse({"error": str(e), "lote": e.running.to_dict()}, status_code=409)
+
+    info_log(f"📦 ADMIN/RELATORIOS: Lote mensal {lote.periodo} ({lote.formato}) em andamento")
+    return FastJSONResponse(lote.to_dict(), status_code=202)
+
+
+@router.get("/relatorios/mensal/{job_id}")
+@require_admin()
+async def admin_status_relatorios_mensais(
+    request: Request,
+    job_id: str,
+    session_data=None,
+    jwt_data=None
+):
+    """Progresso do lote mensal"""
+    lote = monthly_batches.get(job_id)
+    if not lote:
+        raise HTTPException(status_code=404, detail="Lote não encontrado")
+    return lote.to_dict()
+
+
+@router.get("/relatorios/mensal/{job_id}/download")
+@require_admin()
+async def admin_download_relatorios_mensais(
+    request: Request,
+    job_id: str,
+    session_data=None,
+    jwt_data=None
+):
+    """Download do zip do lote mensal concluído"""
+    lote = monthly_batches.get(job_id)
+    if not lote or lote.status != "done":
+        raise HTTPException(status_code=404, detail="Lote não encontrado ou em andamento")
+    return FileResponse(
+        lote.output_path,
+        media_type="application/zip",
+        filename=os.path.basename(lote.output_path)
+    )
+
+
 @router.get("/backup", response_class=HTMLResponse)
 @require_admin()
 async def admin_backup(
@@ -614,16 +643,11 @@ async def admin_nova_avaliacao(
     try:
         debug_log("📝 ADMIN/NOVA-AVALIACAO: Rota acessada")
 
-        # Buscar todos os alunos ativos
-        alunos = db.query(Aluno).filter(Aluno.ativo == True).order_by(Aluno.nome).all()
-
-        info_log(f"📝 ADMIN/NOVA-AVALIACAO: {len(alunos)} alunos disponíveis")
-
+        # Alunos são buscados sob demanda em /admin/alunos/buscar
         return templates.TemplateResponse(
             "admin_nova_avaliacao.html",
             {
                 "request": request,
-                "alunos": alunos,
                 "data_atual": now_sao_paulo().strftime("%Y-%m-%d"),
                 "is_admin": True
             }
@@ -699,35 +723,30 @@ async def admin_detalhes_avaliacao(
     try:
         debug_log(f"🔍 ADMIN/AVALIACAO-DETALHES: Buscando avaliação ID {avaliacao_id}")
 
-        # Buscar avaliação
-        avaliacao = db.query(Avaliacao).filter(Avaliacao.id == avaliacao_id).first()
+        # Avaliação e aluno numa única consulta (valores numéricos saem como estão no banco)
+        avaliacao = db.query(
+            Avaliacao.id,
+            func.coalesce(func.nullif(Avaliacao.nome, ""), Aluno.nome, "N/A").label("aluno_nome"),
+            func.coalesce(Aluno.email, "N/A").label("aluno_email"),
+            Avaliacao.data,
+            Avaliacao.peso_kg,
+            Avaliacao.altura_cm,
+            Avaliacao.imc,
+            func.coalesce(Avaliacao.observacoes_medidas, "").label("observacoes_medidas"),
+            Avaliacao.percentual_gordura,
+            Avaliacao.circunferencia_cintura,
+            Avaliacao.circunferencia_quadril
+        ).outerjoin(Aluno, Aluno.id == Avaliacao.aluno_id).filter(Avaliacao.id == avaliacao_id).first()
         if not avaliacao:
             debug_log(f"❌ ADMIN/AVALIACAO-DETALHES: Avaliação ID {avaliacao_id} não encontrada")
             raise HTTPException(status_code=404, detail="Avaliação não encontrada")
 
-        # Buscar dados do aluno
-        aluno = db.query(Aluno).filter(Aluno.id == avaliacao.aluno_id).first()
-
         # Converter datetime para formato local
         data_local = utc_to_sao_paulo(avaliacao.data) if avaliacao.data else None
-
-        # Preparar dados para retorno
-        resultado = {
-            "id": avaliacao.id,
-            "aluno_nome": avaliacao.nome or (aluno.nome if aluno else "N/A"),
-            "aluno_email": aluno.email if aluno else "N/A",
-            "data": data_local.strftime('%d/%m/%Y %H:%M') if data_local else "N/A",
-            "peso_kg": float(avaliacao.peso_kg) if avaliacao.peso_kg else None,
-            "altura_cm": float(avaliacao.altura_cm) if avaliacao.altura_cm else None,
-            "imc": float(avaliacao.imc) if avaliacao.imc else None,
-            "observacoes_medidas": avaliacao.observacoes_medidas or "",
-            "percentual_gordura": float(avaliacao.percentual_gordura) if avaliacao.percentual_gordura else None,
-            "circunferencia_cintura": float(avaliacao.circunferencia_cintura) if avaliacao.circunferencia_cintura else None,
-            "circunferencia_quadril": float(avaliacao.circunferencia_quadril) if avaliacao.circunferencia_quadril else None
-        }
+        resultado = {**avaliacao._asdict(), "data": data_local.strftime('%d/%m/%Y %H:%M') if data_local else "N/A"}
 
         info_log(f"✅ ADMIN/AVALIACAO-DETALHES: Retornando dados da avaliação ID {avaliacao_id}")
-        return JSONResponse(content=resultado)
+        return resultado
 
     except HTTPException:
         raise
@@ -4,22 +4,26 @@ Rotas de autenticação (login, logout, registro)
 from fastapi import APIRouter, Request, Form, Depends, Cookie
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 import structlog
 
 from app.core.database import get_db
-from app.models import Aluno, Usuario
+from app.core.responses import FastJSONRoute
+from app.models import Aluno
 from app.services.auth_service import (
-    verify_password, create_simple_jwt, verify_simple_jwt,
+    create_simple_jwt, verify_simple_jwt,
     ADMIN_PASSWORD_HASH, hash_password, create_session_token,
     invalidate_session
 )
+from app.services.login_service import LoginService
+from app.services.password_service import PasswordService
 from app.core.config import SECURE_COOKIE_CONFIG, SESSION_COOKIE_NAME, RATE_LIMITS
 from app.middleware.rate_limiting import setup_rate_limiting
 from app.utils.logging import debug_log
 
 # Configurar router
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 # Configurar templates
 templates = Jinja2Templates(directory="templates")
@@ -68,61 +72,55 @@ async def login_submit(
                 ip=client_ip,
                 user_agent=request.headers.get("user-agent", "unknown"))
 
-    # Verificar se é admin usando tabela usuarios
+    # Admin e aluno com o e-mail em uma única consulta (admin tem prioridade)
     try:
-        # Debug: verificar se consegue contar usuários
-        total_usuarios = db.query(Usuario).count()
-        logger.info("database_check", total_usuarios=total_usuarios, ip=client_ip)
-
-        # Debug: buscar por email específico
-        usuario_por_email = db.query(Usuario).filter(Usuario.email == email).first()
-        logger.info("email_check", email=email, usuario_email_found=bool(usuario_por_email), ip=client_ip)
-
-        # Consulta original
-        usuario = db.query(Usuario).filter(Usuario.email == email, Usuario.ativo == True, Usuario.tipo == "admin").first()
-        logger.info("admin_check", email=email, usuario_found=bool(usuario), ip=client_ip)
+        candidates = LoginService.find_candidates(db, email)
     except Exception as e:
         logger.error("database_error", error=str(e), ip=client_ip)
-        usuario = None
-
-    if usuario:
-        password_match = verify_password(password, usuario.senha_hash)
-        logger.info("password_check", email=email, password_match=password_match, password_length=len(password), hash_length=len(usuario.senha_hash), ip=client_ip)
-
-        if password_match:
+        candidates = []
+
+    for candidate in candidates:
+        # Contas de aluno só entram pelo login de aluno
+        if candidate.user_type == "aluno" and user_type != "aluno":
+            continue
+        # bcrypt fora do event loop (libera o GIL; não trava as outras requisições do worker)
+        password_match, new_hash = await run_in_threadpool(
+            PasswordService.verify_and_update, password, candidate.senha_hash
+        )
+        if not password_match:
+            logger.info("password_check", email=email, user_type=candidate.user_type,
+                        password_match=False, ip=client_ip)
+            continue
+
+        # Hash legado (SHA256) ou com custo antigo: regravar no esquema atual
+        if new_hash:
+            try:
+                LoginService.upgrade_hash(db, candidate, new_hash)
+            except Exception as e:
+                db.rollback()
+                logger.error("password_rehash_error", error=str(e), user_type=candidate.user_type,
+                             user_id=candidate.user_id, ip=client_ip)
+
+        if candidate.user_type == "admin":
             logger.info("admin_login_success", email=email, ip=client_ip)
-
-            # Criar token JWT
-            token = create_simple_jwt("admin", usuario.id)
-
-            response = RedirectResponse(url="/admin/dashboard", status_code=303)
-            response.set_cookie(
-                key=SESSION_COOKIE_NAME,
-                value=token,
-                **SECURE_COOKIE_CONFIG
-            )
-            return response
-
-    # Verificar login de aluno
-    if user_type == "aluno":
-        aluno = db.query(Aluno).filter(Aluno.email == email, Aluno.ativo == True).first()
-
-        if aluno and verify_password(password, aluno.senha_hash):
+            redirect_url = "/admin/dashboard"
+        else:
             logger.info("student_login_success",
                        email=email,
-                       user_id=aluno.id,
+                       user_id=candidate.user_id,
                        ip=client_ip)
+            redirect_url = "/meu-historico"
 
-            # Criar token JWT
-            token = create_simple_jwt("aluno", aluno.id)
+        # Criar token JWT
+        token = create_simple_jwt(candidate.user_type, candidate.user_id)
 
-            response = RedirectResponse(url="/meu-historico", status_code=303)
-            response.set_cookie(
-                key=SESSION_COOKIE_NAME,
-                value=token,
-                **SECURE_COOKIE_CONFIG
-            )
-            return response
+        response = RedirectResponse(url=redirect_url, status_code=303)
+        response.set_cookie(
+            key=SESSION_COOKIE_NAME,
+            value=token,
+            **SECURE_COOKIE_CONFIG
+        )
+        return response
 
     # Login falhou
     logger.warning("login_failed",
@@ -187,6 +185,7 @@ async def registro_submit(
     confirm_password: str = Form(...),
     telefone: str = Form(...),
     data_nascimento: str = Form(None),
+    sexo: str = Form(None),
     db: Session = Depends(get_db)
 ):
     """Processa registro de novos alunos"""
@@ -206,12 +205,12 @@ async def registro_submit(
                 {"request": request, "error": "Email já cadastrado"}
             )
 
-        # Criar novo aluno
+        # Criar novo aluno (hash bcrypt fora do event loop)
         novo_aluno = Aluno(
             nome=nome,
             email=email,
             telefone=telefone,
-            senha_hash=hash_password(password),
+            senha_hash=await run_in_threadpool(hash_password, password),
             ativo=True
         )
 
@@ -219,6 +218,9 @@ async def registro_submit(
             from datetime import datetime
             novo_aluno.data_nascimento = datetime.strptime(data_nascimento, "%Y-%m-%d").date()
 
+        if sexo in ("M", "F"):
+            novo_aluno.sexo = sexo
+
         db.add(novo_aluno)
         db.commit()
         db.refresh(novo_aluno)
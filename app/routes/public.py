@@ -5,12 +5,13 @@ from fastapi import APIRouter, Request, Depends
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.core.responses import FastJSONRoute
 from app.core.config import APP_NAME, APP_VERSION
 from app.utils.datetime_utils import now_sao_paulo
 
 
 # Configurar router
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.get("/health")
@@ -18,7 +19,7 @@ async def health_check(request: Request):
     """Health check endpoint para DigitalOcean App Platform"""
     return {
         "status": "healthy",
-        "timestamp": now_sao_paulo().isoformat(),
+        "timestamp": now_sao_paulo(),
         "service": "monipersonal-api",
         "version": APP_VERSION
     }
@@ -39,14 +40,14 @@ async def readiness_check(request: Request, db: Session = Depends(get_db)):
         db.execute(text("SELECT 1"))
         return {
             "status": "ready",
-            "timestamp": now_sao_paulo().isoformat(),
+            "timestamp": now_sao_paulo(),
             "database": "connected",
             "service": "monipersonal-api"
         }
     except Exception as e:
         return {
             "status": "not_ready",
-            "timestamp": now_sao_paulo().isoformat(),
+            "timestamp": now_sao_paulo(),
             "database": "disconnected",
             "error": str(e),
             "service": "monipersonal-api"
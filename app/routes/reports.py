@@ -0,0 +1,97 @@
+"""
+Rotas de relatórios de progresso em PDF
+"""
+from fastapi import APIRouter, Request, Depends, HTTPException
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+import urllib.parse
+
+from app.core.database import get_db
+from app.core.responses import FastJSONResponse, FastJSONRoute
+from app.core.config import REPORTS
+from app.models import Aluno, Avaliacao
+from app.middleware.auth import Principal, require_principal
+from app.services.report_service import ReportQueueFullError, ReportService, report_manager
+from app.services.student_search import StudentSearchService
+from app.utils.logging import debug_log
+
+# Configurar router
+router = APIRouter(tags=["relatórios"], route_class=FastJSONRoute)
+
+
+def _pdf_response(path: str, nome: str) -> FileResponse:
+    filename = f"relatorio_{nome.replace(' ', '_')}.pdf"
+    return FileResponse(path, media_type="application/pdf", filename=filename)
+
+
+def _resolve_aluno(db: Session, nome: str, principal: Principal) -> Aluno:
+    """Admin acessa qualquer aluno; aluno só acessa o próprio relatório"""
+    if principal.user_type == "aluno":
+        aluno = principal.user
+        if aluno.nome != nome:
+            raise HTTPException(status_code=403, detail="Acesso negado")
+        return aluno
+
+    aluno = StudentSearchService.resolve(db, nome)
+    if not aluno:
+        raise HTTPException(status_code=404, detail="Aluno não encontrado")
+    return aluno
+
+
+@router.get("/comparar/{nome}/pdf")
+async def comparar_pdf(
+    request: Request,
+    nome: str,
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(require_principal(['admin', 'aluno'], load_user=True))
+):
+    """PDF de progresso do aluno (servido do disco quando já renderizado)"""
+    nome = urllib.parse.unquote(nome)
+    aluno = _resolve_aluno(db, nome, principal)
+
+    ultima_avaliacao_id = db.query(func.max(Avaliacao.id)).filter(
+        Avaliacao.aluno_id == aluno.id
+    ).scalar()
+    if ultima_avaliacao_id is None:
+        raise HTTPException(status_code=404, detail="Aluno sem avaliações")
+
+    key = ReportService.content_key(aluno.id, ultima_avaliacao_id)
+    path = report_manager.store.get(key)
+    if path:
+        debug_log(f"📄 RELATORIO: PDF de {aluno.nome} servido do cache")
+        return _pdf_response(path, aluno.nome)
+
+    try:
+        job = report_manager.submit(
+            key,
+            ReportService.load_context(db, aluno),
+            owner_id=aluno.id,
+            download_url=f"/comparar/{urllib.parse.quote(aluno.nome)}/pdf"
+        )
+    except ReportQueueFullError:
+        return FastJSONResponse(
+            {"detail": "Muitos relatórios em geração, tente novamente em instantes"},
+            status_code=503,
+            headers={"Retry-After": "10"}
+        )
+
+    job = await report_manager.wait(job, REPORTS["wait_seconds"])
+    if job.status == "done":
+        return _pdf_response(job.path, aluno.nome)
+    if job.status == "failed":
+        return FastJSONResponse(job.to_dict(), status_code=500)
+    return FastJSONResponse(job.to_dict(), status_code=202)
+
+
+@router.get("/relatorios/jobs/{job_id}")
+async def status_relatorio(
+    request: Request,
+    job_id: str,
+    principal: Principal = Depends(require_principal(['admin', 'aluno']))
+):
+    """Status de um job de renderização de relatório"""
+    job = report_manager.get(job_id)
+    if not job or (principal.user_type == "aluno" and principal.user_id != job.owner_id):
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job.to_dict()
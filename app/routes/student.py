@@ -3,21 +3,22 @@ Rotas para alunos (formulário, histórico, etc.)
 """
 from fastapi import APIRouter, Request, Form, Depends, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse
+from typing import Optional
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from datetime import datetime, date
 import structlog
 
 from app.core.database import get_db
-from app.models import Aluno, Avaliacao
-from app.middleware.auth import require_auth
-from app.services.auth_service import verify_simple_jwt
-from app.core.config import SESSION_COOKIE_NAME
+from app.core.responses import FastJSONRoute
+from app.models import Avaliacao
+from app.middleware.auth import Principal, require_principal
 from app.utils.logging import info_log, debug_log, error_log
 from app.utils.datetime_utils import now_sao_paulo, utc_to_sao_paulo
+from app.services.series_service import SeriesService
 
 # Configurar router
-router = APIRouter(tags=["student"])
+router = APIRouter(tags=["student"], route_class=FastJSONRoute)
 
 # Configurar templates
 templates = Jinja2Templates(directory="templates")
@@ -26,59 +27,40 @@ templates = Jinja2Templates(directory="templates")
 logger = structlog.get_logger()
 
 
+def historico_row(av: Avaliacao) -> dict:
+    """Linha do histórico do aluno apenas com tipos básicos (usada no template)"""
+    data_local = utc_to_sao_paulo(av.data) if av.data else None
+    return {
+        'id': av.id,
+        'peso_kg': float(av.peso_kg) if av.peso_kg else None,
+        'altura_cm': float(av.altura_cm) if av.altura_cm else None,
+        'imc': float(av.imc) if av.imc else None,
+        'data': av.data.strftime('%Y-%m-%d %H:%M:%S') if av.data else None,
+        'data_local': data_local.strftime('%Y-%m-%d %H:%M:%S') if data_local else None,
+        'observacoes_medidas': str(av.observacoes_medidas) if av.observacoes_medidas else '',
+        'percentual_gordura': float(av.percentual_gordura) if av.percentual_gordura else None,
+        'circunferencia_cintura': float(av.circunferencia_cintura) if av.circunferencia_cintura else None,
+        'circunferencia_quadril': float(av.circunferencia_quadril) if av.circunferencia_quadril else None
+    }
+
+
 @router.get("/meu-historico", response_class=HTMLResponse)
-@require_auth(['aluno'])
 async def meu_historico(
     request: Request,
-    db: Session = Depends(get_db),
-    session_data=None,
-    jwt_data=None
+    principal: Principal = Depends(require_principal(['aluno'], load_user=True)),
+    db: Session = Depends(get_db)
 ):
     """Histórico pessoal do aluno logado"""
     try:
-        # Obter ID do aluno logado
-        aluno_id = None
-        if jwt_data:
-            aluno_id = jwt_data.get("user_id")
-        elif session_data:
-            aluno_id = session_data.get("user_id")
-
-        if not aluno_id:
-            debug_log("❌ HISTORICO: ID do aluno não encontrado")
-            return RedirectResponse(url="/login")
-
-        # Buscar aluno
-        aluno = db.query(Aluno).filter(Aluno.id == aluno_id).first()
-        if not aluno:
-            debug_log(f"❌ HISTORICO: Aluno ID {aluno_id} não encontrado")
-            return RedirectResponse(url="/login")
+        aluno = principal.user
 
         # Buscar avaliações do aluno
         avaliacoes_raw = db.query(Avaliacao).filter(
-            Avaliacao.aluno_id == aluno_id
+            Avaliacao.aluno_id == aluno.id
         ).order_by(Avaliacao.data.desc()).all()
 
         # Converter tudo para tipos básicos Python para evitar problemas de serialização
-        avaliacoes = []
-        for av in avaliacoes_raw:
-            data_local = utc_to_sao_paulo(av.data) if av.data else None
-
-            # Criar dicionário com apenas tipos básicos
-            avaliacao_dict = {
-                'id': av.id,
-                'peso_kg': float(av.peso_kg) if av.peso_kg else None,
-                'altura_cm': float(av.altura_cm) if av.altura_cm else None,
-                'imc': float(av.imc) if av.imc else None,
-                'data': av.data.strftime('%Y-%m-%d %H:%M:%S') if av.data else None,
-                'data_local': data_local.strftime('%Y-%m-%d %H:%M:%S') if data_local else None,
-                'observacoes_medidas': str(av.observacoes_medidas) if av.observacoes_medidas else '',
-                'percentual_gordura': float(av.percentual_gordura) if av.percentual_gordura else None,
-                'circunferencia_cintura': float(av.circunferencia_cintura) if av.circunferencia_cintura else None,
-                'circunferencia_quadril': float(av.circunferencia_quadril) if av.circunferencia_quadril else None
-            }
-
-            # Usar dicionário simples (sem SimpleNamespace)
-            avaliacoes.append(avaliacao_dict)
+        avaliacoes = [historico_row(av) for av in avaliacoes_raw]
 
         try:
             info_log(f"📊 HISTORICO: {len(avaliacoes)} avaliações para {aluno.nome}")
@@ -116,31 +98,41 @@ async def meu_historico(
         )
 
 
-@router.get("/formulario", response_class=HTMLResponse)
-@require_auth(['aluno'])
-async def formulario_page(
+@router.get("/meu-historico/series")
+async def minhas_series(
     request: Request,
-    db: Session = Depends(get_db),
-    session_data=None,
-    jwt_data=None
+    metricas: str = "peso_kg,imc",
+    pontos: int = 100,
+    inicio: Optional[date] = None,
+    fim: Optional[date] = None,
+    principal: Principal = Depends(require_principal(['aluno'])),
+    db: Session = Depends(get_db)
 ):
-    """Página do formulário de avaliação"""
+    """Séries temporais do aluno logado para os gráficos de progresso"""
+    aluno_id = principal.user_id
+    if not aluno_id:
+        raise HTTPException(status_code=401, detail="Não autenticado")
+
     try:
-        # Obter ID do aluno logado
-        aluno_id = None
-        if jwt_data:
-            aluno_id = jwt_data.get("user_id")
-        elif session_data:
-            aluno_id = session_data.get("user_id")
+        metrics = SeriesService.parse_metrics(metricas)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        if not aluno_id:
-            return RedirectResponse(url="/login")
+    return SeriesService.get_student_series(
+        db, aluno_id, metrics, pontos,
+        inicio=datetime.combine(inicio, datetime.min.time()) if inicio else None,
+        fim=datetime.combine(fim, datetime.max.time()) if fim else None
+    )
 
-        # Buscar dados completos do aluno
-        aluno = db.query(Aluno).filter(Aluno.id == aluno_id).first()
-        if not aluno:
-            return RedirectResponse(url="/login")
 
+@router.get("/formulario", response_class=HTMLResponse)
+async def formulario_page(
+    request: Request,
+    principal: Principal = Depends(require_principal(['aluno'], load_user=True))
+):
+    """Página do formulário de avaliação"""
+    try:
+        aluno = principal.user
         debug_log(f"📝 FORMULARIO: Página acessada por {aluno.nome}")
 
         return templates.TemplateResponse(
@@ -176,31 +168,18 @@ async def formulario_submit(
     altura: float = Form(...),
     observacoes: str = Form(""),
 
+    principal: Principal = Depends(require_principal(['aluno'], load_user=True)),
     db: Session = Depends(get_db)
 ):
     """Processa submissão do formulário de avaliação"""
     try:
         debug_log(f"📝 FORMULARIO/SUBMIT: Recebendo dados - peso: {peso}kg, altura: {altura}cm")
 
-        # Obter token de sessão
-        session_token = request.cookies.get(SESSION_COOKIE_NAME)
-        jwt_data = verify_simple_jwt(session_token) if session_token else None
-
-        if not jwt_data or jwt_data.get("user_type") != "aluno":
-            debug_log("❌ FORMULARIO/SUBMIT: Usuário não autenticado")
-            return RedirectResponse(url="/login", status_code=303)
-
-        aluno_id = jwt_data.get("user_id")
-
-        # Buscar ou criar aluno
-        aluno = db.query(Aluno).filter(Aluno.id == aluno_id).first()
-        if not aluno:
-            error_log(f"❌ FORMULARIO/SUBMIT: Aluno ID {aluno_id} não encontrado")
-            return RedirectResponse(url="/login", status_code=303)
+        aluno = principal.user
 
         # Criar nova avaliação
         nova_avaliacao = Avaliacao(
-            aluno_id=aluno_id,
+            aluno_id=aluno.id,
             nome=aluno.nome,  # Preencher com nome do aluno
             data=now_sao_paulo(),
             peso_kg=peso,
@@ -245,29 +224,13 @@ async def formulario_submit(
 
 
 @router.get("/perfil", response_class=HTMLResponse)
-@require_auth(['aluno'])
 async def perfil_aluno(
     request: Request,
-    db: Session = Depends(get_db),
-    session_data=None,
-    jwt_data=None
+    principal: Principal = Depends(require_principal(['aluno'], load_user=True))
 ):
     """Página de perfil do aluno"""
     try:
-        # Obter ID do aluno logado
-        aluno_id = None
-        if jwt_data:
-            aluno_id = jwt_data.get("user_id")
-        elif session_data:
-            aluno_id = session_data.get("user_id")
-
-        if not aluno_id:
-            return RedirectResponse(url="/login")
-
-        # Buscar aluno
-        aluno = db.query(Aluno).filter(Aluno.id == aluno_id).first()
-        if not aluno:
-            return RedirectResponse(url="/login")
+        aluno = principal.user
 
         debug_log(f"👤 PERFIL: Carregando perfil de {aluno.nome}")
 
@@ -0,0 +1,235 @@
+"""
+Agregados diários de atividade (tabela `daily_activity`)
+
+Cada avaliação/aluno inserido incrementa a linha do seu dia na mesma transação
+do INSERT (upsert ON CONFLICT), de modo que os contadores por período do
+dashboard são somas sobre poucas dezenas de linhas em vez de varreduras por
+intervalo em `avaliacoes`. Alterações que os listeners não acompanham (UPDATE
+de data/IMC, cargas em massa via Core) são corrigidas pela reconciliação
+noturna, que recalcula os agregados a partir das tabelas de origem.
+"""
+import time
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import DateTime, and_, case, cast, delete, event, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.config import SAO_PAULO_TZ
+from app.models import Aluno, Avaliacao, DailyActivity
+from app.utils.datetime_utils import now_sao_paulo
+from app.utils.logging import info_log
+
+# Faixas de IMC (OMS), mesmas do histograma das análises: (coluna, limite superior)
+IMC_BUCKETS = (
+    ("imc_baixo_peso", 18.5),
+    ("imc_normal", 25.0),
+    ("imc_sobrepeso", 30.0),
+    ("imc_obesidade", None),
+)
+COUNTER_COLUMNS = ("avaliacoes", "novos_alunos") + tuple(name for name, _ in IMC_BUCKETS) + ("imc_soma",)
+
+
+def local_day(value) -> Optional[date]:
+    """Dia local de um datetime (com timezone é convertido para America/Sao_Paulo)"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(SAO_PAULO_TZ)
+        return value.date()
+    return value
+
+
+def imc_bucket(imc: Optional[float]) -> Optional[str]:
+    """Coluna de faixa de IMC do valor (None se não informado)"""
+    if imc is None:
+        return None
+    for name, limite in IMC_BUCKETS:
+        if limite is None or imc < limite:
+            return name
+    return None
+
+
+def local_date_expr(column, dialect_name: str):
+    """
+    Dia local (America/Sao_Paulo) de uma coluna DateTime no SQL, como `local_day`
+
+    O PostgreSQL converte o horário com offset para o fuso da sessão ao gravar
+    em `timestamp` (UTC no Cloud SQL): a coluna volta a timestamptz no fuso da
+    sessão e é levada a São Paulo antes do date(). O SQLite grava o horário
+    local de now_sao_paulo() sem o offset, então date() já é o dia local.
+    """
+    if dialect_name == "postgresql":
+        return func.date(func.timezone(SAO_PAULO_TZ.key, cast(column, DateTime(timezone=True))))
+    return func.date(column)
+
+
+def _as_date(value) -> date:
+    """func.date() retorna string no SQLite e date no PostgreSQL"""
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+# ============= INCREMENTO NO INSERT =============
+
+def increment_day(connection, dia: date, deltas: Dict[str, float]):
+    """Soma `deltas` aos contadores do dia, criando a linha se necessário (upsert)"""
+    dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(DailyActivity.__table__).values(dia=dia, **{k: max(v, 0) for k, v in deltas.items()})
+    table = DailyActivity.__table__
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=[table.c.dia],
+        set_={name: table.c[name] + delta for name, delta in deltas.items()}
+    ))
+
+
+def _evaluation_deltas(target: Avaliacao, sign: int) -> Dict[str, float]:
+    deltas = {"avaliacoes": sign}
+    bucket = imc_bucket(target.imc)
+    if bucket:
+        deltas[bucket] = sign
+        deltas["imc_soma"] = sign * target.imc
+    return deltas
+
+
+def _on_evaluation_insert(mapper, connection, target):
+    increment_day(connection, local_day(target.data), _evaluation_deltas(target, 1))
+
+
+def _on_evaluation_delete(mapper, connection, target):
+    increment_day(connection, local_day(target.data), _evaluation_deltas(target, -1))
+
+
+def _on_student_insert(mapper, connection, target):
+    increment_day(connection, local_day(target.created_at), {"novos_alunos": 1})
+
+
+def _on_student_delete(mapper, connection, target):
+    increment_day(connection, local_day(target.created_at), {"novos_alunos": -1})
+
+
+event.listen(Avaliacao, "after_insert", _on_evaluation_insert)
+event.listen(Avaliacao, "after_delete", _on_evaluation_delete)
+event.listen(Aluno, "after_insert", _on_student_insert)
+event.listen(Aluno, "after_delete", _on_student_delete)
+
+
+# ============= SERVIÇO =============
+
+class ActivityService:
+    """Leitura e reconciliação dos agregados diários"""
+
+    @staticmethod
+    def window_totals(db: Session, janelas: Dict[str, int]) -> Dict[str, int]:
+        """
+        Avaliações nas janelas pedidas numa única consulta
+
+        Args:
+            janelas: nome -> quantidade de dias corridos incluindo hoje (1 = hoje)
+        """
+        hoje = now_sao_paulo().date()
+        maior = max(janelas.values())
+        row = db.execute(
+            select(*[
+                func.coalesce(func.sum(case(
+                    (DailyActivity.dia >= hoje - timedelta(days=dias - 1), DailyActivity.avaliacoes),
+                    else_=0
+                )), 0).label(nome)
+                for nome, dias in janelas.items()
+            ]).where(DailyActivity.dia >= hoje - timedelta(days=maior - 1))
+        ).one()
+        return {nome: int(row._mapping[nome]) for nome in janelas}
+
+    @staticmethod
+    def imc_medio(db: Session) -> Optional[float]:
+        """IMC médio de todas as avaliações (soma e contagem vêm dos agregados)"""
+        soma, total = db.execute(
+            select(
+                func.sum(DailyActivity.imc_soma),
+                func.sum(sum(getattr(DailyActivity, name) for name, _ in IMC_BUCKETS))
+            )
+        ).one()
+        return float(soma) / total if total else None
+
+    @staticmethod
+    def daily_series(db: Session, dias: int = 30) -> List[Dict[str, Any]]:
+        """Avaliações e novos alunos por dia nos últimos `dias` dias (dias sem atividade = 0)"""
+        hoje = now_sao_paulo().date()
+        inicio = hoje - timedelta(days=dias - 1)
+        rows = {
+            _as_date(dia): (avaliacoes, novos)
+            for dia, avaliacoes, novos in db.execute(
+                select(DailyActivity.dia, DailyActivity.avaliacoes, DailyActivity.novos_alunos)
+                .where(DailyActivity.dia >= inicio)
+            )
+        }
+        series = []
+        for offset in range(dias):
+            dia = inicio + timedelta(days=offset)
+            avaliacoes, novos = rows.get(dia, (0, 0))
+            series.append({"dia": dia.isoformat(), "avaliacoes": avaliacoes, "novos_alunos": novos})
+        return series
+
+    @staticmethod
+    def reconcile(db: Session, dias: Optional[int] = None) -> int:
+        """
+        Recalcula os agregados a partir de `avaliacoes` e `alunos`
+
+        Dois GROUP BY por dia (um por tabela de origem) e a substituição das
+        linhas do período na mesma transação. Com `dias` só os últimos N dias
+        são recalculados; sem, a tabela inteira é reconstruída.
+
+        Returns:
+            int: quantidade de dias gravados
+        """
+        started = time.perf_counter()
+        inicio = now_sao_paulo().date() - timedelta(days=dias - 1) if dias else None
+        # Meia-noite local com offset: cada dialeto a converte como converte a coluna
+        desde = datetime.combine(inicio, dtime.min, tzinfo=SAO_PAULO_TZ) if inicio else None
+        dialect_name = db.get_bind().dialect.name
+
+        imc = Avaliacao.imc
+        avaliacoes_dia = local_date_expr(Avaliacao.data, dialect_name)
+        avaliacoes = select(
+            avaliacoes_dia,
+            func.count(Avaliacao.id),
+            func.count(case((imc < 18.5, 1))),
+            func.count(case((and_(imc >= 18.5, imc < 25.0), 1))),
+            func.count(case((and_(imc >= 25.0, imc < 30.0), 1))),
+            func.count(case((imc >= 30.0, 1))),
+            func.coalesce(func.sum(imc), 0.0),
+        ).group_by(avaliacoes_dia)
+        alunos_dia = local_date_expr(Aluno.created_at, dialect_name)
+        alunos = select(alunos_dia, func.count(Aluno.id)).group_by(alunos_dia)
+        if desde is not None:
+            avaliacoes = avaliacoes.where(Avaliacao.data >= desde)
+            alunos = alunos.where(Aluno.created_at >= desde)
+
+        dias_agregados: Dict[date, Dict[str, Any]] = {}
+
+        def linha(dia) -> Dict[str, Any]:
+            dia = _as_date(dia)
+            return dias_agregados.setdefault(dia, {"dia": dia, **{name: 0 for name in COUNTER_COLUMNS}})
+
+        for dia, total, baixo, normal, sobrepeso, obesidade, soma in db.execute(avaliacoes):
+            linha(dia).update(
+                avaliacoes=total, imc_baixo_peso=baixo, imc_normal=normal,
+                imc_sobrepeso=sobrepeso, imc_obesidade=obesidade, imc_soma=float(soma)
+            )
+        for dia, total in db.execute(alunos):
+            linha(dia)["novos_alunos"] = total
+
+        stmt = delete(DailyActivity)
+        if inicio is not None:
+            stmt = stmt.where(DailyActivity.dia >= inicio)
+        db.execute(stmt)
+        if dias_agregados:
+            db.execute(insert(DailyActivity), list(dias_agregados.values()))
+        db.commit()
+
+        info_log(
+            f"📅 ActivityService: {len(dias_agregados)} dias reconciliados "
+            f"({'últimos ' + str(dias) + ' dias' if dias else 'completo'}) em {time.perf_counter() - started:.2f}s"
+        )
+        return len(dias_agregados)
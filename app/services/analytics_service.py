@@ -0,0 +1,322 @@
+"""
+Análises de coorte vetorizadas (NumPy) para /admin/relatorios
+
+As colunas numéricas das avaliações são carregadas numa única consulta
+colunar e mantidas em cache como arrays compactos; percentis, variações por
+período, tendências por aluno e histogramas são calculados sobre esses arrays,
+sem laços Python por linha.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import ANALYTICS_CACHE_TTL
+from app.core.database import SessionLocal
+from app.models import Avaliacao
+from app.utils.datetime_utils import now_sao_paulo
+from app.utils.lazy_import import lazy_import
+from app.utils.logging import debug_log, info_log
+from app.utils.singleflight import single_flight
+
+np = lazy_import("numpy")  # carregado na primeira análise, fora do cold start
+
+METRICS = ("peso_kg", "imc", "percentual_gordura")
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# Faixas de IMC (OMS) usadas no histograma e em /admin/stats
+IMC_EDGES = (0.0, 18.5, 25.0, 30.0, float("inf"))
+IMC_LABELS = ("baixo_peso", "normal", "sobrepeso", "obesidade")
+
+# Variação de peso (kg/semana) abaixo da qual o aluno é considerado estável
+STABLE_KG_PER_WEEK = 0.1
+SLOPE_EDGES = (float("-inf"), -1.0, -0.5, -STABLE_KG_PER_WEEK, STABLE_KG_PER_WEEK, 0.5, 1.0, float("inf"))
+SLOPE_LABELS = ("< -1", "-1 a -0,5", "-0,5 a -0,1", "estável", "0,1 a 0,5", "0,5 a 1", "> 1")
+
+MONTHS_SHOWN = 12
+
+
+# ============= KERNELS VETORIZADOS =============
+# Todas as funções recebem arrays ordenados por (aluno_id, data).
+
+def group_starts(ids: np.ndarray) -> np.ndarray:
+    """Índice da primeira linha de cada aluno"""
+    if ids.size == 0:
+        return np.empty(0, dtype=np.intp)
+    return np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+
+
+def first_last_valid(ids: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Primeiro e último valor não nulo de cada aluno
+
+    Returns:
+        (aluno_ids, primeiro, ultimo, quantidade de valores válidos)
+    """
+    idx = np.flatnonzero(~np.isnan(values))
+    if idx.size == 0:
+        empty = np.empty(0)
+        return empty.astype(ids.dtype), empty, empty, empty.astype(np.intp)
+    valid_ids = ids[idx]
+    starts = group_starts(valid_ids)
+    ends = np.r_[starts[1:], valid_ids.size] - 1
+    return valid_ids[starts], values[idx[starts]], values[idx[ends]], ends - starts + 1
+
+
+def period_changes(ids: np.ndarray, months: np.ndarray, values: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Variação média entre avaliações consecutivas do mesmo aluno, por mês
+
+    Cada variação é atribuída ao mês da avaliação mais recente do par.
+    """
+    idx = np.flatnonzero(~np.isnan(values))
+    same_student = ids[idx[1:]] == ids[idx[:-1]]
+    later = idx[1:][same_student]
+    deltas = values[later] - values[idx[:-1][same_student]]
+    if deltas.size == 0:
+        return {"meses": np.empty(0, dtype="datetime64[M]"), "media": np.empty(0), "n": np.empty(0, dtype=np.intp)}
+
+    meses, inverse = np.unique(months[later], return_inverse=True)
+    n = np.bincount(inverse)
+    return {"meses": meses, "media": np.bincount(inverse, weights=deltas) / n, "n": n}
+
+
+def trend_slopes(ids: np.ndarray, days: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Inclinação da regressão linear (unidade por dia) de cada aluno
+
+    Mínimos quadrados por grupo com somas acumuladas via bincount; alunos com
+    menos de duas avaliações válidas (ou todas no mesmo dia) são descartados.
+    """
+    idx = np.flatnonzero(~np.isnan(values))
+    if idx.size == 0:
+        return np.empty(0, dtype=ids.dtype), np.empty(0)
+
+    valid_ids = ids[idx]
+    starts = group_starts(valid_ids)
+    group = np.cumsum(np.r_[False, valid_ids[1:] != valid_ids[:-1]])
+
+    # Tempo relativo à primeira avaliação do aluno (evita perda de precisão)
+    t = days[idx] - days[idx[starts]][group]
+    y = values[idx].astype(np.float64)
+
+    n = np.bincount(group).astype(np.float64)
+    st = np.bincount(group, weights=t)
+    sy = np.bincount(group, weights=y)
+    stt = np.bincount(group, weights=t * t)
+    sty = np.bincount(group, weights=t * y)
+
+    denominator = n * stt - st * st
+    ok = (n >= 2) & (denominator > 0)
+    slopes = (n[ok] * sty[ok] - st[ok] * sy[ok]) / denominator[ok]
+    return valid_ids[starts][ok], slopes
+
+
+def cohort_percentiles(cohorts: np.ndarray, values: np.ndarray) -> Dict[str, np.ndarray]:
+    """Percentis de `values` por coorte (valores já agregados por aluno)"""
+    order = np.argsort(cohorts, kind="stable")
+    cohorts, values = cohorts[order], values[order]
+    keys, starts, counts = np.unique(cohorts, return_index=True, return_counts=True)
+    table = np.array([
+        np.percentile(chunk, PERCENTILES) for chunk in np.split(values, starts[1:])
+    ]) if keys.size else np.empty((0, len(PERCENTILES)))
+    return {"coortes": keys, "alunos": counts, "percentis": table}
+
+
+def imc_histogram(imc: np.ndarray) -> Dict[str, int]:
+    counts, _ = np.histogram(imc[~np.isnan(imc)], bins=IMC_EDGES)
+    return dict(zip(IMC_LABELS, counts.tolist()))
+
+
+# ============= CARGA E CACHE =============
+
+def load_columns(db: Session) -> Dict[str, np.ndarray]:
+    """Colunas numéricas de todas as avaliações, ordenadas por aluno e data"""
+    rows = db.query(
+        Avaliacao.aluno_id, Avaliacao.data, *[getattr(Avaliacao, m) for m in METRICS]
+    ).filter(
+        Avaliacao.aluno_id.isnot(None)
+    ).order_by(Avaliacao.aluno_id, Avaliacao.data).all()
+
+    columns = list(zip(*rows)) or [()] * (2 + len(METRICS))
+    arrays = {
+        "aluno_id": np.array(columns[0], dtype=np.int32),
+        "data": np.array(columns[1], dtype="datetime64[D]"),
+    }
+    for metric, values in zip(METRICS, columns[2:]):
+        arrays[metric] = np.array(values, dtype=np.float32)  # None -> NaN
+    return arrays
+
+
+class AnalyticsCache:
+    """Último resultado calculado, invalidado por TTL ou por commit de avaliações"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.version = 0
+        self._entry: Optional[Tuple[int, float, Dict[str, np.ndarray], Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[Tuple[Dict[str, np.ndarray], Dict[str, Any]]]:
+        entry = self._entry
+        if entry is None or entry[0] != self.version or time.monotonic() - entry[1] > self.ttl:
+            return None
+        return entry[2], entry[3]
+
+    def set(self, version: int, columns: Dict[str, np.ndarray], result: Dict[str, Any]):
+        with self._lock:
+            self._entry = (version, time.monotonic(), columns, result)
+
+    def invalidate(self):
+        with self._lock:
+            self.version += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        entry = self._entry
+        nbytes = sum(a.nbytes for a in entry[2].values()) if entry else 0
+        return {"version": self.version, "cached": self.get() is not None, "column_bytes": nbytes}
+
+
+analytics_cache = AnalyticsCache(ANALYTICS_CACHE_TTL)
+
+
+class AnalyticsService:
+    """Análises de coorte sobre as avaliações"""
+
+    @staticmethod
+    def compute(columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
+        """Calcula todas as análises a partir das colunas (resultado em arrays)"""
+        ids = columns["aluno_id"]
+        months = columns["data"].astype("datetime64[M]")
+
+        # Percentis do valor mais recente de cada aluno
+        latest = {m: first_last_valid(ids, columns[m]) for m in METRICS}
+        percentis = {
+            m: np.nanpercentile(latest[m][2], PERCENTILES) if latest[m][2].size else np.full(len(PERCENTILES), np.nan)
+            for m in METRICS
+        }
+
+        # Variação média por mês (peso e IMC)
+        variacao = {m: period_changes(ids, months, columns[m]) for m in ("peso_kg", "imc")}
+        meses = np.union1d(variacao["peso_kg"]["meses"], variacao["imc"]["meses"])[-MONTHS_SHOWN:]
+        variacao_mensal = {"meses": meses.astype(str)}
+        for m, changes in variacao.items():
+            aligned = np.full(meses.size, np.nan)
+            keep = np.isin(changes["meses"], meses)
+            aligned[np.searchsorted(meses, changes["meses"][keep])] = changes["media"][keep]
+            variacao_mensal[m] = aligned
+
+        # Tendência de peso por aluno (kg/semana)
+        days = columns["data"].astype(np.int64).astype(np.float64)
+        slope_ids, slopes = trend_slopes(ids, days, columns["peso_kg"])
+        slopes = (slopes * 7).astype(np.float32)
+        slope_counts, _ = np.histogram(slopes, bins=SLOPE_EDGES)
+
+        # Coortes pelo mês da primeira avaliação: variação total de peso
+        starts = group_starts(ids)
+        peso_ids, primeiro, ultimo, n_validos = latest["peso_kg"]
+        com_progresso = n_validos >= 2
+        entry_month = months[starts][np.searchsorted(ids[starts], peso_ids[com_progresso])]
+        coortes = cohort_percentiles(entry_month, (ultimo - primeiro)[com_progresso])
+
+        peso_recente = latest["peso_kg"][2]
+        peso_counts, peso_edges = np.histogram(peso_recente, bins=10) if peso_recente.size else (np.empty(0), np.empty(0))
+
+        return {
+            "n_avaliacoes": int(ids.size),
+            "n_alunos": int(starts.size),
+            "percentis": {"p": list(PERCENTILES), **percentis},
+            "variacao_mensal": variacao_mensal,
+            "tendencias": {
+                "aluno_id": slope_ids.astype(np.int32),
+                "kg_semana": slopes,
+                "faixas": SLOPE_LABELS,
+                "contagem": slope_counts,
+                "perdendo": int((slopes < -STABLE_KG_PER_WEEK).sum()),
+                "estaveis": int((np.abs(slopes) <= STABLE_KG_PER_WEEK).sum()),
+                "ganhando": int((slopes > STABLE_KG_PER_WEEK).sum()),
+            },
+            "coortes": {
+                "meses": coortes["coortes"].astype(str),
+                "alunos": coortes["alunos"],
+                "variacao_peso": coortes["percentis"],
+            },
+            "histogramas": {
+                "imc": imc_histogram(columns["imc"]),
+                "peso_kg": {"contagem": peso_counts, "limites": peso_edges},
+            },
+            "gerado_em": now_sao_paulo().isoformat(),
+        }
+
+    @staticmethod
+    @single_flight()
+    def _load_and_compute(db: Session) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+        version = analytics_cache.version
+        started = time.perf_counter()
+        columns = load_columns(db)
+        result = AnalyticsService.compute(columns)
+        analytics_cache.set(version, columns, result)
+        info_log(
+            f"📊 AnalyticsService: {result['n_avaliacoes']} avaliações de {result['n_alunos']} alunos "
+            f"analisadas em {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+        return columns, result
+
+    @staticmethod
+    def get_columns_and_result(db: Session) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+        cached = analytics_cache.get()
+        if cached is not None:
+            debug_log("📊 AnalyticsService: Análises servidas do cache")
+            return cached
+        return AnalyticsService._load_and_compute(db)
+
+    @staticmethod
+    def get_cohort_analytics(db: Session) -> Dict[str, Any]:
+        return AnalyticsService.get_columns_and_result(db)[1]
+
+    @staticmethod
+    def get_imc_distribution(db: Session) -> Dict[str, int]:
+        """Contagem de avaliações por faixa de IMC (todas as avaliações)"""
+        return AnalyticsService.get_columns_and_result(db)[1]["histogramas"]["imc"]
+
+    @staticmethod
+    def to_json(value: Any) -> Any:
+        """Converte o resultado (arrays NumPy) em tipos serializáveis, NaN -> None"""
+        if isinstance(value, dict):
+            return {k: AnalyticsService.to_json(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [AnalyticsService.to_json(v) for v in value]
+        if isinstance(value, np.ndarray):
+            return AnalyticsService.to_json(value.tolist())
+        if isinstance(value, (float, np.floating)):
+            return None if np.isnan(value) else round(float(value), 3)
+        if isinstance(value, np.integer):
+            return int(value)
+        return value
+
+
+# ============= INVALIDAÇÃO DO CACHE =============
+
+def _mark_analytics_dirty(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info["analytics_dirty"] = True
+
+
+def _invalidate_after_commit(session):
+    if session.info.pop("analytics_dirty", False):
+        analytics_cache.invalidate()
+
+
+def _discard_after_rollback(session):
+    session.info.pop("analytics_dirty", None)
+
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(Avaliacao, _event_name, _mark_analytics_dirty)
+event.listen(SessionLocal, "after_commit", _invalidate_after_commit)
+event.listen(SessionLocal, "after_rollback", _discard_after_rollback)
@@ -0,0 +1,89 @@
+"""
+Armazenamento em disco de artefatos gerados (PDFs), com despejo por tamanho
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from typing import Optional
+
+from app.utils.logging import info_log
+
+
+class ArtifactStore:
+    """
+    Diretório de artefatos endereçados por chave de conteúdo
+
+    Cada chave vira um arquivo `<sha1>.<ext>`. Quando o total passa de
+    `max_bytes`, os arquivos acessados há mais tempo (mtime) são removidos.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, extension: str = "pdf"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.{self.extension}")
+
+    def get(self, key: str) -> Optional[str]:
+        """Caminho do artefato, se existir (marca como usado recentemente)"""
+        path = self.path_for(key)
+        try:
+            os.utime(path, None)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, content: bytes) -> str:
+        """Grava o artefato de forma atômica e aplica o limite de tamanho"""
+        path = self.path_for(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(content)
+        os.replace(tmp_path, path)
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Remove os artefatos menos recentes até caber em max_bytes"""
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.directory):
+                if not name.endswith(f".{self.extension}"):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+
+        if removed:
+            info_log(f"🧹 ArtifactStore: {removed} artefatos removidos de {self.directory}")
+        return removed
+
+    def snapshot(self) -> dict:
+        files = [
+            os.path.getsize(os.path.join(self.directory, name))
+            for name in os.listdir(self.directory)
+            if name.endswith(f".{self.extension}")
+        ]
+        return {"files": len(files), "bytes": sum(files), "max_bytes": self.max_bytes}
@@ -9,7 +9,8 @@ import json
 import os
 from fastapi import HTTPException
 
-from app.core.config import pwd_context, active_sessions
+from app.core.config import active_sessions
+from app.services.password_service import PasswordService
 
 
 # Configurações de autenticação
@@ -18,23 +19,13 @@ ADMIN_PASSWORD_HASH = "5e884898da28047151d0e56f8dc6292773603d0d6aabbdd62a11ef721
 
 
 def hash_password(password: str) -> str:
-    """Hash de senha usando SHA256 (temporário até resolver bcrypt)"""
-    # Usar SHA256 devido a problemas de compatibilidade com bcrypt
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash de senha no esquema atual (bcrypt, custo de PASSWORD_HASH)"""
+    return PasswordService.hash(password)
 
 
 def verify_password(password: str, hashed: str) -> bool:
-    """Verifica senha contra hash"""
-    # Verificar SHA256 primeiro (usado para novos usuarios)
-    sha256_hash = hashlib.sha256(password.encode()).hexdigest()
-    if sha256_hash == hashed:
-        return True
-
-    # Fallback para bcrypt (se funcionar)
-    try:
-        return pwd_context.verify(password, hashed)
-    except:
-        return False
+    """Verifica senha contra hash (bcrypt ou SHA256 legado)"""
+    return PasswordService.verify(password, hashed)
 
 
 def hash_password_legacy(password: str) -> str:
@@ -0,0 +1,259 @@
+"""
+Geração em lote dos relatórios mensais de todos os alunos ativos
+
+As avaliações do mês são lidas numa única consulta em streaming (ordenada por
+aluno), agrupadas em memória e renderizadas em paralelo num pool de processos
+com todos os núcleos disponíveis (pela linha de comando) ou deixando um núcleo
+livre para as requisições (quando disparado pelo painel). O resultado é um
+único arquivo zip.
+"""
+import os
+import re
+import tempfile
+import threading
+import time
+import unicodedata
+import uuid
+import zipfile
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from itertools import groupby
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import REPORTS
+from app.core.database import SessionLocal
+from app.models import Aluno, Avaliacao
+from app.services.report_service import REPORT_FIELDS, ReportService, render_progress_html, render_progress_pdf
+from app.utils.logging import info_log, error_log
+from app.utils.system import available_cpus
+
+FORMATS = ("pdf", "html")
+
+# Linhas lidas do banco por lote durante o streaming
+STREAM_BATCH_SIZE = 1000
+
+
+class BatchConflictError(Exception):
+    """Já existe um lote em andamento para outro mês/formato"""
+
+    def __init__(self, running: "MonthlyReportBatch"):
+        super().__init__(f"Lote de {running.periodo} ({running.formato}) em andamento")
+        self.running = running
+
+
+def server_batch_workers() -> int:
+    """Processos do lote disparado no servidor: deixa ao menos um núcleo para as requisições"""
+    return REPORTS["batch_server_workers"] or max(1, available_cpus() - 1)
+
+
+def month_bounds(ano: int, mes: int) -> Tuple[datetime, datetime]:
+    """Intervalo [início, fim) do mês"""
+    if not 1 <= mes <= 12:
+        raise ValueError("Mês inválido")
+    inicio = datetime(ano, mes, 1)
+    fim = datetime(ano + 1, 1, 1) if mes == 12 else datetime(ano, mes + 1, 1)
+    return inicio, fim
+
+
+def _slug(nome: str) -> str:
+    ascii_name = unicodedata.normalize("NFKD", nome).encode("ascii", "ignore").decode()
+    return re.sub(r"[^A-Za-z0-9]+", "_", ascii_name).strip("_") or "aluno"
+
+
+def render_report_file(formato: str, context: Dict[str, Any]) -> Tuple[str, bytes]:
+    """Renderiza um relatório (executado nos processos do pool)"""
+    filename = f"{context['aluno_id']:05d}_{_slug(context['nome'])}.{formato}"
+    if formato == "pdf":
+        return filename, render_progress_pdf(context)
+    return filename, render_progress_html(context).encode("utf-8")
+
+
+class MonthlyReportService:
+    """Leitura e agrupamento das avaliações do mês"""
+
+    @staticmethod
+    def count_students(db: Session, inicio: datetime, fim: datetime) -> int:
+        return db.query(func.count(func.distinct(Avaliacao.aluno_id))).join(Aluno).filter(
+            Aluno.ativo == True,
+            Avaliacao.data >= inicio,
+            Avaliacao.data < fim
+        ).scalar() or 0
+
+    @staticmethod
+    def iter_contexts(db: Session, inicio: datetime, fim: datetime, periodo: str) -> Iterator[Dict[str, Any]]:
+        """
+        Um contexto de relatório por aluno ativo com avaliações no mês
+
+        Seleciona só as colunas usadas pelo template e percorre o resultado em
+        lotes (yield_per), sem carregar o mês inteiro de uma vez.
+        """
+        rows = db.query(
+            Avaliacao.aluno_id,
+            Aluno.nome.label("aluno_nome"),
+            *[getattr(Avaliacao, field) for field in REPORT_FIELDS]
+        ).join(Aluno).filter(
+            Aluno.ativo == True,
+            Avaliacao.data >= inicio,
+            Avaliacao.data < fim
+        ).order_by(Avaliacao.aluno_id, Avaliacao.data).yield_per(STREAM_BATCH_SIZE)
+
+        for aluno_id, avaliacoes in groupby(rows, key=attrgetter("aluno_id")):
+            avaliacoes = list(avaliacoes)
+            context = ReportService.context_from_rows(aluno_id, avaliacoes[0].aluno_nome, avaliacoes)
+            context["periodo"] = periodo
+            yield context
+
+
+class MonthlyReportBatch:
+    """Execução de um lote mensal, com progresso consultável"""
+
+    def __init__(self, ano: int, mes: int, formato: str = "pdf", output_path: Optional[str] = None):
+        if formato not in FORMATS:
+            raise ValueError(f"Formato inválido: {formato}")
+        self.inicio, self.fim = month_bounds(ano, mes)
+        self.job_id = uuid.uuid4().hex
+        self.ano, self.mes, self.formato = ano, mes, formato
+        self.output_path = output_path or os.path.join(
+            REPORTS["batch_dir"], f"relatorios_{ano}_{mes:02d}_{formato}.zip"
+        )
+        self.status = "pending"
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def periodo(self) -> str:
+        return f"{self.mes:02d}/{self.ano}"
+
+    def run(
+        self,
+        workers: Optional[int] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+        progress: Optional[Callable[["MonthlyReportBatch"], None]] = None,
+        render: Callable[[str, Dict[str, Any]], Tuple[str, bytes]] = render_report_file
+    ) -> str:
+        """Gera o zip do mês e retorna o caminho do arquivo"""
+        workers = workers or REPORTS["batch_workers"] or available_cpus()
+        self.status, self.started_at = "running", time.time()
+        os.makedirs(os.path.dirname(os.path.abspath(self.output_path)), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.output_path)), suffix=".tmp")
+        os.close(fd)
+
+        compression = zipfile.ZIP_STORED if self.formato == "pdf" else zipfile.ZIP_DEFLATED
+        db = session_factory()
+        try:
+            self.total = MonthlyReportService.count_students(db, self.inicio, self.fim)
+            if progress:
+                progress(self)
+
+            with zipfile.ZipFile(tmp_path, "w", compression=compression) as zf, \
+                    ProcessPoolExecutor(max_workers=workers) as executor:
+                in_flight = set()
+                max_in_flight = workers * 4  # limita contextos em memória
+
+                def drain(return_when):
+                    nonlocal in_flight
+                    finished, in_flight = wait(in_flight, return_when=return_when)
+                    for future in finished:
+                        try:
+                            filename, content = future.result()
+                            zf.writestr(filename, content)
+                        except Exception as e:
+                            self.failed += 1
+                            error_log(f"❌ LOTE MENSAL: Falha ao renderizar relatório: {str(e)}")
+                        self.done += 1
+                        if progress:
+                            progress(self)
+
+                for context in MonthlyReportService.iter_contexts(db, self.inicio, self.fim, self.periodo):
+                    in_flight.add(executor.submit(render, self.formato, context))
+                    if len(in_flight) >= max_in_flight:
+                        drain(FIRST_COMPLETED)
+                if in_flight:
+                    drain(ALL_COMPLETED)
+
+            os.replace(tmp_path, self.output_path)
+            self.status = "done"
+            info_log(
+                f"📦 LOTE MENSAL: {self.done - self.failed}/{self.total} relatórios de {self.periodo} "
+                f"gerados em {time.time() - self.started_at:.1f}s com {workers} processos"
+            )
+            return self.output_path
+        except Exception as e:
+            self.status, self.error = "failed", str(e)
+            error_log(f"❌ LOTE MENSAL: Erro ao gerar relatórios de {self.periodo}: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            db.close()
+            self.finished_at = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "job_id": self.job_id,
+            "periodo": self.periodo,
+            "formato": self.formato,
+            "status": self.status,
+            "total": self.total,
+            "done": self.done,
+            "failed": self.failed,
+            "percent": round(100 * self.done / self.total, 1) if self.total else (100.0 if self.status == "done" else 0.0),
+            "status_url": f"/admin/relatorios/mensal/{self.job_id}",
+        }
+        if self.status == "done":
+            data["download_url"] = f"/admin/relatorios/mensal/{self.job_id}/download"
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+class MonthlyBatchRunner:
+    """
+    Dispara lotes em segundo plano (um por vez por instância)
+
+    Pedir de novo o lote em andamento devolve o mesmo lote; pedir outro mês ou
+    formato enquanto ele roda levanta BatchConflictError.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._batches: Dict[str, MonthlyReportBatch] = {}
+        self._running: Optional[MonthlyReportBatch] = None
+
+    def start(self, ano: int, mes: int, formato: str = "pdf") -> MonthlyReportBatch:
+        with self._lock:
+            running = self._running
+            if running is not None and running.status in ("pending", "running"):
+                if (running.ano, running.mes, running.formato) != (ano, mes, formato):
+                    raise BatchConflictError(running)
+                return running
+            batch = MonthlyReportBatch(ano, mes, formato)
+            self._batches = {batch.job_id: batch}  # mantém apenas o último lote
+            self._running = batch
+
+        thread = threading.Thread(target=self._run, args=(batch,), name="monthly-reports", daemon=True)
+        thread.start()
+        return batch
+
+    def _run(self, batch: MonthlyReportBatch):
+        try:
+            batch.run(workers=server_batch_workers())
+        except Exception:
+            pass  # erro já registrado em batch.error
+
+    def get(self, job_id: str) -> Optional[MonthlyReportBatch]:
+        return self._batches.get(job_id)
+
+    def current(self) -> Optional[MonthlyReportBatch]:
+        return self._running
+
+
+monthly_batches = MonthlyBatchRunner()
@@ -0,0 +1,263 @@
+"""
+Composição corporal derivada das dobras cutâneas e circunferências
+
+Fórmulas:
+- Densidade corporal por Jackson-Pollock 7 dobras (preferido) ou 3 dobras,
+  com coeficientes por sexo e idade na data da avaliação
+- Percentual de gordura pela equação de Siri (495 / D - 450)
+- Massa gorda / massa livre de gordura a partir do peso
+- Relação cintura-quadril
+
+As funções operam sobre arrays NumPy: a mesma implementação atende o cálculo
+de uma avaliação no insert (arrays de tamanho 1) e o recálculo em lote.
+"""
+from __future__ import annotations
+
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import event, inspect as sa_inspect, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Aluno, Avaliacao
+from app.utils.lazy_import import lazy_import
+from app.utils.logging import info_log
+
+np = lazy_import("numpy")  # carregado no primeiro cálculo, fora do cold start
+
+
+JP7_SITES = (
+    "dobra_peitoral", "dobra_axilar_media", "dobra_tricipital", "dobra_subescapular",
+    "dobra_abdominal", "dobra_suprailiaca", "dobra_coxa",
+)
+JP3_SITES_MASCULINO = ("dobra_peitoral", "dobra_abdominal", "dobra_coxa")
+JP3_SITES_FEMININO = ("dobra_tricipital", "dobra_suprailiaca", "dobra_coxa")
+
+INPUT_COLUMNS = tuple(sorted(set(JP7_SITES))) + ("peso_kg", "circunferencia_cintura", "circunferencia_quadril")
+DERIVED_COLUMNS = (
+    "densidade_corporal", "percentual_gordura", "massa_gorda_kg",
+    "massa_magra_kg", "relacao_cintura_quadril", "protocolo_composicao",
+)
+
+# Protocolos calculados (percentual com outro protocolo é considerado digitado)
+PROTOCOLOS_CALCULADOS = ("JP7", "JP3")
+PROTOCOLO_MANUAL = "manual"
+
+# Percentuais fora desta faixa indicam dobras digitadas incorretamente
+FAIXA_GORDURA_VALIDA = (2.0, 70.0)
+
+BATCH_SIZE = 5000
+
+
+# ============= FÓRMULAS VETORIZADAS =============
+
+def _sum_sites(columns: Dict[str, np.ndarray], sites) -> np.ndarray:
+    """Soma das dobras (NaN se alguma estiver ausente)"""
+    return np.sum([columns[site] for site in sites], axis=0)
+
+
+def jackson_pollock_7(soma: np.ndarray, idade: np.ndarray, masculino: np.ndarray) -> np.ndarray:
+    """Densidade corporal (g/cm³) por Jackson-Pollock 7 dobras"""
+    homens = 1.112 - 0.00043499 * soma + 0.00000055 * soma ** 2 - 0.00028826 * idade
+    mulheres = 1.097 - 0.00046971 * soma + 0.00000056 * soma ** 2 - 0.00012828 * idade
+    return np.where(masculino, homens, mulheres)
+
+
+def jackson_pollock_3(soma: np.ndarray, idade: np.ndarray, masculino: np.ndarray) -> np.ndarray:
+    """Densidade corporal (g/cm³) por Jackson-Pollock 3 dobras (sítios dependem do sexo)"""
+    homens = 1.10938 - 0.0008267 * soma + 0.0000016 * soma ** 2 - 0.0002574 * idade
+    mulheres = 1.0994921 - 0.0009929 * soma + 0.0000023 * soma ** 2 - 0.0001392 * idade
+    return np.where(masculino, homens, mulheres)
+
+
+def siri(densidade: np.ndarray) -> np.ndarray:
+    """Percentual de gordura a partir da densidade corporal"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 495.0 / densidade - 450.0
+
+
+def compute_body_composition(
+    columns: Dict[str, np.ndarray],
+    sexo_masculino: np.ndarray,
+    idade: np.ndarray,
+    gordura_manual: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    Calcula as colunas derivadas para N avaliações
+
+    Args:
+        columns: arrays float (NaN = ausente) para cada coluna de INPUT_COLUMNS
+        sexo_masculino: 1.0 masculino, 0.0 feminino, NaN desconhecido
+        idade: idade em anos na data da avaliação (NaN = desconhecida)
+        gordura_manual: percentual digitado (NaN = calcular pelas dobras)
+
+    Returns:
+        Dict com arrays para cada coluna de DERIVED_COLUMNS
+    """
+    masculino = sexo_masculino == 1.0
+    sexo_conhecido = ~np.isnan(sexo_masculino)
+
+    d7 = jackson_pollock_7(_sum_sites(columns, JP7_SITES), idade, masculino)
+    soma3 = np.where(
+        masculino,
+        _sum_sites(columns, JP3_SITES_MASCULINO),
+        _sum_sites(columns, JP3_SITES_FEMININO)
+    )
+    d3 = jackson_pollock_3(soma3, idade, masculino)
+
+    usa_jp7 = sexo_conhecido & ~np.isnan(d7)
+    usa_jp3 = sexo_conhecido & ~usa_jp7 & ~np.isnan(d3)
+    densidade = np.where(usa_jp7, d7, np.where(usa_jp3, d3, np.nan))
+
+    calculada = siri(densidade)
+    fora_da_faixa = (calculada < FAIXA_GORDURA_VALIDA[0]) | (calculada > FAIXA_GORDURA_VALIDA[1])
+    calculada = np.where(fora_da_faixa, np.nan, calculada)
+    densidade = np.where(fora_da_faixa, np.nan, densidade)
+
+    manual = ~np.isnan(gordura_manual)
+    gordura = np.where(manual, gordura_manual, calculada)
+
+    protocolo = np.full(gordura.shape, None, dtype=object)
+    protocolo[usa_jp3 & ~np.isnan(calculada)] = "JP3"
+    protocolo[usa_jp7 & ~np.isnan(calculada)] = "JP7"
+    protocolo[manual] = PROTOCOLO_MANUAL
+
+    peso = columns["peso_kg"]
+    massa_gorda = peso * gordura / 100.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rcq = columns["circunferencia_cintura"] / columns["circunferencia_quadril"]
+    rcq = np.where(np.isfinite(rcq) & (rcq > 0), rcq, np.nan)
+
+    return {
+        "densidade_corporal": np.round(densidade, 5),
+        "percentual_gordura": np.round(gordura, 2),
+        "massa_gorda_kg": np.round(massa_gorda, 2),
+        "massa_magra_kg": np.round(peso - massa_gorda, 2),
+        "relacao_cintura_quadril": np.round(rcq, 3),
+        "protocolo_composicao": protocolo,
+    }
+
+
+def age_in_years(nascimento: np.ndarray, data: np.ndarray) -> np.ndarray:
+    """Idade (anos, fracionária) entre arrays datetime64; NaT vira NaN"""
+    dias = (data.astype("datetime64[D]") - nascimento.astype("datetime64[D]")).astype("timedelta64[D]")
+    idade = dias.astype(np.float64) / 365.25
+    return np.where(np.isnat(dias), np.nan, idade)
+
+
+def _as_day(value) -> np.datetime64:
+    """datetime/date (com ou sem timezone) -> datetime64[D]; None -> NaT"""
+    if value is None:
+        return np.datetime64("NaT", "D")
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.replace(tzinfo=None)
+    return np.datetime64(value, "D")
+
+
+def _as_float(values) -> np.ndarray:
+    return np.array(values, dtype=np.float64)  # None -> NaN
+
+
+def _sexo_as_float(values) -> np.ndarray:
+    mapping = {"M": 1.0, "F": 0.0}
+    return np.array([mapping.get((v or "").upper(), np.nan) for v in values], dtype=np.float64)
+
+
+def _to_python(value):
+    """Valor NumPy -> tipo aceito pelo driver (NaN -> None)"""
+    if value is None:
+        return None
+    if isinstance(value, (float, np.floating)):
+        return None if np.isnan(value) else float(value)
+    return value
+
+
+# ============= SERVIÇO =============
+
+class BodyCompositionService:
+    """Cálculo e persistência das métricas de composição corporal"""
+
+    @staticmethod
+    def apply_to_evaluation(avaliacao: Avaliacao, sexo: Optional[str], nascimento: Optional[datetime], manual: bool):
+        """Preenche as colunas derivadas de uma avaliação (antes do INSERT/UPDATE)"""
+        columns = {name: _as_float([getattr(avaliacao, name)]) for name in INPUT_COLUMNS}
+        data = np.array([_as_day(avaliacao.data or datetime.now())])
+        idade = age_in_years(np.array([_as_day(nascimento)]), data)
+        gordura_manual = _as_float([avaliacao.percentual_gordura if manual else None])
+
+        derived = compute_body_composition(columns, _sexo_as_float([sexo]), idade, gordura_manual)
+        for name, values in derived.items():
+            setattr(avaliacao, name, _to_python(values[0]))
+
+    @staticmethod
+    def recompute_all(db: Session, batch_size: int = BATCH_SIZE) -> int:
+        """
+        Recalcula as colunas derivadas de todas as avaliações em lotes
+
+        Cada lote é lido numa consulta colunar (paginada por id), calculado de
+        forma vetorizada e gravado com UPDATE em massa por chave primária.
+        Percentuais digitados (protocolo manual ou sem protocolo) são mantidos.
+        """
+        started = time.perf_counter()
+        total = 0
+        last_id = 0
+        while True:
+            rows = db.execute(
+                select(
+                    Avaliacao.id, Avaliacao.data, Avaliacao.percentual_gordura, Avaliacao.protocolo_composicao,
+                    Aluno.sexo, Aluno.data_nascimento,
+                    *[getattr(Avaliacao, name) for name in INPUT_COLUMNS]
+                ).outerjoin(Aluno, Avaliacao.aluno_id == Aluno.id)
+                .where(Avaliacao.id > last_id)
+                .order_by(Avaliacao.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            ids, datas, gordura, protocolo, sexo, nascimento, *inputs = zip(*rows)
+            columns = {name: _as_float(values) for name, values in zip(INPUT_COLUMNS, inputs)}
+            idade = age_in_years(
+                np.array(nascimento, dtype="datetime64[D]"), np.array(datas, dtype="datetime64[D]")
+            )
+            gordura_manual = np.where(
+                np.isin(np.array(protocolo, dtype=object), PROTOCOLOS_CALCULADOS), np.nan, _as_float(gordura)
+            )
+
+            derived = compute_body_composition(columns, _sexo_as_float(sexo), idade, gordura_manual)
+            params = [
+                {"id": row_id, **{name: _to_python(derived[name][i]) for name in DERIVED_COLUMNS}}
+                for i, row_id in enumerate(ids)
+            ]
+            db.execute(update(Avaliacao), params)
+            db.commit()
+
+            total += len(rows)
+            last_id = ids[-1]
+
+        info_log(f"🧮 BodyCompositionService: {total} avaliações recalculadas em {time.perf_counter() - started:.1f}s")
+        return total
+
+
+# ============= CÁLCULO NO INSERT/UPDATE =============
+
+def _fill_body_composition(mapper, connection, target):
+    sexo, nascimento = None, None
+    if target.aluno_id is not None:
+        row = connection.execute(
+            select(Aluno.sexo, Aluno.data_nascimento).where(Aluno.id == target.aluno_id)
+        ).first()
+        if row is not None:
+            sexo, nascimento = row
+
+    # Percentual alterado diretamente (ou nunca calculado) é tratado como digitado
+    gordura_alterada = sa_inspect(target).attrs.percentual_gordura.history.has_changes()
+    manual = target.percentual_gordura is not None and (
+        gordura_alterada or target.protocolo_composicao not in PROTOCOLOS_CALCULADOS
+    )
+    BodyCompositionService.apply_to_evaluation(target, sexo, nascimento, manual)
+
+
+event.listen(Avaliacao, "before_insert", _fill_body_composition)
+event.listen(Avaliacao, "before_update", _fill_body_composition)
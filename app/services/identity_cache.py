@@ -0,0 +1,108 @@
+"""
+Cache de identidade: linhas de Aluno/Usuario do usuário autenticado
+
+Guarda apenas os valores das colunas (nunca a instância ORM, que pertence a
+outra sessão). Num acerto a instância é reconstruída como "detached" e
+incorporada à sessão da requisição com merge(load=False), sem SELECT; os
+relacionamentos continuam carregando sob demanda normalmente.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Type
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
+from app.core.config import IDENTITY_CACHE
+from app.core.database import SessionLocal
+from app.models import Aluno, Usuario
+
+# Tipo de usuário do token -> modelo carregado
+USER_MODELS: Dict[str, Type] = {"aluno": Aluno, "admin": Usuario}
+
+
+class IdentityCache:
+    """Cache LRU com TTL das colunas de Aluno/Usuario por (modelo, id)"""
+
+    def __init__(self, ttl: float, max_entries: int = 4096):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_values(self, key: Tuple[str, int]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def _set_values(self, key: Tuple[str, int], values: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), values)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def load(self, db: Session, model: Type, obj_id: int):
+        """Instância de `model` ligada a `db`, do cache quando possível"""
+        key = (model.__name__, obj_id)
+        values = self._get_values(key)
+        if values is not None:
+            obj = model(**values)
+            make_transient_to_detached(obj)
+            return db.merge(obj, load=False)
+
+        obj = db.get(model, obj_id)
+        if obj is not None:
+            self._set_values(key, {
+                attr.key: getattr(obj, attr.key) for attr in inspect(model).column_attrs
+            })
+        return obj
+
+    def invalidate(self, model_name: str, obj_id: int):
+        with self._lock:
+            self._entries.pop((model_name, obj_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "ttl": self.ttl, "hits": self.hits, "misses": self.misses}
+
+
+identity_cache = IdentityCache(IDENTITY_CACHE["ttl"], IDENTITY_CACHE["max_entries"])
+
+
+# ============= INVALIDAÇÃO DO CACHE =============
+# Mesmo esquema das séries: a alteração marca a sessão e o cache só é
+# invalidado após o commit (descartado no rollback).
+
+def _mark_identity_dirty(mapper, connection, target):
+    session = object_session(target)
+    if session is not None and target.id is not None:
+        session.info.setdefault("identity_dirty", set()).add((type(target).__name__, target.id))
+
+
+def _invalidate_after_commit(session):
+    for model_name, obj_id in session.info.pop("identity_dirty", ()):
+        identity_cache.invalidate(model_name, obj_id)
+
+
+def _discard_after_rollback(session):
+    session.info.pop("identity_dirty", None)
+
+
+for _model in USER_MODELS.values():
+    for _event_name in ("after_update", "after_delete"):
+        event.listen(_model, _event_name, _mark_identity_dirty)
+event.listen(SessionLocal, "after_commit", _invalidate_after_commit)
+event.listen(SessionLocal, "after_rollback", _discard_after_rollback)
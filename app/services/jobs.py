@@ -0,0 +1,31 @@
+"""
+Jobs periódicos executados pelo agendador (somente na instância líder)
+"""
+from app.core.config import SCHEDULER, REAVALIACAO, ATIVIDADE_DIARIA
+from app.core.database import SessionLocal, IS_POSTGRESQL, create_dedicated_engine, run_in_session
+from app.core.scheduler import create_scheduler
+from app.services.activity_service import ActivityService
+from app.services.reminder_service import ReminderService
+
+# O advisory lock do líder fica numa conexão fora do pool das requisições
+scheduler = create_scheduler(
+    create_dedicated_engine("monipersonal-scheduler"), SessionLocal, IS_POSTGRESQL,
+    tick=SCHEDULER["tick"],
+    lock_ttl=SCHEDULER["lock_ttl"]
+)
+
+
+def enqueue_overdue_reassessments() -> int:
+    """Lembretes para alunos sem avaliação há mais de REAVALIACAO["dias"]"""
+    return run_in_session(ReminderService.enqueue_overdue_reassessments, REAVALIACAO["dias"])
+
+
+def reconcile_daily_activity() -> int:
+    """Recalcula a tabela daily_activity a partir de avaliacoes/alunos"""
+    return run_in_session(ActivityService.reconcile, ATIVIDADE_DIARIA["dias"] or None)
+
+
+def register_jobs():
+    """Registra os jobs no agendador (chamado uma vez no startup)"""
+    scheduler.every("lembretes_reavaliacao", REAVALIACAO["intervalo"], enqueue_overdue_reassessments, run_at_start=True)
+    scheduler.daily("reconciliar_atividade_diaria", ATIVIDADE_DIARIA["hora"], reconcile_daily_activity, run_at_start=True)
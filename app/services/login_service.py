@@ -0,0 +1,152 @@
+"""
+Busca das credenciais no login (admins e alunos em uma única consulta)
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+from sqlalchemy import event, literal, select, union_all, update
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import LOGIN_NEGATIVE_CACHE
+from app.core.database import SessionLocal
+from app.models import Aluno, Usuario
+from app.utils.logging import debug_log
+
+
+class LoginCandidate(NamedTuple):
+    """Conta ativa com o e-mail informado"""
+    user_type: str  # "admin" ou "aluno"
+    user_id: int
+    senha_hash: str
+
+
+class NegativeLookupCache:
+    """
+    E-mails sem conta ativa, lembrados por alguns segundos (LRU limitado)
+
+    Um e-mail só passa a ser respondido pelo cache depois de `min_misses`
+    consultas sem conta dentro do TTL: tentativas em série (robôs, senha
+    errada repetida) param de chegar ao banco, mas uma tentativa isolada
+    seguida de cadastro em outro worker não é barrada.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 10000, min_misses: int = 1):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.min_misses = min_misses
+        self._entries: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()  # e-mail -> (expira, falhas)
+        self._lock = threading.Lock()
+        self.hits = 0
+
+    def __contains__(self, email: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None:
+                return False
+            if time.monotonic() > entry[0]:
+                del self._entries[email]
+                return False
+            if entry[1] < self.min_misses:
+                return False
+            self.hits += 1
+            return True
+
+    def add(self, email: str):
+        """Registra uma consulta sem conta para o e-mail"""
+        with self._lock:
+            now = time.monotonic()
+            entry = self._entries.get(email)
+            misses = entry[1] + 1 if entry is not None and now <= entry[0] else 1
+            self._entries[email] = (now + self.ttl, misses)
+            self._entries.move_to_end(email)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, email: str):
+        with self._lock:
+            self._entries.pop(email, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "ttl": self.ttl, "min_misses": self.min_misses, "hits": self.hits}
+
+
+unknown_emails = NegativeLookupCache(
+    LOGIN_NEGATIVE_CACHE["ttl"], LOGIN_NEGATIVE_CACHE["max_entries"], LOGIN_NEGATIVE_CACHE["min_misses"]
+)
+
+
+def _candidates_query(email: str):
+    """UNION ALL das duas tabelas; cada ramo usa o índice único de e-mail"""
+    admins = select(
+        literal("admin").label("user_type"), Usuario.id.label("user_id"), Usuario.senha_hash
+    ).where(Usuario.email == email, Usuario.ativo == True, Usuario.tipo == "admin")  # noqa: E712
+    alunos = select(
+        literal("aluno").label("user_type"), Aluno.id.label("user_id"), Aluno.senha_hash
+    ).where(Aluno.email == email, Aluno.ativo == True)  # noqa: E712
+    return union_all(admins, alunos)
+
+
+class LoginService:
+    """Resolução das contas candidatas de um login"""
+
+    @staticmethod
+    def find_candidates(db: Session, email: str) -> List[LoginCandidate]:
+        """
+        Contas ativas com o e-mail, admin antes de aluno, em um único round-trip
+
+        E-mails que seguem sem conta após algumas tentativas ficam no cache
+        negativo e não voltam a consultar o banco até o TTL expirar ou um
+        cadastro com esse e-mail ser confirmado neste processo.
+        """
+        if email in unknown_emails:
+            debug_log(f"🚫 LOGIN: E-mail desconhecido (cache negativo): {email}")
+            return []
+
+        rows = db.execute(_candidates_query(email)).all()
+        candidates = sorted(
+            (LoginCandidate(row.user_type, row.user_id, row.senha_hash) for row in rows),
+            key=lambda c: c.user_type != "admin"
+        )
+        if not candidates:
+            unknown_emails.add(email)
+        return candidates
+
+    @staticmethod
+    def upgrade_hash(db: Session, candidate: LoginCandidate, senha_hash: str):
+        """Regrava o hash da conta no esquema/custo atual (após login bem-sucedido)"""
+        model = Usuario if candidate.user_type == "admin" else Aluno
+        db.execute(update(model).where(model.id == candidate.user_id).values(senha_hash=senha_hash))
+        db.commit()
+        debug_log(f"🔐 LOGIN: Hash de senha atualizado para {candidate.user_type} {candidate.user_id}")
+
+
+# ============= INVALIDAÇÃO DO CACHE NEGATIVO =============
+# Cadastros e alterações de e-mail/ativação marcam a sessão; o e-mail só sai
+# do cache após o commit (descartado no rollback).
+
+def _mark_email_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is not None and target.email:
+        session.info.setdefault("login_emails_changed", set()).add(target.email)
+
+
+def _invalidate_after_commit(session):
+    for email in session.info.pop("login_emails_changed", ()):
+        unknown_emails.discard(email)
+
+
+def _discard_after_rollback(session):
+    session.info.pop("login_emails_changed", None)
+
+
+for _model in (Aluno, Usuario):
+    for _event_name in ("after_insert", "after_update"):
+        event.listen(_model, _event_name, _mark_email_changed)
+event.listen(SessionLocal, "after_commit", _invalidate_after_commit)
+event.listen(SessionLocal, "after_rollback", _discard_after_rollback)
@@ -0,0 +1,163 @@
+"""
+Busca textual nas observações e respostas do questionário das avaliações
+
+PostgreSQL: índice GIN sobre a expressão to_tsvector('portuguese', ...) dos
+campos de texto, atualizado pelo próprio banco a cada INSERT/UPDATE.
+SQLite: tabela virtual FTS5 (external content) mantida por triggers.
+As estruturas são criadas por `ensure_fulltext` (chamado no ensure_schema).
+"""
+import html
+import re
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.utils.logging import debug_log, info_log
+
+# Campos de texto livre indexados
+NOTE_FIELDS = ("observacoes_medidas", "faltou_algo", "alimentacao", "pedido_especial", "sugestao_geral")
+
+MAX_POR_PAGINA = 50
+
+# Marcadores de destaque aplicados pelo banco; viram <mark> depois do escape do HTML
+_MARK_START, _MARK_END = "\x02", "\x03"
+
+PG_DOCUMENT = "to_tsvector('portuguese', {})".format(
+    " || ' ' || ".join(f"coalesce({field}, '')" for field in NOTE_FIELDS)
+)
+PG_INDEX = "ix_avaliacoes_fts"
+SQLITE_TABLE = "avaliacoes_fts"
+
+
+# ============= ESTRUTURAS DE ÍNDICE =============
+
+def _sqlite_fulltext_ddl() -> List[str]:
+    fields = ", ".join(NOTE_FIELDS)
+    new_values = ", ".join(f"new.{field}" for field in NOTE_FIELDS)
+    old_values = ", ".join(f"old.{field}" for field in NOTE_FIELDS)
+    delete_old = (
+        f"INSERT INTO {SQLITE_TABLE}({SQLITE_TABLE}, rowid, {fields}) VALUES ('delete', old.id, {old_values});"
+    )
+    insert_new = f"INSERT INTO {SQLITE_TABLE}(rowid, {fields}) VALUES (new.id, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} USING fts5("
+        f"{fields}, content='avaliacoes', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {SQLITE_TABLE}_ai AFTER INSERT ON avaliacoes BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {SQLITE_TABLE}_ad AFTER DELETE ON avaliacoes BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {SQLITE_TABLE}_au AFTER UPDATE OF {fields} ON avaliacoes "
+        f"BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def ensure_fulltext(connection: Connection) -> bool:
+    """Cria o índice textual do banco atual (com carga inicial no SQLite); retorna True se criou"""
+    if connection.dialect.name == "postgresql":
+        exists = connection.execute(
+            text("SELECT 1 FROM pg_indexes WHERE indexname = :name"), {"name": PG_INDEX}
+        ).first()
+        if exists:
+            return False
+        connection.execute(text(f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON avaliacoes USING gin ({PG_DOCUMENT})"))
+        info_log(f"➕ MIGRATE: Índice {PG_INDEX} (tsvector) criado")
+        return True
+
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": SQLITE_TABLE}
+    ).first()
+    if exists:
+        return False
+    for statement in _sqlite_fulltext_ddl():
+        connection.execute(text(statement))
+    connection.execute(text(f"INSERT INTO {SQLITE_TABLE}({SQLITE_TABLE}) VALUES ('rebuild')"))
+    info_log(f"➕ MIGRATE: Tabela FTS5 {SQLITE_TABLE} criada e populada")
+    return True
+
+
+# ============= BUSCA =============
+
+def _fts5_query(termo: str) -> str:
+    """Termos do usuário como frases FTS5 (todas obrigatórias), sem operadores"""
+    return " ".join(f'"{token}"' for token in re.findall(r"\w+", termo))
+
+
+def _highlight(snippet: str) -> str:
+    return html.escape(snippet or "").replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+class NoteSearchService:
+    """Busca ranqueada e paginada nas anotações das avaliações"""
+
+    @staticmethod
+    def search(db: Session, termo: str, pagina: int = 1, por_pagina: int = 20) -> Dict[str, Any]:
+        """
+        Avaliações cujas anotações contêm todos os termos, das mais relevantes
+        para as menos relevantes (empates pela data mais recente)
+
+        Returns:
+            Dict com total, pagina, por_pagina e resultados (avaliacao_id,
+            aluno_id, nome, data, relevancia e destaque em HTML com <mark>)
+        """
+        termo = (termo or "").strip()
+        pagina = max(pagina, 1)
+        por_pagina = min(max(por_pagina, 1), MAX_POR_PAGINA)
+        vazio = {"termo": termo, "total": 0, "pagina": pagina, "por_pagina": por_pagina, "resultados": []}
+
+        params = {"limit": por_pagina, "offset": (pagina - 1) * por_pagina}
+        if db.get_bind().dialect.name == "postgresql":
+            if not termo:
+                return vazio
+            params["q"] = termo
+            params["opcoes"] = (
+                f'StartSel="{_MARK_START}", StopSel="{_MARK_END}", '
+                'MaxFragments=2, MaxWords=18, MinWords=6, FragmentDelimiter=" … "'
+            )
+            documento = " || ' ' || ".join(f"coalesce(a.{field}, '')" for field in NOTE_FIELDS)
+            filtro = f"{PG_DOCUMENT} @@ websearch_to_tsquery('portuguese', :q)"
+            total_sql = f"SELECT count(*) FROM avaliacoes WHERE {filtro}"
+            page_sql = f"""
+                SELECT a.id, a.aluno_id, a.nome, a.data, r.relevancia,
+                       ts_headline('portuguese', {documento}, websearch_to_tsquery('portuguese', :q), :opcoes)
+                FROM (
+                    SELECT id, ts_rank({PG_DOCUMENT}, websearch_to_tsquery('portuguese', :q)) AS relevancia
+                    FROM avaliacoes WHERE {filtro}
+                    ORDER BY relevancia DESC, data DESC, id DESC
+                    LIMIT :limit OFFSET :offset
+                ) r JOIN avaliacoes a ON a.id = r.id
+                ORDER BY r.relevancia DESC, a.data DESC, a.id DESC
+            """
+        else:
+            consulta = _fts5_query(termo)
+            if not consulta:
+                return vazio
+            params["q"] = consulta
+            total_sql = f"SELECT count(*) FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH :q"
+            page_sql = f"""
+                SELECT a.id, a.aluno_id, a.nome, a.data, -bm25({SQLITE_TABLE}) AS relevancia,
+                       snippet({SQLITE_TABLE}, -1, '{_MARK_START}', '{_MARK_END}', ' … ', 18)
+                FROM {SQLITE_TABLE} JOIN avaliacoes a ON a.id = {SQLITE_TABLE}.rowid
+                WHERE {SQLITE_TABLE} MATCH :q
+                ORDER BY bm25({SQLITE_TABLE}), a.data DESC, a.id DESC
+                LIMIT :limit OFFSET :offset
+            """
+
+        total = db.execute(text(total_sql), params).scalar() or 0
+        rows = db.execute(text(page_sql), params).all() if total else []
+        debug_log(f"🔎 NoteSearchService: '{termo}' -> {total} avaliações")
+
+        return {
+            **vazio,
+            "total": total,
+            "resultados": [
+                {
+                    "avaliacao_id": avaliacao_id,
+                    "aluno_id": aluno_id,
+                    "nome": nome,
+                    "data": data.isoformat() if hasattr(data, "isoformat") else data,
+                    "relevancia": round(float(relevancia), 4),
+                    "destaque": _highlight(destaque),
+                }
+                for avaliacao_id, aluno_id, nome, data, relevancia, destaque in rows
+            ],
+        }
@@ -0,0 +1,153 @@
+"""
+Hash e verificação de senhas (bcrypt com custo calibrado)
+
+Formatos aceitos na verificação:
+- bcrypt ($2a$/$2b$/$2y$), o esquema atual, com o custo de PASSWORD_HASH;
+- SHA256 hexadecimal sem salt, gravado pelas versões antigas.
+
+Um hash que não está no esquema/custo atual é regravado no próximo login
+bem-sucedido (verify_and_update), quando a senha em texto está disponível.
+"""
+import hashlib
+import hmac
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+import bcrypt
+
+from app.core.config import PASSWORD_HASH
+
+BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+BCRYPT_MAX_BYTES = 72  # o bcrypt ignora o restante (versões novas recusam senhas maiores)
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+
+
+def _scheme(hashed: str) -> Optional[str]:
+    if hashed.startswith(BCRYPT_PREFIXES):
+        return "bcrypt"
+    if len(hashed) == 64 and all(c in "0123456789abcdef" for c in hashed):
+        return "sha256"
+    return None
+
+
+def _bcrypt_rounds(hashed: str) -> int:
+    return int(hashed.split("$")[2])
+
+
+def _secret(password: str) -> bytes:
+    return password.encode("utf-8")[:BCRYPT_MAX_BYTES]
+
+
+class VerificationMetrics:
+    """Tempo das verificações de senha (janela das últimas N) e regravações"""
+
+    def __init__(self, window: int = 512):
+        self._durations_ms: "deque[float]" = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.verifications = 0
+        self.failures = 0
+        self.by_scheme: Dict[str, int] = {}
+        self.rehashed = 0
+
+    def record(self, scheme: str, duration_ms: float, ok: bool):
+        with self._lock:
+            self._durations_ms.append(duration_ms)
+            self.verifications += 1
+            self.failures += 0 if ok else 1
+            self.by_scheme[scheme] = self.by_scheme.get(scheme, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            durations = sorted(self._durations_ms)
+
+        def percentile(q: float) -> Optional[float]:
+            if not durations:
+                return None
+            return round(durations[min(len(durations) - 1, int(q * len(durations)))], 1)
+
+        return {
+            "rounds": PASSWORD_HASH["rounds"],
+            "verifications": self.verifications,
+            "failures": self.failures,
+            "by_scheme": dict(self.by_scheme),
+            "rehashed": self.rehashed,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "max_ms": round(durations[-1], 1) if durations else None,
+        }
+
+
+password_metrics = VerificationMetrics()
+
+
+class PasswordService:
+    """Único ponto de hash/verificação de senhas da aplicação"""
+
+    @staticmethod
+    def hash(password: str, rounds: Optional[int] = None) -> str:
+        """Hash bcrypt com o custo atual (ou `rounds`, usado na calibração)"""
+        salt = bcrypt.gensalt(rounds or PASSWORD_HASH["rounds"])
+        return bcrypt.hashpw(_secret(password), salt).decode("ascii")
+
+    @staticmethod
+    def verify(password: str, hashed: Optional[str]) -> bool:
+        """Confere a senha contra qualquer formato aceito, registrando o tempo gasto"""
+        scheme = _scheme(hashed or "")
+        if scheme is None:
+            return False
+
+        started = time.perf_counter()
+        if scheme == "bcrypt":
+            try:
+                ok = bcrypt.checkpw(_secret(password), hashed.encode("ascii"))
+            except ValueError:  # hash corrompido
+                ok = False
+        else:
+            ok = hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), hashed)
+        password_metrics.record(scheme, (time.perf_counter() - started) * 1000, ok)
+        return ok
+
+    @staticmethod
+    def needs_rehash(hashed: str) -> bool:
+        """Hash fora do esquema atual (SHA256) ou com custo diferente do configurado"""
+        return _scheme(hashed) != "bcrypt" or _bcrypt_rounds(hashed) != PASSWORD_HASH["rounds"]
+
+    @staticmethod
+    def verify_and_update(password: str, hashed: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """(senha confere, novo hash a gravar ou None)"""
+        if not PasswordService.verify(password, hashed):
+            return False, None
+        if not PasswordService.needs_rehash(hashed):
+            return True, None
+        password_metrics.rehashed += 1
+        return True, PasswordService.hash(password)
+
+    @staticmethod
+    def calibrate_rounds(target_ms: float, probe_rounds: int = 8, samples: int = 5) -> Dict[str, Any]:
+        """
+        Custo do bcrypt cuja verificação fica mais perto de `target_ms` sem passar
+
+        Mede o custo `probe_rounds` (rápido) e extrapola: cada round a mais
+        dobra o tempo. O resultado é limitado a [MIN_ROUNDS, MAX_ROUNDS].
+        """
+        hashed = PasswordService.hash("calibracao", rounds=probe_rounds).encode("ascii")
+        timings = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            bcrypt.checkpw(b"calibracao", hashed)
+            timings.append((time.perf_counter() - started) * 1000)
+        probe_ms = sorted(timings)[len(timings) // 2]
+
+        rounds = probe_rounds + math.floor(math.log2(target_ms / probe_ms))
+        rounds = max(MIN_ROUNDS, min(MAX_ROUNDS, rounds))
+        return {
+            "rounds": rounds,
+            "estimated_ms": round(probe_ms * 2 ** (rounds - probe_rounds), 1),
+            "probe_rounds": probe_rounds,
+            "probe_ms": round(probe_ms, 2),
+            "target_ms": target_ms,
+        }
@@ -0,0 +1,74 @@
+"""
+Lembretes gerados por jobs agendados
+"""
+from datetime import timedelta
+
+from sqlalchemy import and_, exists, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.models import Aluno, Avaliacao, Lembrete
+from app.utils.datetime_utils import now_sao_paulo
+from app.utils.logging import info_log
+
+TIPO_REAVALIACAO = "reavaliacao"
+
+
+class ReminderService:
+    """Fila de lembretes (tabela `lembretes`)"""
+
+    @staticmethod
+    def enqueue_overdue_reassessments(db: Session, dias: int) -> int:
+        """
+        Enfileira um lembrete para cada aluno ativo sem avaliação há mais de `dias`
+
+        Um único INSERT ... SELECT: a última avaliação de cada aluno vem de
+        MAX(data) GROUP BY aluno_id (atendido pelo índice aluno_id, data) e o
+        NOT EXISTS evita duplicar o lembrete da mesma última avaliação.
+
+        Returns:
+            int: quantidade de lembretes criados
+        """
+        limite = now_sao_paulo().replace(tzinfo=None) - timedelta(days=dias)
+
+        ultimas = select(
+            Avaliacao.aluno_id.label("aluno_id"),
+            func.max(Avaliacao.data).label("ultima")
+        ).where(
+            Avaliacao.aluno_id.isnot(None)
+        ).group_by(Avaliacao.aluno_id).subquery()
+
+        ja_enfileirado = exists().where(and_(
+            Lembrete.aluno_id == ultimas.c.aluno_id,
+            Lembrete.tipo == TIPO_REAVALIACAO,
+            Lembrete.referencia == ultimas.c.ultima
+        ))
+
+        atrasados = select(
+            ultimas.c.aluno_id,
+            literal(TIPO_REAVALIACAO),
+            ultimas.c.ultima,
+            literal("pendente"),
+            literal(now_sao_paulo().replace(tzinfo=None)),
+        ).join(
+            Aluno, Aluno.id == ultimas.c.aluno_id
+        ).where(
+            Aluno.ativo == True,
+            ultimas.c.ultima < limite,
+            ~ja_enfileirado
+        )
+
+        result = db.execute(
+            insert(Lembrete).from_select(
+                ["aluno_id", "tipo", "referencia", "status", "created_at"], atrasados
+            )
+        )
+        db.commit()
+
+        criados = result.rowcount or 0
+        if criados:
+            info_log(f"🔔 ReminderService: {criados} lembretes de reavaliação enfileirados (>{dias} dias)")
+        return criados
+
+    @staticmethod
+    def count_pending(db: Session) -> int:
+        return db.query(func.count(Lembrete.id)).filter(Lembrete.status == "pendente").scalar() or 0
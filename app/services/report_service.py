@@ -0,0 +1,247 @@
+"""
+Geração de relatórios de progresso em PDF fora do event loop
+
+A renderização (Jinja2 + WeasyPrint) roda num pool de processos com fila
+limitada; os PDFs prontos ficam num ArtifactStore endereçado pelo conteúdo
+(aluno, última avaliação, versão do template), de modo que downloads
+repetidos são servidos direto do disco.
+"""
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import REPORTS
+from app.models import Aluno, Avaliacao
+from app.services.artifact_store import ArtifactStore
+from app.utils.lazy_import import lazy_import
+from app.utils.logging import info_log, error_log
+
+# Carregado no worker do pool na primeira renderização, não no processo web
+weasyprint = lazy_import("weasyprint", install_hint="weasyprint")
+
+
+# Incrementar ao alterar templates/relatorio.html para invalidar os PDFs em disco
+REPORT_TEMPLATE_VERSION = "2"
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "templates")
+
+# Campos de Avaliacao usados pelo template do relatório
+REPORT_FIELDS = (
+    "id", "data", "peso", "medidas", "peso_kg", "altura_cm", "imc", "percentual_gordura",
+    "circunferencia_cintura", "circunferencia_quadril", "massa_magra_kg", "relacao_cintura_quadril",
+    "protocolo_composicao", "meta_agua", "alimentacao",
+    "faltou_algo", "gostou_mais_menos", "melhorias", "outros_melhorias",
+    "pedido_especial", "sugestao_geral",
+)
+
+
+class ReportQueueFullError(Exception):
+    """Fila de renderização cheia; o cliente deve tentar novamente depois"""
+
+
+# ============= RENDERIZAÇÃO (executada nos processos do pool) =============
+
+_jinja_env = None
+
+
+def render_progress_html(context: Dict[str, Any]) -> str:
+    """Renderiza o HTML do relatório de progresso de um aluno"""
+    global _jinja_env
+    if _jinja_env is None:
+        from jinja2 import Environment, FileSystemLoader, select_autoescape
+        _jinja_env = Environment(
+            loader=FileSystemLoader(TEMPLATES_DIR),
+            autoescape=select_autoescape(["html"])
+        )
+    return _jinja_env.get_template("relatorio.html").render(**context)
+
+
+def render_progress_pdf(context: Dict[str, Any]) -> bytes:
+    """Renderiza o relatório de progresso de um aluno em PDF"""
+    return weasyprint.HTML(string=render_progress_html(context), base_url=TEMPLATES_DIR).write_pdf()
+
+
+# ============= SERVIÇO =============
+
+class ReportService:
+    """Monta o conteúdo dos relatórios de progresso"""
+
+    @staticmethod
+    def content_key(aluno_id: int, latest_evaluation_id: int) -> str:
+        """Chave de conteúdo: muda quando o aluno recebe nova avaliação ou o template muda"""
+        return f"progresso:{aluno_id}:{latest_evaluation_id}:v{REPORT_TEMPLATE_VERSION}"
+
+    @staticmethod
+    def context_from_rows(aluno_id: int, nome: str, avaliacoes) -> Dict[str, Any]:
+        """Contexto serializável (picklable) para renderizar em outro processo"""
+        linhas = []
+        for av in avaliacoes:
+            linha = {field: getattr(av, field) for field in REPORT_FIELDS}
+            linha["melhorias_processadas"] = [
+                m.strip() for m in (av.melhorias or "").split(",") if m.strip()
+            ]
+            linhas.append(linha)
+        return {"nome": nome, "aluno_id": aluno_id, "avaliacoes": linhas}
+
+    @staticmethod
+    def build_context(aluno: Aluno, avaliacoes) -> Dict[str, Any]:
+        return ReportService.context_from_rows(aluno.id, aluno.nome, avaliacoes)
+
+    @staticmethod
+    def load_context(db: Session, aluno: Aluno) -> Dict[str, Any]:
+        avaliacoes = db.query(Avaliacao).filter(
+            Avaliacao.aluno_id == aluno.id
+        ).order_by(Avaliacao.data.asc()).all()
+        return ReportService.build_context(aluno, avaliacoes)
+
+
+class ReportJob:
+    """Job de renderização acompanhado pelo endpoint de status"""
+
+    def __init__(self, key: str, owner_id: int, download_url: str):
+        self.job_id = uuid.uuid4().hex
+        self.key = key
+        self.owner_id = owner_id
+        self.download_url = download_url
+        self.status = "pending"
+        self.error = None
+        self.path = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.task: Optional[asyncio.Future] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "job_id": self.job_id,
+            "status": self.status,
+            "status_url": f"/relatorios/jobs/{self.job_id}",
+        }
+        if self.status == "done":
+            data["download_url"] = self.download_url
+        if self.error:
+            data["error"] = self.error
+        if self.finished_at:
+            data["duration_s"] = round(self.finished_at - self.created_at, 2)
+        return data
+
+
+class ReportJobManager:
+    """
+    Pool de processos com fila limitada para renderizar relatórios
+
+    Pedidos com a mesma chave de conteúdo reaproveitam o job pendente; se o
+    artefato já existe em disco o job nasce concluído.
+    """
+
+    def __init__(
+        self,
+        store: ArtifactStore,
+        render: Callable[[Dict[str, Any]], bytes] = render_progress_pdf,
+        workers: int = 1,
+        max_pending: int = 8,
+        max_jobs: int = 256
+    ):
+        self.store = store
+        self.render = render
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_jobs = max_jobs
+        self._executor = None
+        self._jobs: "OrderedDict[str, ReportJob]" = OrderedDict()
+        self._pending: Dict[str, ReportJob] = {}
+        self.rendered = 0
+        self.failed = 0
+        self.rejected = 0
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        # Criado sob demanda: não atrasa o cold start nem é herdado por fork
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        return self._jobs.get(job_id)
+
+    def submit(self, key: str, context: Dict[str, Any], owner_id: int, download_url: str) -> ReportJob:
+        """Enfileira a renderização (deve ser chamado dentro do event loop)"""
+        pending = self._pending.get(key)
+        if pending is not None:
+            return pending
+
+        job = ReportJob(key, owner_id, download_url)
+        path = self.store.get(key)
+        if path:
+            job.status, job.path, job.finished_at = "done", path, time.time()
+        else:
+            if len(self._pending) >= self.max_pending:
+                self.rejected += 1
+                raise ReportQueueFullError("Fila de relatórios cheia")
+            self._pending[key] = job
+            job.task = asyncio.ensure_future(self._run(job, context))
+
+        self._remember(job)
+        return job
+
+    async def wait(self, job: ReportJob, timeout: float) -> ReportJob:
+        """Aguarda o job por até `timeout` segundos sem bloquear o event loop"""
+        if job.task is not None and not job.task.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(job.task), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    async def _run(self, job: ReportJob, context: Dict[str, Any]):
+        loop = asyncio.get_running_loop()
+        try:
+            pdf = await loop.run_in_executor(self.executor, self.render, context)
+            job.path = await run_in_threadpool(self.store.put, job.key, pdf)
+            job.status = "done"
+            self.rendered += 1
+            info_log(f"📄 RELATORIO: PDF gerado para aluno {job.owner_id} em {time.time() - job.created_at:.1f}s")
+        except Exception as e:
+            job.status, job.error = "failed", str(e)
+            self.failed += 1
+            error_log(f"❌ RELATORIO: Falha ao gerar PDF do aluno {job.owner_id}: {str(e)}")
+        finally:
+            job.finished_at = time.time()
+            self._pending.pop(job.key, None)
+
+    def _remember(self, job: ReportJob):
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > self.max_jobs:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if oldest.status == "pending":
+                break
+            self._jobs.pop(oldest_id)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "max_pending": self.max_pending,
+            "rendered": self.rendered,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "artifacts": self.store.snapshot(),
+        }
+
+
+# Pool de renderização e artefatos em disco (compartilhados pela instância)
+report_manager = ReportJobManager(
+    ArtifactStore(REPORTS["artifact_dir"], REPORTS["artifact_max_bytes"]),
+    workers=REPORTS["workers"],
+    max_pending=REPORTS["max_pending"]
+)
@@ -0,0 +1,179 @@
+"""
+Séries temporais de progresso dos alunos para os gráficos (Chart.js)
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Float, event, func, select
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import SERIES_CACHE
+from app.core.database import SessionLocal
+from app.models import Avaliacao
+from app.utils.downsampling import lttb
+from app.utils.logging import debug_log
+from app.utils.datetime_utils import utc_to_sao_paulo
+
+
+# Colunas numéricas de Avaliacao disponíveis como métricas
+NUMERIC_METRICS = tuple(
+    column.name for column in Avaliacao.__table__.columns
+    if isinstance(column.type, Float)
+)
+
+MAX_POINTS = 500
+
+
+class SeriesCache:
+    """
+    Cache LRU de séries por aluno
+
+    Cada entrada guarda a versão do aluno com que foi calculada (ver
+    `student_version`) e só é servida para a mesma versão e dentro do TTL. O
+    commit deste processo ainda remove as entradas do aluno na hora.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[float, Tuple, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple, version: Tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] != version or time.monotonic() > entry[0]:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key: Tuple, version: Tuple, payload: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, version, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_student(self, student_id: int):
+        """Remove todas as séries em cache de um aluno (chave começa pelo aluno_id)"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == student_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "ttl": self.ttl, "hits": self.hits, "misses": self.misses}
+
+
+series_cache = SeriesCache(SERIES_CACHE["ttl"], SERIES_CACHE["max_entries"])
+
+
+def student_version(db: Session, student_id: int) -> Tuple:
+    """Quantidade e maior id das avaliações do aluno (muda a cada inserção ou exclusão)"""
+    return tuple(db.execute(
+        select(func.count(Avaliacao.id), func.max(Avaliacao.id)).where(Avaliacao.aluno_id == student_id)
+    ).one())
+
+
+class SeriesService:
+    """Monta séries compactas (arrays paralelos) com downsampling no servidor"""
+
+    @staticmethod
+    def parse_metrics(raw: Optional[str]) -> List[str]:
+        """Converte 'peso_kg,imc' em lista validada de métricas"""
+        metrics = [m.strip() for m in (raw or "peso_kg,imc").split(",") if m.strip()]
+        invalid = [m for m in metrics if m not in NUMERIC_METRICS]
+        if invalid:
+            raise ValueError(f"Métricas inválidas: {', '.join(invalid)}")
+        return metrics
+
+    @staticmethod
+    def get_student_series(
+        db: Session,
+        student_id: int,
+        metrics: Iterable[str],
+        points: int = 100,
+        inicio: Optional[datetime] = None,
+        fim: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Retorna {"series": {metrica: {"t": [epoch_ms], "y": [valor]}}} de um aluno
+
+        Cada métrica é reduzida independentemente (LTTB) para no máximo `points`
+        pontos, descartando avaliações sem valor para aquela métrica.
+        """
+        metrics = tuple(metrics)
+        points = max(3, min(points, MAX_POINTS))
+        key = (student_id, metrics, points, inicio, fim)
+
+        # Consulta de versão no índice do aluno: barata e vale entre workers
+        version = student_version(db, student_id)
+        cached = series_cache.get(key, version)
+        if cached is not None:
+            return cached
+
+        columns = [getattr(Avaliacao, m) for m in metrics]
+        query = db.query(Avaliacao.data, *columns).filter(Avaliacao.aluno_id == student_id)
+        if inicio:
+            query = query.filter(Avaliacao.data >= inicio)
+        if fim:
+            query = query.filter(Avaliacao.data <= fim)
+        rows = query.order_by(Avaliacao.data.asc()).all()
+
+        series = {}
+        for index, metric in enumerate(metrics, start=1):
+            xs, ys = [], []
+            for row in rows:
+                value = row[index]
+                if value is not None and row[0] is not None:
+                    xs.append(int(utc_to_sao_paulo(row[0]).timestamp() * 1000))
+                    ys.append(round(float(value), 2))
+            xs, ys = lttb(xs, ys, points)
+            series[metric] = {"t": xs, "y": ys}
+
+        payload = {
+            "aluno_id": student_id,
+            "total_avaliacoes": len(rows),
+            "pontos": points,
+            "series": series
+        }
+        series_cache.set(key, version, payload)
+        debug_log(f"📈 SeriesService: Séries {list(metrics)} calculadas para aluno {student_id} ({len(rows)} avaliações)")
+        return payload
+
+
+# ============= INVALIDAÇÃO DO CACHE =============
+# Alterações em avaliações marcam o aluno na sessão; o cache só é invalidado
+# após o commit, para que uma leitura concorrente não guarde dados antigos.
+
+def _mark_student_dirty(mapper, connection, target):
+    session = object_session(target)
+    if session is not None and target.aluno_id is not None:
+        session.info.setdefault("series_dirty", set()).add(target.aluno_id)
+
+
+def _invalidate_after_commit(session):
+    for student_id in session.info.pop("series_dirty", ()):
+        series_cache.invalidate_student(student_id)
+
+
+def _discard_after_rollback(session):
+    session.info.pop("series_dirty", None)
+
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(Avaliacao, _event_name, _mark_student_dirty)
+event.listen(SessionLocal, "after_commit", _invalidate_after_commit)
+event.listen(SessionLocal, "after_rollback", _discard_after_rollback)
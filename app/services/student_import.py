@@ -0,0 +1,210 @@
+"""
+Cadastro de alunos em lote a partir de CSV (onboarding de uma academia)
+
+Em vez de um /registro por aluno (consulta do e-mail + insert + hash na
+requisição), a importação:
+- valida todas as linhas do arquivo e remove e-mails repetidos nele;
+- descobre os e-mails já cadastrados com uma única consulta (sem diferenciar maiúsculas);
+- calcula os hashes bcrypt num pool de processos com todos os núcleos;
+- grava os novos alunos com INSERT em lote (uma transação por lote);
+- como o INSERT via Core não passa pelos listeners de `daily_activity`,
+  reconcilia os agregados dos dias afetados ao final.
+
+Com dry_run nada é hasheado nem gravado: só o relatório é produzido.
+"""
+import csv
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, TextIO, Tuple
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models import Aluno
+from app.services.activity_service import ActivityService
+from app.services.auth_service import hash_password
+from app.utils.datetime_utils import now_sao_paulo
+from app.utils.logging import info_log
+from app.utils.system import available_cpus
+from app.utils.text import normalize_name
+
+COLUMNS = ("nome", "email", "senha", "telefone", "data_nascimento", "sexo")
+REQUIRED_COLUMNS = ("nome", "email")
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y")
+
+
+def _parse_date(value: str) -> Optional[datetime]:
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"data_nascimento inválida: {value!r} (use AAAA-MM-DD ou DD/MM/AAAA)")
+
+
+def parse_students_csv(stream: TextIO) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Lê e valida o CSV (separador vírgula ou ponto e vírgula)
+
+    Returns:
+        (alunos válidos com o número da linha, erros com linha e motivo)
+    """
+    sample = stream.read(4096)
+    stream.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample.splitlines()[0] if sample else "", delimiters=",;")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(stream, dialect=dialect)
+    header = [h.strip().lower() for h in reader.fieldnames or []]
+    missing = [c for c in REQUIRED_COLUMNS if c not in header]
+    if missing:
+        raise ValueError(f"Colunas obrigatórias ausentes: {', '.join(missing)}")
+    reader.fieldnames = header
+
+    alunos, erros = [], []
+    for linha, row in enumerate(reader, start=2):  # linha 1 é o cabeçalho
+        row = {k: (v or "").strip() for k, v in row.items() if k in COLUMNS}
+        try:
+            if not row.get("nome"):
+                raise ValueError("nome vazio")
+            email = row.get("email", "").lower()
+            if "@" not in email or " " in email:
+                raise ValueError(f"e-mail inválido: {row.get('email')!r}")
+            sexo = row.get("sexo", "").upper() or None
+            if sexo not in (None, "M", "F"):
+                raise ValueError(f"sexo inválido: {row.get('sexo')!r} (use M ou F)")
+            nascimento = row.get("data_nascimento")
+            alunos.append({
+                "linha": linha,
+                "nome": row["nome"],
+                "email": email,
+                "senha": row.get("senha") or None,
+                "telefone": row.get("telefone") or None,
+                "data_nascimento": _parse_date(nascimento) if nascimento else None,
+                "sexo": sexo,
+            })
+        except ValueError as e:
+            erros.append({"linha": linha, "email": row.get("email", ""), "erro": str(e)})
+    return alunos, erros
+
+
+def generate_password() -> str:
+    """Senha inicial para linhas sem senha (entregue ao aluno pela academia)"""
+    return secrets.token_urlsafe(9)
+
+
+class StudentImporter:
+    """Planeja e executa a importação de alunos em lote"""
+
+    def __init__(self, engine: Engine, batch_size: int = 500, workers: Optional[int] = None):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.workers = workers or available_cpus()
+        self.hashed = 0
+        self.done = 0
+        self.total = 0
+
+    def plan(self, alunos: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Separa novos alunos, repetidos no arquivo e já cadastrados (uma consulta, sem diferenciar maiúsculas)"""
+        vistos, novos, repetidos = set(), [], []
+        for aluno in alunos:
+            if aluno["email"] in vistos:
+                repetidos.append({"linha": aluno["linha"], "email": aluno["email"]})
+                continue
+            vistos.add(aluno["email"])
+            novos.append(aluno)
+
+        # /registro grava o e-mail como digitado: a comparação ignora maiúsculas
+        with self.engine.connect() as connection:
+            existentes = set(connection.execute(
+                select(func.lower(Aluno.email)).where(func.lower(Aluno.email).in_(vistos))
+            ).scalars()) if vistos else set()
+
+        return {
+            "novos": [a for a in novos if a["email"] not in existentes],
+            "repetidos_no_arquivo": repetidos,
+            "ja_cadastrados": [
+                {"linha": a["linha"], "email": a["email"]} for a in novos if a["email"] in existentes
+            ],
+        }
+
+    def _hash_all(self, senhas: List[str], progress: Optional[Callable[["StudentImporter"], None]]) -> List[str]:
+        """Hashes na ordem das senhas; com mais de um núcleo, em paralelo no pool"""
+        hashes: List[str] = []
+
+        def collect(results: Iterable[str]):
+            for senha_hash in results:
+                hashes.append(senha_hash)
+                self.hashed += 1
+                if progress:
+                    progress(self)
+
+        if self.workers <= 1 or len(senhas) < 2:
+            collect(map(hash_password, senhas))
+        else:
+            chunksize = max(1, len(senhas) // (self.workers * 8))
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                collect(executor.map(hash_password, senhas, chunksize=chunksize))
+        return hashes
+
+    def run(self, alunos: List[Dict[str, Any]], dry_run: bool = False,
+            progress: Optional[Callable[["StudentImporter"], None]] = None) -> Dict[str, Any]:
+        """
+        Importa os alunos válidos ainda não cadastrados
+
+        Returns:
+            Dict com a inserir/inseridos, repetidos, já cadastrados, senhas
+            geradas (e-mail -> senha) e duração em segundos
+        """
+        started = time.perf_counter()
+        plano = self.plan(alunos)
+        novos = plano["novos"]
+        self.total = len(novos)
+        geradas: Dict[str, str] = {}
+
+        if not dry_run and novos:
+            senhas = []
+            for aluno in novos:
+                if not aluno["senha"]:
+                    geradas[aluno["email"]] = generate_password()
+                senhas.append(aluno["senha"] or geradas[aluno["email"]])
+            hashes = self._hash_all(senhas, progress)
+
+            agora = now_sao_paulo()
+            rows = [
+                {"nome": a["nome"], "nome_normalizado": normalize_name(a["nome"]), "email": a["email"],
+                 "telefone": a["telefone"], "senha_hash": senha_hash, "data_nascimento": a["data_nascimento"],
+                 "sexo": a["sexo"], "ativo": True, "created_at": agora}
+                for a, senha_hash in zip(novos, hashes)
+            ]
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                with self.engine.begin() as connection:
+                    connection.execute(insert(Aluno.__table__), batch)
+                self.done += len(batch)
+                if progress:
+                    progress(self)
+
+            # Todos os alunos têm created_at = agora: só o(s) dia(s) desde então
+            with Session(self.engine) as db:
+                ActivityService.reconcile(db, dias=(now_sao_paulo().date() - agora.date()).days + 1)
+
+        elapsed = time.perf_counter() - started
+        resultado = {
+            "dry_run": dry_run,
+            "validos": len(alunos),
+            "a_inserir": len(novos),
+            "inseridos": self.done,
+            "repetidos_no_arquivo": plano["repetidos_no_arquivo"],
+            "ja_cadastrados": plano["ja_cadastrados"],
+            "senhas_geradas": geradas,
+            "segundos": round(elapsed, 1),
+        }
+        if not dry_run:
+            info_log(f"👥 StudentImporter: {len(novos)} alunos inseridos em {elapsed:.1f}s "
+                     f"({self.workers} processos de hash)")
+        return resultado
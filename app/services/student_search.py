@@ -0,0 +1,336 @@
+"""
+Busca de alunos por nome sobre a coluna normalizada `alunos.nome_normalizado`
+
+A coluna guarda o nome sem acentos e em minúsculas (mantida nos listeners
+abaixo), de modo que a igualdade exata usa o índice B-tree. A busca
+aproximada usa o índice de trigramas (pg_trgm) no PostgreSQL; no SQLite, uma
+tabela virtual FTS5 com tokenize='trigram' (external content, mantida por
+triggers e criada por `ensure_trigram_table` no ensure_schema), com o mesmo
+ranqueamento. Termos com menos de 3 caracteres não formam trigrama e, como um
+banco sem a tabela, caem no LIKE '%termo%' (varredura da tabela).
+
+O typeahead dos formulários administrativos não consulta o banco: usa um
+índice de prefixos em memória (lista ordenada + bisect) dos alunos ativos.
+"""
+import bisect
+import threading
+import time
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, column, event, func, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import STUDENT_INDEX
+from app.core.database import SessionLocal
+from app.models import Aluno
+from app.utils.logging import debug_log, info_log
+from app.utils.text import normalize_name
+
+# Similaridade mínima (pg_trgm) para aceitar um nome sem correspondência de substring
+SIMILARIDADE_MINIMA = 0.3
+
+SQLITE_TABLE = "alunos_nome_fts"
+
+# Engines SQLite em que a tabela FTS5 existe (consultado uma vez por engine)
+_sqlite_fts = weakref.WeakKeyDictionary()
+
+
+def _escape_like(termo: str) -> str:
+    return termo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# ============= ÍNDICE DE TRIGRAMAS (SQLITE) =============
+
+def _sqlite_trigram_ddl() -> List[str]:
+    delete_old = (
+        f"INSERT INTO {SQLITE_TABLE}({SQLITE_TABLE}, rowid, nome_normalizado) "
+        "VALUES ('delete', old.id, old.nome_normalizado);"
+    )
+    insert_new = f"INSERT INTO {SQLITE_TABLE}(rowid, nome_normalizado) VALUES (new.id, new.nome_normalizado);"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} USING fts5("
+        "nome_normalizado, content='alunos', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {SQLITE_TABLE}_ai AFTER INSERT ON alunos BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {SQLITE_TABLE}_ad AFTER DELETE ON alunos BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {SQLITE_TABLE}_au AFTER UPDATE OF nome_normalizado ON alunos "
+        f"BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def ensure_trigram_table(connection: Connection) -> bool:
+    """SQLite: cria e popula a tabela FTS5 de trigramas dos nomes; retorna True se criou"""
+    if connection.dialect.name != "sqlite":
+        return False
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": SQLITE_TABLE}
+    ).first()
+    if exists:
+        return False
+    try:
+        for statement in _sqlite_trigram_ddl():
+            connection.execute(text(statement))
+    except OperationalError as e:
+        # tokenize='trigram' exige SQLite >= 3.34; sem ele a busca segue no LIKE
+        info_log(f"⚠️ MIGRATE: Tabela FTS5 {SQLITE_TABLE} não criada: {e.orig}")
+        return False
+    connection.execute(text(f"INSERT INTO {SQLITE_TABLE}({SQLITE_TABLE}) VALUES ('rebuild')"))
+    _sqlite_fts.pop(connection.engine, None)
+    info_log(f"➕ MIGRATE: Tabela FTS5 {SQLITE_TABLE} (trigram) criada e populada")
+    return True
+
+
+def _has_trigram_table(db: Session) -> bool:
+    bind = db.get_bind()
+    if bind not in _sqlite_fts:
+        _sqlite_fts[bind] = db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": SQLITE_TABLE}
+        ).first() is not None
+    return _sqlite_fts[bind]
+
+
+class StudentSearchService:
+    """Resolução de aluno a partir de um nome (ou id) digitado/vindo da URL"""
+
+    @staticmethod
+    def resolve(db: Session, termo: str) -> Optional[Aluno]:
+        """
+        Resolve o aluno na ordem: id numérico, nome normalizado exato e, só
+        então, melhor correspondência aproximada
+        """
+        termo = (termo or "").strip()
+        if not termo:
+            return None
+
+        if termo.isdigit():
+            aluno = db.get(Aluno, int(termo))
+            if aluno:
+                return aluno
+
+        normalizado = normalize_name(termo)
+        aluno = db.query(Aluno).filter(
+            Aluno.nome_normalizado == normalizado
+        ).order_by(Aluno.id).first()
+        if aluno:
+            return aluno
+
+        aluno = StudentSearchService.fuzzy(db, normalizado)
+        if aluno:
+            debug_log(f"🔎 StudentSearchService: '{termo}' resolvido por aproximação para {aluno.nome}")
+        return aluno
+
+    @staticmethod
+    def fuzzy_query(normalizado: str, postgresql: bool, sqlite_fts: bool = False):
+        """
+        SELECT da busca aproximada
+
+        No PostgreSQL o filtro usa só operadores indexáveis pelo índice
+        gin_trgm_ops (LIKE e `%`, com o limite em pg_trgm.similarity_threshold);
+        similarity() aparece apenas na ordenação. No SQLite com `sqlite_fts`, os
+        candidatos vêm do MATCH na tabela de trigramas (a frase entre aspas
+        equivale ao LIKE '%termo%').
+        """
+        coluna = Aluno.nome_normalizado
+        padrao = _escape_like(normalizado)
+        contem = coluna.like(f"%{padrao}%", escape="\\")
+        rank = case(
+            (coluna.like(f"{padrao}%", escape="\\"), 0),
+            (coluna.like(f"% {padrao}%", escape="\\"), 1),
+            (contem, 2),
+            else_=3
+        )
+
+        if postgresql:
+            return select(Aluno).where(contem | coluna.op("%")(normalizado)).order_by(
+                rank, func.similarity(coluna, normalizado).desc(), func.length(coluna), Aluno.id
+            ).limit(1)
+        if sqlite_fts and len(normalizado) >= 3:
+            frase = '"' + normalizado.replace('"', '""') + '"'
+            candidatos = text(
+                f"SELECT rowid FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH :frase"
+            ).bindparams(frase=frase).columns(column("rowid"))
+            contem = Aluno.id.in_(candidatos)
+        return select(Aluno).where(contem).order_by(rank, func.length(coluna), Aluno.id).limit(1)
+
+    @staticmethod
+    def fuzzy(db: Session, normalizado: str) -> Optional[Aluno]:
+        """
+        Melhor correspondência aproximada para um nome já normalizado
+
+        Ranqueamento: prefixo do nome, início de palavra, substring e, no
+        PostgreSQL, similaridade de trigramas (que também tolera erros de
+        digitação); empates vão para o nome mais curto.
+        """
+        if not normalizado:
+            return None
+
+        dialect = db.get_bind().dialect.name
+        postgresql = dialect == "postgresql"
+        if postgresql:
+            # Limite do operador % só nesta transação
+            db.execute(
+                select(func.set_config("pg_trgm.similarity_threshold", str(SIMILARIDADE_MINIMA), True))
+            )
+        sqlite_fts = dialect == "sqlite" and _has_trigram_table(db)
+        return db.execute(StudentSearchService.fuzzy_query(normalizado, postgresql, sqlite_fts)).scalars().first()
+
+
+# ============= ÍNDICE DE PREFIXOS (TYPEAHEAD) =============
+
+class StudentPrefixIndex:
+    """
+    Índice em memória dos alunos ativos para busca por prefixo
+
+    Cada aluno gera uma chave por palavra do nome normalizado ("jose da
+    silva", "da silva", "silva") e uma para o e-mail; as chaves ficam numa
+    lista ordenada de (chave, id) e a busca é um bisect seguido de uma
+    varredura enquanto a chave começa com o prefixo. Alterações confirmadas
+    neste processo são aplicadas incrementalmente; o índice é recarregado do
+    banco após `ttl` segundos para refletir as de outros processos.
+    """
+
+    def __init__(self, ttl: float, max_results: int = 10):
+        self.ttl = ttl
+        self.max_results = max_results
+        self._lock = threading.Lock()
+        self._keys: List[Tuple[str, int]] = []
+        self._students: Dict[int, Tuple[str, str, Tuple[str, ...]]] = {}  # id -> (nome, email, chaves)
+        self._loaded_at: Optional[float] = None
+        self.reloads = 0
+        self.searches = 0
+
+    @staticmethod
+    def keys_for(nome: str, email: str) -> Tuple[str, ...]:
+        palavras = normalize_name(nome).split(" ")
+        keys = {" ".join(palavras[i:]) for i in range(len(palavras)) if palavras[i]}
+        if email:
+            keys.add(email.strip().lower())
+        return tuple(keys)
+
+    def load(self, rows):
+        """Substitui o conteúdo por `rows` = [(id, nome, email), ...] de alunos ativos"""
+        students = {}
+        keys = []
+        for aluno_id, nome, email in rows:
+            student_keys = self.keys_for(nome, email)
+            students[aluno_id] = (nome, email, student_keys)
+            keys.extend((key, aluno_id) for key in student_keys)
+        keys.sort()
+        with self._lock:
+            self._students = students
+            self._keys = keys
+            self._loaded_at = time.monotonic()
+            self.reloads += 1
+
+    def ensure_fresh(self, db: Session):
+        """Carrega (ou recarrega, se expirado) os alunos ativos do banco"""
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < self.ttl:
+            return
+        started = time.perf_counter()
+        rows = db.execute(select(Aluno.id, Aluno.nome, Aluno.email).where(Aluno.ativo == True)).all()
+        self.load(rows)
+        info_log(f"🔤 StudentPrefixIndex: {len(rows)} alunos indexados em {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    def upsert(self, aluno_id: int, nome: str, email: str, ativo: bool):
+        """Aplica a inclusão/alteração de um aluno (inativo sai do índice)"""
+        with self._lock:
+            self._remove_locked(aluno_id)
+            if not ativo:
+                return
+            student_keys = self.keys_for(nome, email)
+            self._students[aluno_id] = (nome, email, student_keys)
+            for key in student_keys:
+                bisect.insort(self._keys, (key, aluno_id))
+
+    def remove(self, aluno_id: int):
+        with self._lock:
+            self._remove_locked(aluno_id)
+
+    def _remove_locked(self, aluno_id: int):
+        entry = self._students.pop(aluno_id, None)
+        if entry is None:
+            return
+        for key in entry[2]:
+            pos = bisect.bisect_left(self._keys, (key, aluno_id))
+            if pos < len(self._keys) and self._keys[pos] == (key, aluno_id):
+                del self._keys[pos]
+
+    def search(self, termo: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Alunos cujo nome (qualquer palavra) ou e-mail começa com `termo`, em ordem alfabética"""
+        prefix = normalize_name(termo)
+        limit = min(limit or self.max_results, self.max_results)
+        if not prefix:
+            return []
+
+        self.searches += 1
+        found: Dict[int, Tuple[str, str, Tuple[str, ...]]] = {}
+        with self._lock:
+            keys = self._keys
+            pos = bisect.bisect_left(keys, (prefix, -1))
+            while pos < len(keys) and len(found) < limit:
+                key, aluno_id = keys[pos]
+                if not key.startswith(prefix):
+                    break
+                found.setdefault(aluno_id, self._students[aluno_id])
+                pos += 1
+
+        results = [{"id": aluno_id, "nome": nome, "email": email} for aluno_id, (nome, email, _) in found.items()]
+        return sorted(results, key=lambda r: normalize_name(r["nome"]))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "students": len(self._students),
+            "keys": len(self._keys),
+            "age_s": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+            "reloads": self.reloads,
+            "searches": self.searches,
+        }
+
+
+student_index = StudentPrefixIndex(ttl=STUDENT_INDEX["ttl"], max_results=STUDENT_INDEX["max_results"])
+
+
+def _mark_student_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("student_index_changes", {})[target.id] = (
+            target.nome, target.email, bool(target.ativo)
+        )
+
+
+def _mark_student_deleted(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("student_index_changes", {})[target.id] = None
+
+
+def _apply_after_commit(session):
+    for aluno_id, change in session.info.pop("student_index_changes", {}).items():
+        if change is None:
+            student_index.remove(aluno_id)
+        else:
+            student_index.upsert(aluno_id, *change)
+
+
+def _discard_after_rollback(session):
+    session.info.pop("student_index_changes", None)
+
+
+event.listen(Aluno, "after_insert", _mark_student_changed)
+event.listen(Aluno, "after_update", _mark_student_changed)
+event.listen(Aluno, "after_delete", _mark_student_deleted)
+event.listen(SessionLocal, "after_commit", _apply_after_commit)
+event.listen(SessionLocal, "after_rollback", _discard_after_rollback)
+
+
+# ============= MANUTENÇÃO DA COLUNA NORMALIZADA =============
+
+def _fill_normalized_name(mapper, connection, target):
+    target.nome_normalizado = normalize_name(target.nome)
+
+
+event.listen(Aluno, "before_insert", _fill_normalized_name)
+event.listen(Aluno, "before_update", _fill_normalized_name)
@@ -8,6 +8,9 @@ from typing import List, Optional, Dict, Any
 from app.models import Aluno, Avaliacao
 from app.utils.logging import info_log, debug_log, error_log
 from app.utils.datetime_utils import now_sao_paulo, utc_to_sao_paulo
+from app.utils.singleflight import single_flight
+from app.services.analytics_service import AnalyticsService
+from app.services.activity_service import ActivityService
 
 
 class StudentService:
@@ -189,33 +192,108 @@ class AdminService:
             return []
 
     @staticmethod
+    def get_dashboard_counters(db: Session) -> Dict[str, Any]:
+        """Contadores exibidos no dashboard administrativo (erros propagam para o circuit breaker)"""
+        # Janelas por período vêm da tabela de agregados diários (daily_activity)
+        return {
+            "total_alunos": db.query(Aluno).count(),
+            "total_avaliacoes": db.query(Avaliacao).count(),
+            "alunos_ativos": db.query(Aluno).filter(Aluno.ativo == True).count(),
+            **ActivityService.window_totals(db, {
+                "avaliacoes_recentes": 30, "avaliacoes_semana": 7, "avaliacoes_hoje": 1
+            })
+        }
+
+    @staticmethod
+    @single_flight()
+    def get_detailed_stats(db: Session) -> Dict[str, Any]:
+        """Estatísticas detalhadas de /admin/stats (erros propagam para o circuit breaker)"""
+        from sqlalchemy import func
+
+        counters = AdminService.get_dashboard_counters(db)
+        total_alunos = counters["total_alunos"]
+        total_avaliacoes = counters["total_avaliacoes"]
+        alunos_ativos = counters["alunos_ativos"]
+
+        # Estatísticas de IMC (histograma sobre as colunas em cache das análises)
+        imc_stats = AnalyticsService.get_imc_distribution(db)
+
+        # Média de avaliações por aluno
+        media_avaliacoes = total_avaliacoes / total_alunos if total_alunos > 0 else 0
+
+        # Alunos com progresso (mais de 1 avaliação)
+        alunos_com_progresso = db.query(Aluno.id).join(Avaliacao).group_by(Aluno.id).having(
+            func.count(Avaliacao.id) > 1
+        ).count()
+
+        # Top 5 alunos mais ativos (por número de avaliações)
+        top_alunos = db.query(
+            Aluno.nome,
+            func.count(Avaliacao.id).label('avaliacoes')
+        ).join(Avaliacao).group_by(Aluno.id, Aluno.nome).order_by(
+            func.count(Avaliacao.id).desc()
+        ).limit(5).all()
+
+        return {
+            "total_alunos": total_alunos,
+            "alunos_ativos": alunos_ativos,
+            "total_avaliacoes": total_avaliacoes,
+            "avaliacoes_recentes": counters["avaliacoes_recentes"],
+            "avaliacoes_semana": counters["avaliacoes_semana"],
+            "avaliacoes_hoje": counters["avaliacoes_hoje"],
+            "atividade_diaria": ActivityService.daily_series(db, 30),
+            "media_avaliacoes": round(media_avaliacoes, 1),
+            "alunos_com_progresso": alunos_com_progresso,
+            "imc_stats": imc_stats,
+            "top_alunos": top_alunos,  # linhas (nome, avaliacoes), serializadas pelo orjson
+            "percentual_ativos": round((alunos_ativos / total_alunos * 100) if total_alunos > 0 else 0, 1),
+            "percentual_com_progresso": round((alunos_com_progresso / total_alunos * 100) if total_alunos > 0 else 0, 1),
+            "timestamp": now_sao_paulo()
+        }
+
+    @staticmethod
+    @single_flight()
+    def get_report_aggregates(db: Session) -> Dict[str, Any]:
+        """Agregados da página de relatórios administrativos"""
+        from sqlalchemy import func
+
+        counters = AdminService.get_dashboard_counters(db)
+
+        # Top 5 alunos mais ativos
+        top_alunos_ativos = db.query(
+            Aluno.nome,
+            func.count(Avaliacao.id).label('total_avaliacoes')
+        ).join(Avaliacao).group_by(Aluno.id, Aluno.nome).order_by(
+            func.count(Avaliacao.id).desc()
+        ).limit(5).all()
+
+        return {
+            "total_alunos": counters["total_alunos"],
+            "total_avaliacoes": counters["total_avaliacoes"],
+            "count_alunos_ativos": counters["alunos_ativos"],
+            "avaliacoes_recentes": counters["avaliacoes_recentes"],
+            "top_alunos_ativos": top_alunos_ativos
+        }
+
+    @staticmethod
+    @single_flight()
     def get_system_stats(db: Session) -> Dict[str, Any]:
         """Calcula estatísticas gerais do sistema"""
         try:
-            from sqlalchemy import func
-
             # Estatísticas básicas
             total_alunos = db.query(Aluno).count()
             alunos_ativos = db.query(Aluno).filter(Aluno.ativo == True).count()
             total_avaliacoes = db.query(Avaliacao).count()
 
-            # Avaliações dos últimos 30 dias
-            from datetime import timedelta
-            data_limite = now_sao_paulo() - timedelta(days=30)
-            avaliacoes_recentes = db.query(Avaliacao).filter(
-                Avaliacao.data >= data_limite
-            ).count()
-
-            # IMC médio do sistema
-            imc_medio = db.query(func.avg(Avaliacao.imc)).filter(
-                Avaliacao.imc.isnot(None)
-            ).scalar()
+            # Avaliações dos últimos 30 dias e IMC médio (agregados diários)
+            janelas = ActivityService.window_totals(db, {"ultimos_30_dias": 30})
+            imc_medio = ActivityService.imc_medio(db)
 
             stats = {
                 "total_alunos": total_alunos,
                 "alunos_ativos": alunos_ativos,
                 "total_avaliacoes": total_avaliacoes,
-                "avaliacoes_ultimos_30_dias": avaliacoes_recentes,
+                "avaliacoes_ultimos_30_dias": janelas["ultimos_30_dias"],
                 "imc_medio": round(float(imc_medio), 2) if imc_medio else None,
                 "timestamp": now_sao_paulo().isoformat()
             }
@@ -0,0 +1,343 @@
+"""
+Dados sintéticos para testes de escala (alunos, avaliações e admins)
+
+Cada aluno é gerado por um `random.Random` próprio, semeado pela semente do
+conjunto e pelo índice do aluno: o mesmo comando produz sempre os mesmos dados,
+independentemente do tamanho do lote. As trajetórias de peso seguem uma
+tendência por aluno com ruído; dobras cutâneas e circunferências acompanham o
+IMC, e a composição corporal é calculada em lote pelas mesmas fórmulas do
+insert (body_composition), já que a carga não passa pelos eventos do ORM.
+
+A carga usa INSERT em lote (executemany) com ids explícitos ou, no PostgreSQL,
+COPY FROM STDIN. A senha é hasheada uma única vez e reaproveitada em todas as
+contas. Ao final os agregados diários são reconciliados.
+
+Rodar de novo sem limpar continua o conjunto: alunos e admins cujos índices já
+existem são pulados (o mesmo índice gera sempre o mesmo e-mail).
+"""
+import csv
+import io
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.models import Aluno, Avaliacao, Usuario
+from app.services.activity_service import ActivityService
+from app.services.auth_service import hash_password
+from app.services.body_composition import DERIVED_COLUMNS, INPUT_COLUMNS, compute_body_composition
+from app.utils.datetime_utils import now_sao_paulo
+from app.utils.lazy_import import lazy_import
+from app.utils.logging import info_log
+from app.utils.text import normalize_name
+
+np = lazy_import("numpy")
+
+# Contas sintéticas ficam neste domínio (removidas por `clear_synthetic_data`)
+DOMINIO = "sintetico.monipersonal.local"
+SENHA_PADRAO = "sintetico123"
+
+PRIMEIROS_NOMES = {
+    "M": ("João", "José", "Pedro", "Lucas", "Gabriel", "Rafael", "Mateus", "Gustavo", "Felipe", "Bruno",
+          "André", "Thiago", "Rodrigo", "Marcelo", "Diego", "Vinícius", "Leonardo", "Caio", "Henrique", "Otávio"),
+    "F": ("Maria", "Ana", "Juliana", "Fernanda", "Camila", "Beatriz", "Larissa", "Patrícia", "Aline", "Letícia",
+          "Mariana", "Gabriela", "Bruna", "Carolina", "Vanessa", "Luíza", "Renata", "Débora", "Natália", "Cíntia"),
+}
+SOBRENOMES = (
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+    "Costa", "Ribeiro", "Martins", "Carvalho", "Araújo", "Melo", "Barbosa", "Cardoso", "Rocha", "Conceição",
+)
+OBSERVACOES = (
+    "Dor no joelho direito durante o agachamento", "Sem queixas", "Relata melhora no sono",
+    "Treinou menos por causa de viagem", "Aumentou a carga no supino", "Cansaço no final dos treinos",
+    "Lombar incomodando no levantamento terra", "Começou a correr duas vezes por semana",
+)
+ALIMENTACAO = (
+    "Reduziu o açúcar", "Dificuldade com o jantar", "Segue o plano alimentar", "Muitos lanches fora de casa",
+    "Aumentou a ingestão de proteína", "Bebendo pouca água",
+)
+
+# Distribuição das dobras do protocolo JP7 (fração da soma das 7 dobras)
+PESO_DOBRAS = {
+    "M": {"dobra_peitoral": 0.12, "dobra_axilar_media": 0.14, "dobra_tricipital": 0.11, "dobra_subescapular": 0.16,
+          "dobra_abdominal": 0.20, "dobra_suprailiaca": 0.14, "dobra_coxa": 0.13},
+    "F": {"dobra_peitoral": 0.08, "dobra_axilar_media": 0.12, "dobra_tricipital": 0.17, "dobra_subescapular": 0.14,
+          "dobra_abdominal": 0.17, "dobra_suprailiaca": 0.15, "dobra_coxa": 0.17},
+}
+
+# Fração das avaliações só com peso/altura (formulário do aluno, sem dobras)
+FRACAO_SEM_MEDIDAS = 0.2
+
+ALUNO_COLUMNS = ("id", "nome", "nome_normalizado", "email", "telefone", "senha_hash",
+                 "data_nascimento", "sexo", "ativo", "created_at")
+
+
+def email_aluno(indice: int) -> str:
+    return f"aluno{indice:06d}@{DOMINIO}"
+
+
+def email_admin(indice: int) -> str:
+    return f"admin{indice}@{DOMINIO}"
+
+
+# ============= GERAÇÃO =============
+
+def _circunferencias(rng: random.Random, imc: float, altura: float, sexo: str) -> Dict[str, float]:
+    escala = imc / 22.0
+    homem = sexo == "M"
+    base = {
+        "circunferencia_pescoco": (38.0 if homem else 32.0) * escala ** 0.5,
+        "circunferencia_torax": (96.0 if homem else 88.0) * escala ** 0.6,
+        "circunferencia_cintura": (0.45 if homem else 0.42) * altura * escala ** 0.9,
+        "circunferencia_abdome": (0.48 if homem else 0.46) * altura * escala ** 0.9,
+        "circunferencia_quadril": (0.56 if homem else 0.60) * altura * escala ** 0.6,
+        "circunferencia_braco_direito": (31.0 if homem else 27.0) * escala ** 0.7,
+        "circunferencia_antebraco_direito": (27.0 if homem else 23.0) * escala ** 0.5,
+        "circunferencia_coxa_direita": (54.0 if homem else 55.0) * escala ** 0.7,
+        "circunferencia_panturrilha_direita": (37.0 if homem else 35.0) * escala ** 0.5,
+    }
+    medidas = {name: round(value * rng.uniform(0.97, 1.03), 1) for name, value in base.items()}
+    for direito, esquerdo in (("braco_direito", "braco_esquerdo"), ("antebraco_direito", "antebraco_esquerdo"),
+                              ("coxa_direita", "coxa_esquerda"), ("panturrilha_direita", "panturrilha_esquerda")):
+        medidas[f"circunferencia_{esquerdo}"] = round(medidas[f"circunferencia_{direito}"] * rng.uniform(0.97, 1.01), 1)
+    return medidas
+
+
+def _dobras(rng: random.Random, imc: float, idade: float, sexo: str) -> Dict[str, float]:
+    # Percentual estimado pelo IMC (Deurenberg) convertido em soma de 7 dobras aproximada
+    homem = sexo == "M"
+    gordura = max(6.0, 1.2 * imc + 0.23 * idade - 10.8 * homem - 5.4)
+    soma = gordura * (4.0 if homem else 3.6) * rng.uniform(0.9, 1.1)
+    dobras = {site: round(soma * peso * rng.uniform(0.9, 1.1), 1) for site, peso in PESO_DOBRAS[sexo].items()}
+    dobras["dobra_bicipital"] = round(dobras["dobra_tricipital"] * rng.uniform(0.4, 0.6), 1)
+    return dobras
+
+
+def generate_student(seed: int, indice: int, avaliacoes_media: float, agora: datetime
+                     ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Aluno `indice` do conjunto `seed` e suas avaliações (em ordem cronológica)"""
+    rng = random.Random(seed * 1_000_003 + indice)
+    sexo = rng.choice("MF")
+    nome = f"{rng.choice(PRIMEIROS_NOMES[sexo])} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+    idade = rng.uniform(18, 65)
+    altura = rng.gauss(176, 7) if sexo == "M" else rng.gauss(163, 6)
+    imc = min(max(rng.gauss(27, 4), 18.0), 42.0)
+    peso = imc * (altura / 100) ** 2
+    tendencia = rng.gauss(-0.25, 0.3)  # kg por semana
+
+    quantidade = max(1, round(rng.gauss(avaliacoes_media, avaliacoes_media * 0.3)))
+    intervalos = [rng.randint(14, 42) for _ in range(quantidade)]
+    data = agora - timedelta(days=sum(intervalos) - intervalos[0] + rng.randint(0, 30),
+                             hours=rng.randint(0, 12), minutes=rng.randint(0, 59))
+    nascimento = agora - timedelta(days=idade * 365.25)
+
+    aluno = {
+        "nome": nome,
+        "nome_normalizado": normalize_name(nome),
+        "email": email_aluno(indice),
+        "telefone": f"(11) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+        "data_nascimento": nascimento.replace(hour=0, minute=0, second=0, microsecond=0),
+        "sexo": sexo,
+        "ativo": True,
+        "created_at": data - timedelta(days=rng.randint(0, 10)),
+    }
+
+    avaliacoes = []
+    for n, intervalo in enumerate(intervalos):
+        if n:
+            peso += tendencia * intervalo / 7 + rng.gauss(0, 0.6)
+            data += timedelta(days=intervalo)
+        peso = min(max(peso, 40.0), 180.0)
+        imc_atual = peso / (altura / 100) ** 2
+        avaliacao = {
+            "nome": nome,
+            "peso_kg": round(peso, 1),
+            "altura_cm": round(altura, 1),
+            "imc": round(imc_atual, 2),
+            "data": data,
+            "created_at": data,
+            "observacoes_medidas": rng.choice(OBSERVACOES) if rng.random() < 0.3 else None,
+            "alimentacao": rng.choice(ALIMENTACAO) if rng.random() < 0.3 else None,
+        }
+        if rng.random() >= FRACAO_SEM_MEDIDAS:
+            idade_atual = (data - nascimento).days / 365.25
+            avaliacao.update(_circunferencias(rng, imc_atual, altura, sexo))
+            avaliacao.update(_dobras(rng, imc_atual, idade_atual, sexo))
+        avaliacoes.append(avaliacao)
+    return aluno, avaliacoes
+
+
+def fill_body_composition(alunos: List[Dict[str, Any]], avaliacoes: List[Dict[str, Any]]):
+    """Colunas derivadas de um lote de avaliações (mesmas fórmulas do insert pelo ORM)"""
+    if not avaliacoes:
+        return
+    por_id = {aluno["id"]: aluno for aluno in alunos}
+    columns = {name: np.array([a.get(name) for a in avaliacoes], dtype=np.float64) for name in INPUT_COLUMNS}
+    sexo = np.array([1.0 if por_id[a["aluno_id"]]["sexo"] == "M" else 0.0 for a in avaliacoes])
+    idade = np.array([(a["data"] - por_id[a["aluno_id"]]["data_nascimento"]).days / 365.25 for a in avaliacoes])
+    derived = compute_body_composition(columns, sexo, idade, np.full(len(avaliacoes), np.nan))
+    for name in DERIVED_COLUMNS:
+        for avaliacao, value in zip(avaliacoes, derived[name].tolist()):
+            avaliacao[name] = None if isinstance(value, float) and math.isnan(value) else value
+
+
+# ============= CARGA =============
+
+def _copy_rows(connection: Connection, table: str, columns: List[str], rows: List[Dict[str, Any]]):
+    """COPY FROM STDIN (PostgreSQL); None vira NULL"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if row.get(c) is None else row.get(c) for c in columns])
+    buffer.seek(0)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '')", buffer)
+    finally:
+        cursor.close()
+
+
+class SyntheticDataLoader:
+    """Gera e carrega um conjunto sintético determinístico em lotes"""
+
+    def __init__(
+        self,
+        engine: Engine,
+        alunos: int,
+        avaliacoes_por_aluno: float = 20,
+        admins: int = 3,
+        seed: int = 42,
+        senha: str = SENHA_PADRAO,
+        batch_size: int = 5000,
+        use_copy: Optional[bool] = None,
+    ):
+        self.engine = engine
+        self.alunos = alunos
+        self.avaliacoes_por_aluno = avaliacoes_por_aluno
+        self.admins = admins
+        self.seed = seed
+        self.senha = senha
+        self.batch_size = batch_size
+        is_postgresql = engine.dialect.name == "postgresql"
+        self.use_copy = is_postgresql if use_copy is None else (use_copy and is_postgresql)
+        self.done = 0
+        self.total = alunos
+        self.avaliacoes_inseridas = 0
+
+    def _batches(self, indices: List[int], senha_hash: str, agora: datetime, aluno_id: int, avaliacao_id: int
+                 ) -> Iterator[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        alunos: List[Dict[str, Any]] = []
+        avaliacoes: List[Dict[str, Any]] = []
+        for indice in indices:
+            aluno, historico = generate_student(self.seed, indice, self.avaliacoes_por_aluno, agora)
+            aluno.update(id=aluno_id, senha_hash=senha_hash)
+            alunos.append(aluno)
+            for avaliacao in historico:
+                avaliacao.update(id=avaliacao_id, aluno_id=aluno_id)
+                avaliacao_id += 1
+            avaliacoes.extend(historico)
+            aluno_id += 1
+            if len(avaliacoes) >= self.batch_size:
+                yield alunos, avaliacoes
+                alunos, avaliacoes = [], []
+        if alunos:
+            yield alunos, avaliacoes
+
+    def _write(self, connection: Connection, alunos: List[Dict[str, Any]], avaliacoes: List[Dict[str, Any]]):
+        avaliacao_columns = sorted({key for avaliacao in avaliacoes for key in avaliacao})
+        if self.use_copy:
+            _copy_rows(connection, "alunos", list(ALUNO_COLUMNS), alunos)
+            if avaliacoes:
+                _copy_rows(connection, "avaliacoes", avaliacao_columns, avaliacoes)
+            return
+        connection.execute(insert(Aluno.__table__), alunos)
+        if avaliacoes:
+            # executemany exige as mesmas chaves em todas as linhas
+            connection.execute(
+                insert(Avaliacao.__table__), [{c: a.get(c) for c in avaliacao_columns} for a in avaliacoes]
+            )
+
+    def _reset_sequences(self, connection: Connection):
+        if self.engine.dialect.name != "postgresql":
+            return
+        for table in ("alunos", "avaliacoes", "usuarios"):
+            connection.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+            ))
+
+    def run(self, progress: Optional[Callable[["SyntheticDataLoader"], None]] = None) -> Dict[str, Any]:
+        """
+        Gera e grava o conjunto (uma transação por lote)
+
+        Alunos e admins já presentes (mesmo índice de uma carga anterior) são
+        pulados, então uma segunda execução só completa o conjunto.
+
+        Returns:
+            Dict com alunos, avaliacoes, admins inseridos, alunos já existentes
+            e duração em segundos
+        """
+        started = time.perf_counter()
+        senha_hash = hash_password(self.senha)  # um único hash para todas as contas
+        agora = now_sao_paulo().replace(tzinfo=None)
+
+        with self.engine.begin() as connection:
+            aluno_id = (connection.execute(select(func.max(Aluno.id))).scalar() or 0) + 1
+            avaliacao_id = (connection.execute(select(func.max(Avaliacao.id))).scalar() or 0) + 1
+            existentes = set(connection.execute(
+                select(Usuario.email).where(Usuario.email.like(f"%@{DOMINIO}"))
+            ).scalars())
+            alunos_existentes = set(connection.execute(
+                select(Aluno.email).where(Aluno.email.like(f"%@{DOMINIO}"))
+            ).scalars())
+            admins = [
+                {"email": email_admin(i), "nome": f"Admin Sintético {i}", "senha_hash": senha_hash,
+                 "tipo": "admin", "ativo": True, "created_at": agora}
+                for i in range(self.admins) if email_admin(i) not in existentes
+            ]
+            if admins:
+                connection.execute(insert(Usuario.__table__), admins)
+
+        indices = [i for i in range(self.alunos) if email_aluno(i) not in alunos_existentes]
+        self.total = len(indices)
+        ja_existentes = self.alunos - len(indices)
+        if ja_existentes:
+            info_log(f"🧪 SyntheticDataLoader: {ja_existentes} alunos sintéticos já existem e serão pulados")
+
+        for alunos, avaliacoes in self._batches(indices, senha_hash, agora, aluno_id, avaliacao_id):
+            fill_body_composition(alunos, avaliacoes)
+            with self.engine.begin() as connection:
+                self._write(connection, alunos, avaliacoes)
+            self.done += len(alunos)
+            self.avaliacoes_inseridas += len(avaliacoes)
+            if progress:
+                progress(self)
+
+        with self.engine.begin() as connection:
+            self._reset_sequences(connection)
+        with Session(self.engine) as db:
+            ActivityService.reconcile(db)
+
+        elapsed = time.perf_counter() - started
+        info_log(
+            f"🧪 SyntheticDataLoader: {self.done} alunos, {self.avaliacoes_inseridas} avaliações e "
+            f"{len(admins)} admins em {elapsed:.1f}s ({'COPY' if self.use_copy else 'INSERT em lote'})"
+        )
+        return {"alunos": self.done, "avaliacoes": self.avaliacoes_inseridas, "admins": len(admins),
+                "ja_existentes": ja_existentes, "segundos": round(elapsed, 1)}
+
+
+def clear_synthetic_data(engine: Engine) -> Dict[str, int]:
+    """Remove as contas do domínio sintético e as avaliações dos alunos sintéticos"""
+    with engine.begin() as connection:
+        alunos = select(Aluno.id).where(Aluno.email.like(f"%@{DOMINIO}")).scalar_subquery()
+        avaliacoes = connection.execute(delete(Avaliacao).where(Avaliacao.aluno_id.in_(alunos))).rowcount
+        removidos = connection.execute(delete(Aluno).where(Aluno.email.like(f"%@{DOMINIO}"))).rowcount
+        admins = connection.execute(delete(Usuario).where(Usuario.email.like(f"%@{DOMINIO}"))).rowcount
+    with Session(engine) as db:
+        ActivityService.reconcile(db)
+    return {"alunos": removidos, "avaliacoes": avaliacoes, "admins": admins}
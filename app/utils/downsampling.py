@@ -0,0 +1,53 @@
+"""
+Downsampling de séries temporais para gráficos (Largest-Triangle-Three-Buckets)
+"""
+from typing import List, Sequence, Tuple
+
+
+def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> Tuple[List[float], List[float]]:
+    """
+    Reduz a série (xs, ys) para `threshold` pontos preservando sua forma visual
+
+    Mantém o primeiro e o último ponto e, em cada balde intermediário, escolhe o
+    ponto que forma o maior triângulo com o ponto anterior escolhido e a média
+    do balde seguinte. `xs` deve estar em ordem crescente.
+
+    Returns:
+        Tuple[List[float], List[float]]: xs e ys reduzidos
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(xs), list(ys)
+
+    sampled_x = [xs[0]]
+    sampled_y = [ys[0]]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0  # índice do último ponto escolhido
+
+    for i in range(threshold - 2):
+        # Média do próximo balde (terceiro vértice do triângulo)
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        count = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / count
+        avg_y = sum(ys[next_start:next_end]) / count
+
+        # Ponto do balde atual com a maior área
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        ax, ay = xs[a], ys[a]
+        best_area = -1.0
+        best = start
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+
+        sampled_x.append(xs[best])
+        sampled_y.append(ys[best])
+        a = best
+
+    sampled_x.append(xs[-1])
+    sampled_y.append(ys[-1])
+    return sampled_x, sampled_y
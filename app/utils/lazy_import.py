@@ -0,0 +1,83 @@
+"""
+Import tardio de dependências pesadas ou opcionais
+
+`lazy_import("numpy")` devolve um módulo substituto: o import real acontece no
+primeiro acesso a um atributo, e a partir daí os atributos ficam no próprio
+substituto (sem custo extra por acesso). Serve para manter fora do cold start
+bibliotecas usadas só em algumas rotas ou jobs (numpy, weasyprint, reportlab,
+google-cloud-*, opentelemetry).
+
+Anotações de tipo como `np.ndarray` acessam o módulo na definição da função;
+os módulos que usam o substituto declaram `from __future__ import annotations`.
+"""
+import importlib
+import sys
+import threading
+import time
+import types
+from typing import Any, Dict, Optional
+
+from app.utils.logging import debug_log
+
+_lock = threading.RLock()
+_registry: Dict[str, "LazyModule"] = {}
+
+
+class LazyModule(types.ModuleType):
+    """Substituto de módulo que executa o import no primeiro acesso a atributo"""
+
+    def __init__(self, name: str, install_hint: Optional[str] = None):
+        super().__init__(name)
+        self.__dict__["_lazy_install_hint"] = install_hint
+        self.__dict__["_lazy_load_ms"] = None
+
+    def _lazy_load(self) -> types.ModuleType:
+        with _lock:
+            module = sys.modules.get(self.__name__)
+            if module is None or module is self:
+                started = time.perf_counter()
+                try:
+                    module = importlib.import_module(self.__name__)
+                except ImportError as e:
+                    hint = self.__dict__["_lazy_install_hint"]
+                    raise ImportError(
+                        f"Dependência opcional '{self.__name__}' não instalada"
+                        + (f" (pip install {hint})" if hint else "")
+                    ) from e
+                load_ms = round((time.perf_counter() - started) * 1000, 1)
+                self.__dict__["_lazy_load_ms"] = load_ms
+                debug_log(f"📦 LAZY-IMPORT: {self.__name__} carregado em {load_ms}ms")
+            self.__dict__.update(module.__dict__)
+            return module
+
+    def __getattr__(self, attr: str) -> Any:
+        # Só é chamado para atributos ausentes: antes do import, qualquer um
+        return getattr(self._lazy_load(), attr)
+
+    def __dir__(self):
+        return dir(self._lazy_load())
+
+    def __repr__(self) -> str:
+        state = "carregado" if self.is_loaded else "pendente"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+    @property
+    def is_loaded(self) -> bool:
+        return "__file__" in self.__dict__ or "__path__" in self.__dict__
+
+
+def lazy_import(name: str, install_hint: Optional[str] = None) -> LazyModule:
+    """Substituto (compartilhado por nome) para o módulo `name`"""
+    with _lock:
+        module = _registry.get(name)
+        if module is None:
+            module = _registry[name] = LazyModule(name, install_hint)
+        return module
+
+
+def lazy_import_stats() -> Dict[str, Dict[str, Any]]:
+    """Estado de cada módulo registrado: carregado ou não e tempo do import"""
+    return {
+        name: {"loaded": module.is_loaded, "load_ms": module.__dict__["_lazy_load_ms"]}
+        for name, module in sorted(_registry.items())
+    }
@@ -0,0 +1,193 @@
+"""
+Circuit breaker e cache stale-while-revalidate para consultas de leitura
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.utils.logging import info_log, error_log
+
+
+class CircuitOpenError(Exception):
+    """Circuito aberto e nenhum valor anterior disponível para servir"""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker clássico (fechado → aberto → meio-aberto)
+
+    Após `failure_threshold` falhas consecutivas o circuito abre e recusa
+    chamadas por `reset_timeout` segundos; depois disso uma única chamada de
+    teste é liberada (meio-aberto) e o resultado dela fecha ou reabre o circuito.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.total_failures = 0
+        self.total_successes = 0
+        self.rejections = 0
+        self.times_opened = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Indica se uma chamada pode ir ao banco agora"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejections += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.total_successes += 1
+            self.consecutive_failures = 0
+            if self.state != self.CLOSED:
+                info_log(f"✅ CIRCUIT[{self.name}]: Circuito fechado novamente")
+            self.state = self.CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.total_failures += 1
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                    error_log(f"⚡ CIRCUIT[{self.name}]: Circuito aberto após {self.consecutive_failures} falhas")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "failures": self.total_failures,
+                "successes": self.total_successes,
+                "rejections": self.rejections,
+                "times_opened": self.times_opened,
+            }
+
+
+class StaleWhileRevalidateCache:
+    """
+    Cache de agregados com fallback para o último valor bom
+
+    - Valor dentro do TTL: servido direto.
+    - Valor expirado: uma única atualização roda em background (threadpool);
+      quem chega espera no máximo `deadline` segundos e, se estourar, recebe o
+      último valor bom marcado como desatualizado (stale).
+    - Sem valor algum (cache frio, ex.: worker recém-criado): não há o que
+      servir no lugar, então a primeira carga é aguardada sem o prazo.
+    - Circuito aberto ou falha na consulta: último valor bom, também stale.
+    """
+
+    def __init__(self, name: str, ttl: float, deadline: float, breaker: CircuitBreaker):
+        self.name = name
+        self.ttl = ttl
+        self.deadline = deadline
+        self.breaker = breaker
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._refreshing: Dict[str, asyncio.Future] = {}
+        self.stale_served = 0
+        self.timeouts = 0
+
+    async def get(self, key: str, loader: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Retorna (valor, stale) para a chave
+
+        Args:
+            loader: função síncrona que consulta o banco (executada no threadpool)
+
+        Raises:
+            CircuitOpenError: circuito aberto e nenhum valor anterior em cache
+            Exception: falha do loader sem valor anterior em cache
+        """
+        entry = self._entries.get(key)
+        if entry and time.monotonic() - entry[0] < self.ttl:
+            return entry[1], False
+
+        refresh = self._refreshing.get(key)
+        if refresh is None:
+            if not self.breaker.allow():
+                return self._serve_stale(entry, CircuitOpenError(f"Circuito {self.name} aberto"))
+            refresh = self._start_refresh(key, loader)
+
+        if entry is None:
+            # Cache frio: estourar o prazo só transformaria uma consulta lenta em erro
+            return await asyncio.shield(refresh), False
+
+        try:
+            value = await asyncio.wait_for(asyncio.shield(refresh), timeout=self.deadline)
+            return value, False
+        except asyncio.TimeoutError as e:
+            self.timeouts += 1
+            return self._serve_stale(entry, e)
+        except Exception as e:
+            return self._serve_stale(entry, e)
+
+    def _start_refresh(self, key: str, loader: Callable[[], Any]) -> asyncio.Future:
+        async def refresh():
+            started = time.monotonic()
+            try:
+                value = await run_in_threadpool(loader)
+            except Exception as e:
+                self.breaker.record_failure()
+                error_log(f"❌ CACHE[{self.name}]: Falha ao atualizar '{key}': {str(e)}")
+                raise
+            finally:
+                self._refreshing.pop(key, None)
+
+            # Consulta que estourou o prazo conta como falha mesmo tendo concluído
+            if time.monotonic() - started > self.deadline:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            self._entries[key] = (time.monotonic(), value)
+            return value
+
+        task = asyncio.ensure_future(refresh())
+        # Evita "exception was never retrieved" quando ninguém mais aguarda a tarefa
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._refreshing[key] = task
+        return task
+
+    def _serve_stale(self, entry: Optional[Tuple[float, Any]], error: Exception) -> Tuple[Any, bool]:
+        if entry is None:
+            raise error
+        self.stale_served += 1
+        return entry[1], True
+
+    def last_updated(self, key: str) -> Optional[float]:
+        """Idade em segundos do último valor bom da chave"""
+        entry = self._entries.get(key)
+        return time.monotonic() - entry[0] if entry else None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "refreshing": len(self._refreshing),
+            "stale_served": self.stale_served,
+            "timeouts": self.timeouts,
+            "breaker": self.breaker.snapshot(),
+        }
@@ -0,0 +1,135 @@
+"""
+Single-flight: chamadas concorrentes idênticas compartilham uma única execução
+"""
+import asyncio
+import functools
+import inspect
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable
+
+
+class _Call:
+    """Execução em andamento de uma chave (variante síncrona)"""
+
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Agrupa execuções concorrentes por chave
+
+    Enquanto uma execução de `key` está em andamento, novas chamadas com a
+    mesma chave aguardam e recebem o mesmo resultado (ou a mesma exceção) em
+    vez de repetir o trabalho. Nada é guardado após o término: isso não é um
+    cache, apenas remove trabalho duplicado durante rajadas.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Executa fn(*args, **kwargs) uma vez por chave entre threads concorrentes"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Aguarda a corrotina fn() uma vez por chave entre tarefas concorrentes"""
+        future = self._futures.get(key)
+        if future is not None:
+            self.shared += 1
+            return await asyncio.shield(future)
+
+        self.executed += 1
+        future = asyncio.ensure_future(fn())
+        self._futures[key] = future
+        future.add_done_callback(lambda _: self._futures.pop(key, None))
+        return await asyncio.shield(future)
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._calls) + len(self._futures),
+            "executed": self.executed,
+            "shared": self.shared,
+        }
+
+
+# Grupo padrão da aplicação (métricas exportadas em /admin/metrics)
+default_group = SingleFlight()
+
+
+def _freeze(value: Any) -> Hashable:
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+def single_flight(group: SingleFlight = None, ignore: Iterable[str] = ("db",)):
+    """
+    Decorator que aplica single-flight a uma função síncrona ou assíncrona
+
+    A chave é a função (módulo + nome qualificado) mais os argumentos, exceto
+    os listados em `ignore` (por padrão a sessão do banco, que difere entre
+    chamadas mas não altera o resultado).
+    """
+    ignored = set(ignore)
+
+    def decorator(func):
+        flight = group or default_group
+        signature = inspect.signature(func)
+        prefix = f"{func.__module__}.{func.__qualname__}"
+
+        def make_key(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return (prefix,) + tuple(
+                (name, _freeze(value))
+                for name, value in bound.arguments.items()
+                if name not in ignored
+            )
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await flight.do_async(make_key(args, kwargs), lambda: func(*args, **kwargs))
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return flight.do(make_key(args, kwargs), func, *args, **kwargs)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,85 @@
+"""
+Recursos do processo e do container: CPUs disponíveis e uso de memória
+
+Lidos de /proc e do cgroup (v2 ou v1) no Linux; fora dele os valores caem para
+os equivalentes do os (ou None quando não há equivalente).
+"""
+import math
+import os
+from typing import Dict, Optional
+
+_CGROUP_V2_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+_CGROUP_V1_QUOTA = "/sys/fs/cgroup/cpu/cpu.cfs_quota_us"
+_CGROUP_V1_PERIOD = "/sys/fs/cgroup/cpu/cpu.cfs_period_us"
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cpu_quota() -> Optional[float]:
+    """CPUs concedidas pela cota do cgroup (ex.: 1.0 no Cloud Run com 1 vCPU); None se sem limite"""
+    cpu_max = _read(_CGROUP_V2_CPU_MAX)
+    if cpu_max:
+        quota, _, period = cpu_max.partition(" ")
+        if quota != "max" and period:
+            return int(quota) / int(period)
+        return None
+
+    quota, period = _read(_CGROUP_V1_QUOTA), _read(_CGROUP_V1_PERIOD)
+    if quota and period and int(quota) > 0:
+        return int(quota) / int(period)
+    return None
+
+
+def available_cpus() -> int:
+    """Núcleos disponíveis para este processo (respeita afinidade de CPU e cota do cgroup)"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return cpus
+
+
+def memory_usage() -> Dict[str, Optional[int]]:
+    """
+    Memória deste processo em KiB
+
+    rss conta páginas compartilhadas com o master (copy-on-write) em cada
+    worker; pss divide as compartilhadas entre os processos e private_kb é o
+    custo real de mais um worker.
+    """
+    usage: Dict[str, Optional[int]] = {"rss_kb": None, "pss_kb": None, "shared_kb": None, "private_kb": None}
+    rollup = _read("/proc/self/smaps_rollup")
+    if rollup:
+        campos = {}
+        for line in rollup.splitlines()[1:]:
+            nome, _, valor = line.partition(":")
+            partes = valor.split()
+            if partes and partes[0].isdigit():
+                campos[nome] = int(partes[0])
+        usage["rss_kb"] = campos.get("Rss")
+        usage["pss_kb"] = campos.get("Pss")
+        usage["shared_kb"] = campos.get("Shared_Clean", 0) + campos.get("Shared_Dirty", 0)
+        usage["private_kb"] = campos.get("Private_Clean", 0) + campos.get("Private_Dirty", 0)
+        return usage
+
+    status = _read("/proc/self/status")
+    for line in (status or "").splitlines():
+        if line.startswith("VmRSS:"):
+            usage["rss_kb"] = int(line.split()[1])
+            break
+    else:
+        try:
+            import resource
+            usage["rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # pico, não atual
+        except ImportError:
+            pass
+    return usage
@@ -0,0 +1,20 @@
+"""
+Normalização de texto para buscas
+"""
+import re
+import unicodedata
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_name(nome: str) -> str:
+    """
+    Forma canônica de um nome para comparação: sem acentos, minúsculo e com
+    espaços simples (ex.: "  José  da Silva" -> "jose da silva")
+    """
+    if not nome:
+        return ""
+    sem_acentos = "".join(
+        c for c in unicodedata.normalize("NFKD", nome) if not unicodedata.combining(c)
+    )
+    return _WHITESPACE.sub(" ", sem_acentos).strip().lower()
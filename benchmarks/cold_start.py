@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Mede o cold start da aplicação: do exec do uvicorn ao primeiro byte de /ping
+
+Cada rodada inicia um processo novo e faz polling até a primeira resposta.
+Falha (código 1) se a mediana passar do orçamento (STARTUP_BUDGET_MS).
+
+Uso:
+    python benchmarks/cold_start.py [--runs 5] [--budget-ms 3000] [--database-url URL]
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_once(env: dict, timeout: float) -> float:
+    """Milissegundos entre o exec do processo e a primeira resposta de /ping"""
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/ping", timeout=1) as response:
+                    response.read(1)
+                    return (time.perf_counter() - started) * 1000
+            except OSError:
+                if process.poll() is not None:
+                    raise RuntimeError(f"uvicorn encerrou com código {process.returncode}")
+                time.sleep(0.01)
+        raise TimeoutError(f"sem resposta em {timeout:.0f}s")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main() -> bool:
+    parser = argparse.ArgumentParser(description="Benchmark de cold start (exec -> primeiro byte)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", "3000")))
+    parser.add_argument("--database-url", help="Banco usado pelos processos (padrão: SQLite temporário)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.setdefault("SCHEDULER_ENABLED", "false")
+        env["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tmp, 'cold_start.db')}"
+        env["AUTO_MIGRATE"] = env.get("AUTO_MIGRATE", "false")
+
+        runs = [round(measure_once(env, args.timeout), 1) for _ in range(args.runs)]
+
+    median = statistics.median(runs)
+    report = {
+        "runs_ms": runs,
+        "median_ms": round(median, 1),
+        "max_ms": max(runs),
+        "budget_ms": args.budget_ms,
+        "within_budget": median <= args.budget_ms,
+    }
+    print(json.dumps(report, indent=2))
+    return report["within_budget"]
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Perfil de import da aplicação (`python -X importtime -c "import main"`)
+
+Cada rodada é um interpretador novo; o relatório traz a mediana do tempo
+cumulativo de `main`, os módulos com maior tempo próprio e os pacotes que
+devem continuar fora do import (carregados via app.utils.lazy_import).
+Falha (código 1) se a mediana passar do orçamento (IMPORT_BUDGET_MS) ou se
+algum pacote tardio for importado junto com a aplicação.
+
+Uso:
+    python benchmarks/import_time.py [--runs 5] [--budget-ms 1800] [--top 15]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Pacotes pesados ou opcionais que não podem entrar no import de main:app
+LAZY_MODULES = ("numpy", "weasyprint", "reportlab", "google.cloud", "opentelemetry")
+
+# "import time: self [us] | cumulative | imported package"
+LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+PROBE = (
+    "import json, sys; import main; "
+    "print(json.dumps([m for m in {mods!r} if m in sys.modules or "
+    "any(k.startswith(m + '.') for k in sys.modules)]))"
+)
+
+
+def profile_once(env: dict):
+    """(cumulativo de main em ms, {módulo: tempo próprio em ms}, pacotes tardios importados)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(mods=LAZY_MODULES)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    total_ms = None
+    self_ms = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        own, cumulative, _, name = match.groups()
+        self_ms[name] = self_ms.get(name, 0) + int(own) / 1000
+        if name == "main":
+            total_ms = int(cumulative) / 1000
+    if total_ms is None:
+        raise RuntimeError("linha de 'main' ausente na saída de -X importtime")
+    eager = json.loads(result.stdout.strip().splitlines()[-1])
+    return total_ms, self_ms, eager
+
+
+def main() -> bool:
+    parser = argparse.ArgumentParser(description="Perfil e orçamento do import de main:app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "1800")))
+    parser.add_argument("--top", type=int, default=15, help="Módulos com maior tempo próprio no relatório")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp, 'import_time.db')}")
+        env.setdefault("SCHEDULER_ENABLED", "false")
+        env.pop("PYTHONPROFILEIMPORTTIME", None)
+
+        totals = []
+        self_runs = []
+        eager = set()
+        for _ in range(args.runs):
+            total_ms, self_ms, loaded = profile_once(env)
+            totals.append(round(total_ms, 1))
+            self_runs.append(self_ms)
+            eager.update(loaded)
+
+    median = statistics.median(totals)
+    top = sorted(
+        ((name, statistics.median(run.get(name, 0) for run in self_runs)) for name in self_runs[0]),
+        key=lambda item: item[1], reverse=True
+    )[:args.top]
+    report = {
+        "runs_ms": totals,
+        "median_ms": round(median, 1),
+        "budget_ms": args.budget_ms,
+        "top_self_ms": {name: round(ms, 1) for name, ms in top},
+        "eager_lazy_modules": sorted(eager),
+        "within_budget": median <= args.budget_ms and not eager,
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return report["within_budget"]
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Teste de carga HTTP: jornadas de usuários simuladas com asyncio + httpx
+
+Usuários virtuais repetem jornadas roteirizadas até o fim da duração:
+    aluno: login -> histórico -> formulário -> envio -> séries do histórico
+    admin: login -> dashboard -> lista de alunos -> stats (polling)
+
+Sem --url a aplicação roda no próprio processo (httpx.ASGITransport) sobre um
+SQLite temporário populado com dados sintéticos; com --url as requisições vão
+para um servidor já no ar (ex.: `python -m app.core.server`) e --database-url
+aponta o banco desse servidor para a carga inicial (SQLite ou um PostgreSQL
+em container: `docker run -e POSTGRES_PASSWORD=carga -p 5432:5432 postgres:15`).
+
+O relatório (JSON) traz RPS, p50/p95/p99 e taxa de erro por rota e o commit
+atual; --compare mostra a variação em relação a um relatório anterior.
+
+Uso:
+    python benchmarks/load_test.py [--duration 30] [--users 10] [--admin-ratio 0.2]
+        [--url http://127.0.0.1:8080 --database-url URL] [--alunos 200]
+        [--output carga.json] [--compare carga_anterior.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+# ============= DADOS SINTÉTICOS =============
+
+def seed_dataset(alunos: int, avaliacoes_por_aluno: int, seed: int) -> int:
+    """Popula o banco com o conjunto sintético (generate_synthetic_data) se ainda não houver um"""
+    from app.core.database import engine
+    from app.core.migrate import ensure_schema
+    from app.models import Aluno
+    from app.services.synthetic_data import DOMINIO, SyntheticDataLoader
+    from sqlalchemy import func, select
+
+    ensure_schema()
+    with engine.connect() as connection:
+        existentes = connection.execute(
+            select(func.count(Aluno.id)).where(Aluno.email.like(f"%@{DOMINIO}"))
+        ).scalar()
+    if existentes:
+        return existentes
+    SyntheticDataLoader(engine, alunos, avaliacoes_por_aluno, admins=1, seed=seed).run()
+    return alunos
+
+
+# ============= JORNADAS =============
+
+class Recorder:
+    """Latências e erros por rota (nome estável, sem ids)"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def call(self, client: httpx.AsyncClient, method: str, path: str, route: Optional[str] = None,
+                   expected=(200,), **kwargs) -> Optional[httpx.Response]:
+        route = route or f"{method} {path.split('?')[0]}"
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            self.latencies[route].append((time.perf_counter() - started) * 1000)
+            self.errors[route] += 1
+            return None
+        self.latencies[route].append((time.perf_counter() - started) * 1000)
+        if response.status_code not in expected:
+            self.errors[route] += 1
+        return response
+
+
+async def student_journey(client: httpx.AsyncClient, rec: Recorder, rng: random.Random, alunos: int):
+    from app.services.synthetic_data import SENHA_PADRAO, email_aluno
+
+    login = await rec.call(client, "POST", "/login", expected=(303,),
+                           data={"email": email_aluno(rng.randrange(alunos)), "password": SENHA_PADRAO,
+                                 "user_type": "aluno"})
+    if login is None or login.status_code != 303:
+        return
+    await rec.call(client, "GET", "/meu-historico")
+    await rec.call(client, "GET", "/formulario")
+    await rec.call(client, "POST", "/formulario", expected=(303,),
+                   data={"peso": f"{rng.uniform(55, 110):.1f}", "altura": f"{rng.uniform(155, 190):.0f}"})
+    await rec.call(client, "GET", "/meu-historico/series?metricas=peso_kg,imc")
+
+
+async def admin_journey(client: httpx.AsyncClient, rec: Recorder, rng: random.Random, polls: int = 3):
+    from app.services.synthetic_data import SENHA_PADRAO, email_admin
+
+    login = await rec.call(client, "POST", "/login", expected=(303,),
+                           data={"email": email_admin(0), "password": SENHA_PADRAO, "user_type": "admin"})
+    if login is None or login.status_code != 303:
+        return
+    await rec.call(client, "GET", "/admin/dashboard")
+    await rec.call(client, "GET", "/admin/alunos")
+    for _ in range(polls):
+        await rec.call(client, "GET", "/admin/stats")
+        await asyncio.sleep(rng.uniform(0.05, 0.2))
+
+
+async def virtual_user(make_client, rec: Recorder, deadline: float, seed: int, admin_ratio: float, alunos: int):
+    rng = random.Random(seed)
+    while time.perf_counter() < deadline:
+        async with make_client() as client:  # cookies novos a cada jornada
+            if rng.random() < admin_ratio:
+                await admin_journey(client, rec, rng)
+            else:
+                await student_journey(client, rec, rng, alunos)
+
+
+# ============= RELATÓRIO =============
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Percentil por posição mais próxima (valores já ordenados)"""
+    index = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "error_rate": round(errors / len(values), 4) if values else 0.0,
+        "rps": round(len(values) / elapsed, 2),
+        "p50_ms": round(percentile(values, 50), 1),
+        "p95_ms": round(percentile(values, 95), 1),
+        "p99_ms": round(percentile(values, 99), 1),
+        "max_ms": round(values[-1], 1),
+    }
+
+
+def build_report(rec: Recorder, elapsed: float, meta: Dict) -> Dict:
+    routes = {route: summarize(values, rec.errors[route], elapsed) for route, values in sorted(rec.latencies.items())}
+    todas = [value for values in rec.latencies.values() for value in values]
+    return {
+        "meta": meta,
+        "total": summarize(todas, sum(rec.errors.values()), elapsed) if todas else {},
+        "routes": routes,
+    }
+
+
+def compare(report: Dict, baseline: Dict) -> Dict[str, Dict[str, Optional[float]]]:
+    """Variação percentual de RPS e p95 por rota em relação a um relatório anterior"""
+    def delta(atual, anterior):
+        return round((atual - anterior) / anterior * 100, 1) if anterior else None
+
+    return {
+        route: {
+            "rps_pct": delta(stats["rps"], baseline["routes"][route]["rps"]),
+            "p95_pct": delta(stats["p95_ms"], baseline["routes"][route]["p95_ms"]),
+        }
+        for route, stats in report["routes"].items() if route in baseline.get("routes", {})
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ============= EXECUÇÃO =============
+
+async def run(args) -> Dict:
+    if args.url:
+        def make_client():
+            return httpx.AsyncClient(base_url=args.url, follow_redirects=False, timeout=args.timeout)
+        target = args.url
+    else:
+        from main import app
+        transport = httpx.ASGITransport(app=app)
+
+        def make_client():
+            return httpx.AsyncClient(transport=transport, base_url="http://carga", follow_redirects=False,
+                                     timeout=args.timeout)
+        target = "in-process"
+
+    rec = Recorder()
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*[
+        virtual_user(make_client, rec, deadline, args.seed + i, args.admin_ratio, args.alunos)
+        for i in range(args.users)
+    ])
+    elapsed = time.perf_counter() - started
+
+    return build_report(rec, elapsed, {
+        "commit": git_commit(),
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "target": target,
+        "duration_s": round(elapsed, 1),
+        "users": args.users,
+        "admin_ratio": args.admin_ratio,
+        "alunos": args.alunos,
+        "avaliacoes_por_aluno": args.avaliacoes,
+        "seed": args.seed,
+    })
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Teste de carga com jornadas de aluno e admin")
+    parser.add_argument("--url", help="Servidor alvo (padrão: app no próprio processo)")
+    parser.add_argument("--database-url", help="Banco a popular (padrão: SQLite temporário; com --url, o do servidor)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Segundos de carga")
+    parser.add_argument("--users", type=int, default=10, help="Usuários virtuais simultâneos")
+    parser.add_argument("--admin-ratio", type=float, default=0.2, help="Fração das jornadas que são de admin")
+    parser.add_argument("--alunos", type=int, default=200, help="Alunos sintéticos")
+    parser.add_argument("--avaliacoes", type=int, default=12, help="Avaliações por aluno")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--no-seed", action="store_true", help="Não popular o banco (já populado)")
+    parser.add_argument("--output", help="Arquivo JSON para gravar o relatório")
+    parser.add_argument("--compare", help="Relatório anterior para comparação")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.database_url:
+            os.environ["DATABASE_URL"] = args.database_url
+        elif not args.url:
+            os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'carga.db')}"
+        os.environ.setdefault("SCHEDULER_ENABLED", "false")
+
+        if not args.no_seed and (args.database_url or not args.url):
+            args.alunos = seed_dataset(args.alunos, args.avaliacoes, args.seed)
+
+        report = asyncio.run(run(args))
+
+    if args.compare:
+        with open(args.compare) as f:
+            report["compare"] = compare(report, json.load(f))
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
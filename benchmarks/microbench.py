@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks dos caminhos quentes (executados a cada requisição ou linha)
+
+Casos: criação/verificação do token de sessão, classificação do IMC,
+conversão UTC -> São Paulo, montagem das linhas do histórico do aluno e
+renderização de admin_alunos.html e meu_historico.html.
+
+Cada caso é calibrado (laços por amostra até ~20ms), aquecido e medido em N
+amostras com o GC desligado, como no timeit. As amostras se alternam com as de
+uma carga de referência em Python puro; a comparação com a linha de base
+(benchmarks/baselines/microbench.json) usa o tempo relativo à referência, o
+que compensa máquinas mais lentas/rápidas e variações de CPU durante a
+execução. Um caso regrediu quando a razão das medianas passa do limite E o
+teste de Mann-Whitney indica diferença estatisticamente significativa.
+
+Casos de fração de microssegundo ainda oscilam entre execuções (frequência da
+CPU, vizinhos barulhentos), então um caso reprovado é medido de novo, com o
+dobro de amostras, e só falha se a regressão se repetir em todas as
+confirmações (--confirm-runs). Casos abaixo de 1µs por operação na linha de
+base usam um limite maior (SUB_MICROSECOND_THRESHOLD).
+
+Uso:
+    python benchmarks/microbench.py [--repeats 15] [--threshold 0.25] [--only jwt] [--confirm-runs 1]
+    python benchmarks/microbench.py --save     # grava/atualiza a linha de base
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baselines", "microbench.json")
+
+# Limite mínimo para casos de fração de microssegundo (mais sensíveis ao estado da CPU)
+SUB_MICROSECOND_THRESHOLD = 0.40
+
+# Caso: nome -> fábrica que prepara os dados e devolve (função medida, operações por chamada)
+CASES: Dict[str, Callable[[], Tuple[Callable[[], object], int]]] = {}
+
+
+def case(name: str):
+    def register(factory):
+        CASES[name] = factory
+        return factory
+    return register
+
+
+# ============= CASOS =============
+
+def reference_workload():
+    """Carga fixa em Python puro usada como unidade de tempo da máquina"""
+    total = 0
+    for value in range(1000):
+        total += value * value % 7
+    return total
+
+
+@case("jwt.create")
+def _jwt_create():
+    from app.services.auth_service import create_simple_jwt
+    return (lambda: create_simple_jwt("aluno", 4242)), 1
+
+
+@case("jwt.verify")
+def _jwt_verify():
+    from app.services.auth_service import create_simple_jwt, verify_simple_jwt
+    token = create_simple_jwt("admin", 1)
+    return (lambda: verify_simple_jwt(token)), 1
+
+
+@case("imc.classify")
+def _imc_classify():
+    from app.services.student_service import StudentService
+    valores = [15.0 + i * 0.5 for i in range(64)]  # todas as faixas da OMS
+    classify = StudentService.classify_imc
+
+    def run():
+        for imc in valores:
+            classify(imc)
+    return run, len(valores)
+
+
+@case("datetime.utc_to_sao_paulo")
+def _utc_to_sao_paulo():
+    from app.utils.datetime_utils import utc_to_sao_paulo
+    base = datetime(2025, 3, 10, 12, 0)
+    datas = [base + timedelta(hours=i * 7) for i in range(64)]
+
+    def run():
+        for data in datas:
+            utc_to_sao_paulo(data)
+    return run, len(datas)
+
+
+def _avaliacoes(quantidade: int):
+    from app.models import Avaliacao
+    base = datetime(2024, 1, 5, 9, 30)
+    return [
+        Avaliacao(
+            id=i + 1, aluno_id=1, nome="Maria Souza", data=base + timedelta(days=21 * i),
+            peso_kg=80 - i * 0.3, altura_cm=165.0, imc=round((80 - i * 0.3) / 1.65 ** 2, 2),
+            percentual_gordura=30 - i * 0.2, circunferencia_cintura=88 - i * 0.4, circunferencia_quadril=104.0,
+            observacoes_medidas="Sem queixas" if i % 3 else None,
+        )
+        for i in range(quantidade)
+    ]
+
+
+@case("historico.row_dict")
+def _historico_row():
+    from app.routes.student import historico_row
+    avaliacoes = _avaliacoes(50)
+
+    def run():
+        return [historico_row(av) for av in avaliacoes]
+    return run, len(avaliacoes)
+
+
+class _BenchRequest:
+    """O mínimo de Request usado pelos templates (url_for e query_params)"""
+
+    query_params: Dict[str, str] = {}
+
+    def url_for(self, name: str, **params) -> str:
+        return f"/{name}/{params.get('path', '')}"
+
+
+def _template(name: str):
+    from fastapi.templating import Jinja2Templates
+    return Jinja2Templates(directory=os.path.join(ROOT, "templates")).get_template(name)
+
+
+@case("render.admin_alunos")
+def _render_admin_alunos():
+    from app.models import Aluno
+    from app.utils.datetime_utils import utc_to_sao_paulo
+    template = _template("admin_alunos.html")
+    alunos = []
+    for i in range(100):
+        aluno = Aluno(id=i + 1, nome=f"Aluno {i:03d}", email=f"aluno{i}@exemplo.com", ativo=i % 10 != 0)
+        avaliacoes = _avaliacoes(i % 6)
+        ultima = avaliacoes[-1] if avaliacoes else None
+        alunos.append({
+            "aluno": aluno, "total_avaliacoes": len(avaliacoes), "ultima_avaliacao": ultima,
+            "data_ultima_avaliacao": utc_to_sao_paulo(ultima.data) if ultima else None,
+            "peso_atual": ultima.peso_kg if ultima else None,
+            "peso_inicial": avaliacoes[0].peso_kg if avaliacoes else None,
+            "variacao_peso": ultima.peso_kg - avaliacoes[0].peso_kg if len(avaliacoes) > 1 else None,
+            "imc_atual": ultima.imc if ultima else None, "altura_atual": ultima.altura_cm if ultima else None,
+            "tem_progresso": len(avaliacoes) > 1,
+        })
+    context = {"request": _BenchRequest(), "alunos": alunos, "total_alunos": len(alunos), "is_admin": True}
+    return (lambda: template.render(context)), 1
+
+
+@case("render.meu_historico")
+def _render_meu_historico():
+    from app.routes.student import historico_row
+    template = _template("meu_historico.html")
+    avaliacoes = [historico_row(av) for av in reversed(_avaliacoes(50))]
+    context = {
+        "request": _BenchRequest(), "aluno": {"id": 1, "nome": "Maria Souza", "email": "maria@exemplo.com"},
+        "avaliacoes": avaliacoes, "total_avaliacoes": len(avaliacoes), "is_admin": False,
+    }
+    return (lambda: template.render(context)), 1
+
+
+# ============= MEDIÇÃO =============
+
+def calibrate(func: Callable[[], object], target_s: float) -> int:
+    """Laços necessários para uma amostra durar ~target_s"""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= target_s / 2 or number >= 1 << 20:
+            return max(1, int(number * target_s / max(elapsed, 1e-9)))
+        number *= 2
+
+
+def _sample(func: Callable[[], object], number: int) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - started
+
+
+def measure(func: Callable[[], object], ops: int, repeats: int, warmup: int = 3,
+            target_s: float = 0.02) -> Tuple[List[float], List[float]]:
+    """
+    Amostras de tempo por operação (ns) e relativas à referência
+
+    Cada amostra do caso é medida logo após uma da referência, de modo que as
+    duas sofrem as mesmas condições da máquina naquele instante.
+    """
+    number = calibrate(func, target_s)
+    ref_number = calibrate(reference_workload, target_s / 2)
+
+    samples, relative = [], []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for i in range(warmup + repeats):
+            ref_elapsed = _sample(reference_workload, ref_number) / ref_number
+            elapsed = _sample(func, number) / (number * ops)
+            if i >= warmup:
+                samples.append(elapsed * 1e9)
+                relative.append(elapsed / ref_elapsed)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return samples, relative
+
+
+def mann_whitney_greater(current: List[float], baseline: List[float]) -> float:
+    """p-valor unilateral (aproximação normal) de `current` ser maior que `baseline`"""
+    combined = sorted([(v, 0) for v in current] + [(v, 1) for v in baseline])
+    ranks = [0.0] * len(combined)
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1  # empates recebem o posto médio
+        i = j + 1
+    n1, n2 = len(current), len(baseline)
+    r1 = sum(rank for rank, (_, grupo) in zip(ranks, combined) if grupo == 0)
+    u = r1 - n1 * (n1 + 1) / 2
+    mean = n1 * n2 / 2
+    sd = math.sqrt(n1 * n2 * (n1 + n2 + 1) / 12)
+    if sd == 0:
+        return 1.0
+    z = (u - mean - 0.5) / sd  # correção de continuidade
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare_case(current: List[float], baseline: List[float], threshold: float,
+                 alpha: float = 0.01) -> Dict[str, object]:
+    """Razão das medianas (tempos relativos à referência) e veredito de regressão"""
+    ratio = statistics.median(current) / statistics.median(baseline)
+    p_value = mann_whitney_greater(current, baseline)
+    return {
+        "ratio": round(ratio, 3),
+        "p_value": round(p_value, 5),
+        "regression": ratio > 1 + threshold and p_value < alpha,
+    }
+
+
+def case_threshold(baseline_case: Dict[str, object], threshold: float) -> float:
+    """Limite do caso: casos abaixo de 1µs por operação toleram ao menos SUB_MICROSECOND_THRESHOLD"""
+    if baseline_case.get("median_ns", float("inf")) < 1000:
+        return max(threshold, SUB_MICROSECOND_THRESHOLD)
+    return threshold
+
+
+def confirm_regression(verdict: Dict[str, object], remeasure: Callable[[], Dict[str, object]],
+                       runs: int) -> Dict[str, object]:
+    """
+    Mantém a regressão só se ela se repetir em `runs` novas medições
+
+    Args:
+        remeasure: mede o caso de novo e devolve o veredito de compare_case
+    """
+    if not verdict["regression"] or runs <= 0:
+        return verdict
+    reruns = []
+    for _ in range(runs):
+        again = remeasure()
+        reruns.append({"ratio": again["ratio"], "p_value": again["p_value"], "regression": again["regression"]})
+        if not again["regression"]:
+            break  # não se repetiu: ruído da primeira medição
+    return {**verdict, "regression": all(r["regression"] for r in reruns), "reruns": reruns}
+
+
+def run_case(name: str, repeats: int) -> Dict[str, object]:
+    """Prepara e mede um caso; resultado no formato da linha de base"""
+    func, ops = CASES[name]()
+    samples, relative = measure(func, ops, repeats)
+    return {
+        **summarize(samples),
+        "relative": round(statistics.median(relative), 5),
+        "samples_ns": [round(sample, 2) for sample in samples],
+        "relative_samples": [round(r, 6) for r in relative],
+    }
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    quartis = statistics.quantiles(samples, n=4) if len(samples) > 1 else [samples[0]] * 3
+    return {
+        "median_ns": round(statistics.median(samples), 1),
+        "iqr_ns": round(quartis[2] - quartis[0], 1),
+        "min_ns": round(min(samples), 1),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> bool:
+    parser = argparse.ArgumentParser(description="Microbenchmarks dos caminhos quentes")
+    parser.add_argument("--repeats", type=int, default=15, help="Amostras por caso")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Lentidão tolerada (0.25 = +25%%)")
+    parser.add_argument("--only", help="Executar apenas casos cujo nome contém este texto")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="Gravar os resultados como linha de base")
+    parser.add_argument("--confirm-runs", type=int, default=1,
+                        help="Novas medições exigidas para confirmar uma regressão (0 = falhar na primeira)")
+    args = parser.parse_args()
+
+    # Os casos importam a aplicação; nenhum deles acessa o banco
+    os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+    names = [name for name in CASES if not args.only or args.only in name]
+    results = {name: run_case(name, args.repeats) for name in names}
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "repeats": args.repeats,
+        },
+        "cases": results,
+    }
+
+    ok = True
+    if baseline:
+        report["comparison"] = {}
+        for name in names:
+            if name not in baseline["cases"]:
+                continue
+            baseline_samples = baseline["cases"][name]["relative_samples"]
+            threshold = case_threshold(baseline["cases"][name], args.threshold)
+            verdict = compare_case(results[name]["relative_samples"], baseline_samples, threshold)
+            verdict = confirm_regression(
+                verdict,
+                lambda: compare_case(
+                    run_case(name, args.repeats * 2)["relative_samples"], baseline_samples, threshold
+                ),
+                args.confirm_runs,
+            )
+            report["comparison"][name] = verdict
+            ok = ok and not verdict["regression"]
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    printable = {
+        **report,
+        "cases": {
+            name: {k: v for k, v in stats.items() if "samples" not in k}
+            for name, stats in results.items()
+        },
+        "ok": ok,
+    }
+    print(json.dumps(printable, indent=2))
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Calibração do custo do bcrypt para a instância atual
+
+Mede a verificação de senha e sugere o BCRYPT_ROUNDS cujo tempo fica mais
+perto do alvo (PASSWORD_HASH_TARGET_MS, padrão 250ms) sem ultrapassá-lo.
+Rode na mesma classe de máquina da produção.
+
+Uso:
+    python benchmarks/password_cost.py [--target-ms 250] [--samples 5]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def main() -> bool:
+    from app.core.config import PASSWORD_HASH
+    from app.services.password_service import PasswordService
+
+    parser = argparse.ArgumentParser(description="Sugere o custo do bcrypt para um tempo de verificação alvo")
+    parser.add_argument("--target-ms", type=float, default=PASSWORD_HASH["target_ms"])
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+
+    result = PasswordService.calibrate_rounds(args.target_ms, samples=args.samples)
+
+    # Confirmar a estimativa com o custo sugerido
+    hashed = PasswordService.hash("calibracao", rounds=result["rounds"])
+    timings = []
+    for _ in range(args.samples):
+        started = time.perf_counter()
+        PasswordService.verify("calibracao", hashed)
+        timings.append((time.perf_counter() - started) * 1000)
+    result["measured_ms"] = round(sorted(timings)[len(timings) // 2], 1)
+    result["configured_rounds"] = PASSWORD_HASH["rounds"]
+    result["cpus"] = os.cpu_count()
+
+    print(json.dumps(result, indent=2))
+    print(f"👉 BCRYPT_ROUNDS={result['rounds']}", file=sys.stderr)
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
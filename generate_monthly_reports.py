@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Script para gerar os relatórios mensais de todos os alunos ativos em um único zip
+
+Uso:
+    python generate_monthly_reports.py --ano 2025 --mes 3 [--formato pdf|html] [--saida arquivo.zip] [--workers N]
+"""
+import argparse
+import os
+import sys
+
+# Configurar path para importar módulos da aplicação
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.batch_report_service import FORMATS, MonthlyReportBatch, available_cpus
+from app.utils.datetime_utils import now_sao_paulo
+
+
+def print_progress(batch: MonthlyReportBatch, width: int = 40):
+    """Barra de progresso no terminal"""
+    fraction = batch.done / batch.total if batch.total else 1.0
+    filled = int(width * fraction)
+    bar = "█" * filled + "░" * (width - filled)
+    sys.stdout.write(f"\r📄 [{bar}] {fraction * 100:5.1f}% ({batch.done}/{batch.total})")
+    sys.stdout.flush()
+
+
+def main() -> bool:
+    hoje = now_sao_paulo()
+    parser = argparse.ArgumentParser(description="Gera os relatórios mensais de todos os alunos ativos")
+    parser.add_argument("--ano", type=int, default=hoje.year)
+    parser.add_argument("--mes", type=int, default=hoje.month)
+    parser.add_argument("--formato", choices=FORMATS, default="pdf")
+    parser.add_argument("--saida", help="Caminho do zip (padrão: REPORT_BATCH_DIR)")
+    parser.add_argument("--workers", type=int, default=0, help="Processos de renderização (padrão: todos os núcleos)")
+    args = parser.parse_args()
+
+    batch = MonthlyReportBatch(args.ano, args.mes, args.formato, output_path=args.saida)
+    workers = args.workers or available_cpus()
+    print(f"🚀 Gerando relatórios de {batch.periodo} ({args.formato}) com {workers} processos")
+
+    try:
+        path = batch.run(workers=workers, progress=print_progress)
+    except Exception as e:
+        print(f"\n💥 Erro ao gerar relatórios: {e}")
+        return False
+
+    print()
+    if batch.failed:
+        print(f"⚠️  {batch.failed} relatórios falharam (ver logs)")
+    print(f"✅ {batch.done - batch.failed} relatórios em {path} ({batch.finished_at - batch.started_at:.1f}s)")
+    return batch.failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Script para popular o banco com dados sintéticos determinísticos (testes de escala)
+
+Uso:
+    python generate_synthetic_data.py --alunos 5000 --avaliacoes 20 [--admins 3] [--seed 42]
+        [--lote 5000] [--senha sintetico123] [--database-url URL] [--sem-copy] [--limpar]
+
+As contas usam o domínio sintetico.monipersonal.local (aluno000000@..., admin0@...);
+--limpar remove o conjunto anterior antes de gerar o novo. Sem --limpar, contas
+já existentes são puladas e só os alunos que faltam para chegar a --alunos são gerados.
+"""
+import argparse
+import os
+import sys
+
+# Configurar path para importar módulos da aplicação
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+def print_progress(loader, width: int = 40):
+    """Barra de progresso no terminal"""
+    fraction = loader.done / loader.total if loader.total else 1.0
+    filled = int(width * fraction)
+    bar = "█" * filled + "░" * (width - filled)
+    sys.stdout.write(
+        f"\r🧪 [{bar}] {fraction * 100:5.1f}% ({loader.done}/{loader.total} alunos, "
+        f"{loader.avaliacoes_inseridas} avaliações)"
+    )
+    sys.stdout.flush()
+
+
+def main() -> bool:
+    parser = argparse.ArgumentParser(description="Gera alunos, avaliações e admins sintéticos")
+    parser.add_argument("--alunos", type=int, default=1000)
+    parser.add_argument("--avaliacoes", type=float, default=20, help="Média de avaliações por aluno")
+    parser.add_argument("--admins", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--lote", type=int, default=5000, help="Avaliações por transação")
+    parser.add_argument("--senha", help="Senha de todas as contas (padrão: sintetico123)")
+    parser.add_argument("--database-url", help="Banco de destino (padrão: DATABASE_URL)")
+    parser.add_argument("--sem-copy", action="store_true", help="No PostgreSQL, usar INSERT em lote em vez de COPY")
+    parser.add_argument("--limpar", action="store_true", help="Remover o conjunto sintético existente antes")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    # Importados depois de DATABASE_URL para o engine apontar para o banco certo
+    from app.core.database import engine
+    from app.core.migrate import ensure_schema
+    from app.services.synthetic_data import SENHA_PADRAO, SyntheticDataLoader, clear_synthetic_data
+
+    try:
+        ensure_schema()
+        if args.limpar:
+            removidos = clear_synthetic_data(engine)
+            print(f"🧹 Removidos {removidos['alunos']} alunos, {removidos['avaliacoes']} avaliações "
+                  f"e {removidos['admins']} admins sintéticos")
+
+        loader = SyntheticDataLoader(
+            engine, args.alunos, args.avaliacoes, admins=args.admins, seed=args.seed,
+            senha=args.senha or SENHA_PADRAO, batch_size=args.lote, use_copy=not args.sem_copy
+        )
+        print(f"🚀 Gerando {args.alunos} alunos (~{args.avaliacoes:g} avaliações cada) em "
+              f"{engine.dialect.name} com {'COPY' if loader.use_copy else 'INSERT em lote'}")
+        resultado = loader.run(progress=print_progress)
+    except Exception as e:
+        print(f"\n💥 Erro ao gerar dados sintéticos: {e}")
+        return False
+
+    print()
+    if resultado["ja_existentes"]:
+        print(f"ℹ️  {resultado['ja_existentes']} alunos sintéticos já existiam e foram mantidos")
+    print(f"✅ {resultado['alunos']} alunos, {resultado['avaliacoes']} avaliações e "
+          f"{resultado['admins']} admins em {resultado['segundos']:.1f}s")
+    print(f"🔑 Senha de todas as contas: {args.senha or SENHA_PADRAO}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
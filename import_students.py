@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Script para cadastrar alunos em lote a partir de um CSV
+
+Uso:
+    python import_students.py alunos.csv [--dry-run] [--lote 500] [--processos N]
+        [--senhas-geradas senhas.csv] [--relatorio relatorio.json] [--database-url URL]
+
+Colunas: nome, email (obrigatórias), senha, telefone, data_nascimento
+(AAAA-MM-DD ou DD/MM/AAAA), sexo (M/F). Separador vírgula ou ponto e vírgula.
+Linhas sem senha recebem uma senha aleatória, gravada em --senhas-geradas
+para ser entregue aos alunos. E-mails repetidos no arquivo ou já cadastrados
+são ignorados e listados no relatório.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+# Configurar path para importar módulos da aplicação
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+def print_progress(importer, width: int = 40):
+    """Barra de progresso no terminal (hashes e inserts)"""
+    done = importer.hashed + importer.done
+    total = importer.total * 2
+    fraction = done / total if total else 1.0
+    filled = int(width * fraction)
+    bar = "█" * filled + "░" * (width - filled)
+    sys.stdout.write(
+        f"\r👥 [{bar}] {fraction * 100:5.1f}% ({importer.hashed}/{importer.total} hashes, "
+        f"{importer.done} inseridos)"
+    )
+    sys.stdout.flush()
+
+
+def main() -> bool:
+    parser = argparse.ArgumentParser(description="Cadastra alunos em lote a partir de um CSV")
+    parser.add_argument("arquivo", help="CSV com os alunos")
+    parser.add_argument("--dry-run", action="store_true", help="Apenas validar e mostrar o que seria feito")
+    parser.add_argument("--lote", type=int, default=500, help="Alunos por transação")
+    parser.add_argument("--processos", type=int, help="Processos de hash (padrão: núcleos disponíveis)")
+    parser.add_argument("--senhas-geradas", help="CSV de saída com as senhas geradas (email,senha)")
+    parser.add_argument("--relatorio", help="Gravar o relatório completo em JSON")
+    parser.add_argument("--database-url", help="Banco de destino (padrão: DATABASE_URL)")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    # Importados depois de DATABASE_URL para o engine apontar para o banco certo
+    from app.core.database import engine
+    from app.core.migrate import ensure_schema
+    from app.services.student_import import StudentImporter, parse_students_csv
+
+    try:
+        with open(args.arquivo, newline="", encoding="utf-8-sig") as f:
+            alunos, erros = parse_students_csv(f)
+
+        if not args.dry_run:
+            ensure_schema()
+        importer = StudentImporter(engine, batch_size=args.lote, workers=args.processos)
+        print(f"🚀 {len(alunos)} alunos válidos e {len(erros)} linhas com erro em {args.arquivo}"
+              f"{' (dry-run)' if args.dry_run else ''}")
+        resultado = importer.run(alunos, dry_run=args.dry_run, progress=print_progress)
+    except Exception as e:
+        print(f"\n💥 Erro ao importar alunos: {e}")
+        return False
+
+    if not args.dry_run:
+        print()
+    resultado["erros"] = erros
+
+    for erro in erros:
+        print(f"⚠️  Linha {erro['linha']}: {erro['erro']}")
+    for item in resultado["repetidos_no_arquivo"]:
+        print(f"🔁 Linha {item['linha']}: {item['email']} repetido no arquivo")
+    for item in resultado["ja_cadastrados"]:
+        print(f"ℹ️  Linha {item['linha']}: {item['email']} já cadastrado")
+
+    if args.dry_run:
+        print(f"🧪 Dry-run: {resultado['a_inserir']} alunos seriam cadastrados")
+    else:
+        print(f"✅ {resultado['inseridos']} alunos cadastrados em {resultado['segundos']:.1f}s "
+              f"({importer.workers} processos de hash)")
+
+    geradas = resultado.pop("senhas_geradas")
+    if geradas:
+        if args.senhas_geradas:
+            with open(args.senhas_geradas, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["email", "senha"])
+                writer.writerows(sorted(geradas.items()))
+            print(f"🔑 {len(geradas)} senhas geradas gravadas em {args.senhas_geradas}")
+        else:
+            print(f"🔑 {len(geradas)} senhas geradas:")
+            for email, senha in sorted(geradas.items()):
+                print(f"   {email}: {senha}")
+
+    if args.relatorio:
+        with open(args.relatorio, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        print(f"📄 Relatório gravado em {args.relatorio}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -2,6 +2,9 @@
 MoniPersonal - Aplicação Refatorada e Modularizada
 Versão inicial com as principais rotas separadas em módulos
 """
+# Primeiro import: marca o início dos imports da aplicação no relatório de cold start
+from app.core.startup import startup_timer
+
 from fastapi import FastAPI, Request, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
@@ -10,27 +13,40 @@ from datetime import datetime
 import uvicorn
 
 # Importar configurações centralizadas
-from app.core.config import APP_NAME, APP_VERSION
+from app.core.config import (
+    APP_NAME, APP_VERSION, LOAD_SHEDDING, CRITICAL_PATHS, SHEDDABLE_PATH_PREFIXES, SCHEDULER, AUTO_MIGRATE
+)
 
 # Importar middleware
 from app.middleware.rate_limiting import setup_rate_limiting
+from app.middleware.load_shedding import AdmissionControlMiddleware
+from app.middleware.startup_timing import FirstByteMiddleware
 
 # Importar rotas
 from app.routes.auth import router as auth_router
 from app.routes.public import router as public_router
 from app.routes.admin import router as admin_router
 from app.routes.student import router as student_router
+from app.routes.reports import router as reports_router
 
 # Importar configurações para debug
 from app.core.config import app_logs
 from app.middleware.auth import require_admin
 
 # Importar database
-from app.core.database import SessionLocal, engine, Base, get_db
+from app.core.responses import FastJSONResponse, FastJSONRoute
+from app.core.database import SessionLocal, engine, Base, get_db, pool_validator, IS_POSTGRESQL, describe_database
+from app.core.migrate import ensure_schema, migration_lock, seed_default_users
 
 # Importar models para inicialização
 from app.models import Avaliacao, Aluno, Usuario
 
+# Importar serviços com recursos de background
+from app.services.report_service import report_manager
+import app.services.body_composition  # noqa: F401  (calcula composição corporal no insert)
+import app.services.student_search  # noqa: F401  (mantém alunos.nome_normalizado)
+from app.services.jobs import scheduler, register_jobs
+
 # Importar utilitários
 from app.utils.logging import info_log
 
@@ -39,80 +55,30 @@ from app.utils.logging import info_log
 app = FastAPI(
     title=APP_NAME,
     version=APP_VERSION,
-    description="Sistema de Monitoramento Pessoal - Versão Modularizada"
+    description="Sistema de Monitoramento Pessoal - Versão Modularizada",
+    default_response_class=FastJSONResponse
 )
+app.router.route_class = FastJSONRoute  # rotas declaradas aqui também serializam direto com orjson
 
 # Configurar rate limiting
 limiter = setup_rate_limiting(app)
 
+# Configurar controle de admissão (503 + Retry-After para rotas não críticas sob saturação)
+app.add_middleware(
+    AdmissionControlMiddleware,
+    critical_paths=CRITICAL_PATHS,
+    sheddable_prefixes=SHEDDABLE_PATH_PREFIXES,
+    **LOAD_SHEDDING
+)
+
+# Mais externo: registra o primeiro byte respondido (relatório de cold start)
+app.add_middleware(FirstByteMiddleware, timer=startup_timer)
+
 # Configurar arquivos estáticos e templates
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
 
-# ==================== INICIALIZAÇÃO DO BANCO ====================
-
-def init_database():
-    """Inicializa o banco de dados automaticamente"""
-    try:
-        # Criar todas as tabelas se não existirem
-        Base.metadata.create_all(bind=engine)
-        info_log("✅ Banco de dados inicializado automaticamente")
-
-        # Inicializar usuários padrão
-        init_default_users()
-
-        return True
-    except Exception as e:
-        info_log(f"❌ Erro ao inicializar banco: {str(e)}")
-        return False
-
-
-def init_default_users():
-    """Inicializa usuários padrão se não existirem"""
-    try:
-        from app.services.auth_service import hash_password
-
-        with SessionLocal() as db:
-            # Verificar se já existem usuários
-            usuario_count = db.query(Usuario).count()
-
-            if usuario_count > 0:
-                info_log("ℹ️ Usuários já existem no sistema")
-                return
-
-            # Criar usuário administrador
-            admin_user = Usuario(
-                email="admin@monipersonal.com",
-                nome="Administrador",
-                senha_hash=hash_password("Monica@1985"),
-                tipo="admin",
-                ativo=True,
-                created_at=datetime.now()
-            )
-
-            # Criar usuário aluno Rafael
-            rafael_user = Usuario(
-                email="rafaelmarzulo@gmail.com",
-                nome="Rafael Marzulo",
-                senha_hash=hash_password("teste123"),
-                tipo="aluno",
-                ativo=True,
-                created_at=datetime.now()
-            )
-
-            db.add(admin_user)
-            db.add(rafael_user)
-            db.commit()
-
-            info_log("✅ Usuários padrão criados:")
-            info_log("   - Admin: admin@monipersonal.com / Monica@1985")
-            info_log("   - Aluno: rafaelmarzulo@gmail.com / teste123")
-
-    except Exception as e:
-        info_log(f"❌ Erro ao criar usuários padrão: {str(e)}")
-
-
 # ==================== INCLUIR ROTAS ====================
 
 # Aplicar rate limiting nas rotas
@@ -120,12 +86,14 @@ auth_router.dependencies = [Depends(limiter.limit("10/minute"))]
 public_router.dependencies = [Depends(limiter.limit("60/minute"))]
 admin_router.dependencies = [Depends(limiter.limit("15/minute"))]
 student_router.dependencies = [Depends(limiter.limit("20/minute"))]
+reports_router.dependencies = [Depends(limiter.limit("20/minute"))]
 
 # Incluir rotas
 app.include_router(auth_router, tags=["autenticação"])
 app.include_router(public_router, tags=["público"])
 app.include_router(admin_router, tags=["administração"])
 app.include_router(student_router, tags=["alunos"])
+app.include_router(reports_router, tags=["relatórios"])
 
 
 # ==================== ROTA RAIZ ====================
@@ -285,22 +253,50 @@ async def debug_logs(request: Request, session_data=None, jwt_data=None):
 
 # ==================== EVENTOS DE INICIALIZAÇÃO ====================
 
+startup_timer.mark("imports")
+
+
+def init_database():
+    """Migração no startup (somente com AUTO_MIGRATE: desenvolvimento e App Engine)"""
+    try:
+        with migration_lock(engine):
+            ensure_schema(engine)
+            seed_default_users()
+        info_log("✅ Banco de dados migrado no startup (AUTO_MIGRATE)")
+        return True
+    except Exception as e:
+        info_log(f"❌ Erro ao inicializar banco: {str(e)}")
+        return False
+
+
 @app.on_event("startup")
 async def startup_event():
-    """Executa na inicialização da aplicação"""
+    """Executa na inicialização da aplicação (sem acessar o banco, salvo AUTO_MIGRATE)"""
     info_log(f"🚀 Iniciando {APP_NAME} v{APP_VERSION} - Versão Modularizada")
+    info_log(f"🔍 Banco: {describe_database()}")
+
+    if AUTO_MIGRATE:
+        init_database()
+
+    # Validar conexões ociosas em background (substitui o pre-ping por checkout)
+    if IS_POSTGRESQL:
+        pool_validator.start()
+
+    # Jobs periódicos (só a instância líder executa)
+    if SCHEDULER["enabled"]:
+        register_jobs()
+        scheduler.start()
 
-    # Inicializar banco de dados
-    if init_database():
-        info_log("✅ Sistema pronto para uso")
-    else:
-        info_log("⚠️ Sistema iniciado com problemas no banco de dados")
+    startup_timer.mark("startup")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Executa no encerramento da aplicação"""
     info_log(f"🔴 Encerrando {APP_NAME}")
+    scheduler.stop()
+    pool_validator.stop()
+    report_manager.shutdown()
 
 
 # ==================== EXECUÇÃO ====================
@@ -75,7 +75,26 @@ gcloud builds submit \
 
 log_success "Imagem Docker criada: gcr.io/$PROJECT_ID/$SERVICE_NAME"
 
-# 2. Deploy no Cloud Run
+# 2. Migração do banco (a aplicação não cria tabelas nem usuários no startup)
+log_info "Executando migração do banco com a nova imagem..."
+gcloud run jobs deploy "${SERVICE_NAME}-migrate" \
+    --image "gcr.io/$PROJECT_ID/$SERVICE_NAME" \
+    --region "$REGION" \
+    --project "$PROJECT_ID" \
+    --command python \
+    --args "-m,app.core.migrate" \
+    --set-env-vars "ENVIRONMENT=production" \
+    --set-secrets "DATABASE_URL=DATABASE_URL:latest,SECRET_KEY=SECRET_KEY:latest,JWT_SECRET_KEY=JWT_SECRET_KEY:latest" \
+    --max-retries 0 \
+    --quiet
+gcloud run jobs execute "${SERVICE_NAME}-migrate" \
+    --region "$REGION" \
+    --project "$PROJECT_ID" \
+    --wait
+
+log_success "Migração concluída"
+
+# 3. Deploy no Cloud Run
 log_info "Fazendo deploy no Cloud Run..."
 
 # Verificar se serviço já existe
@@ -106,7 +125,7 @@ gcloud run deploy "$SERVICE_NAME" \
 
 log_success "Deploy concluído com sucesso!"
 
-# 3. Obter URL do serviço
+# 4. Obter URL do serviço
 SERVICE_URL=$(gcloud run services describe "$SERVICE_NAME" \
     --region="$REGION" \
     --project="$PROJECT_ID" \
@@ -115,7 +134,7 @@ SERVICE_URL=$(gcloud run services describe "$SERVICE_NAME" \
 echo ""
 log_success "Aplicação disponível em: $SERVICE_URL"
 
-# 4. Health check
+# 5. Health check
 log_info "Executando health check..."
 sleep 5
 
@@ -127,7 +146,7 @@ else
     exit 1
 fi
 
-# 5. Mostrar informações do serviço
+# 6. Mostrar informações do serviço
 echo ""
 log_info "Informações do serviço:"
 gcloud run services describe "$SERVICE_NAME" \
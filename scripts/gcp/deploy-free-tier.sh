@@ -144,6 +144,22 @@ deploy_cloudrun() {
         secrets_args="${secrets_args},JWT_SECRET_KEY=JWT_SECRET_KEY:latest"
     fi
 
+    # Migração do banco antes do deploy (a aplicação não cria o esquema no startup)
+    log_info "Executando migração do banco..."
+    gcloud run jobs deploy "${SERVICE_NAME}-migrate" \
+        --image="${image}" \
+        --region="${REGION}" \
+        --command=python \
+        --args="-m,app.core.migrate" \
+        ${secrets_args:+$secrets_args} \
+        --max-retries=0 \
+        --project="${PROJECT_NAME}" \
+        --quiet
+    gcloud run jobs execute "${SERVICE_NAME}-migrate" \
+        --region="${REGION}" \
+        --project="${PROJECT_NAME}" \
+        --wait
+
     # Deploy
     gcloud run deploy "${SERVICE_NAME}" \
         --image="${image}" \
@@ -157,7 +173,7 @@ deploy_cloudrun() {
         --timeout="${TIMEOUT}" \
         --concurrency="${CONCURRENCY}" \
         --port=8000 \
-        --set-env-vars="ENV=production,REGION=${REGION}" \
+        --set-env-vars="ENV=production,REGION=${REGION},AUTO_MIGRATE=false" \
         ${secrets_args:+$secrets_args} \
         --project="${PROJECT_NAME}" \
         --quiet
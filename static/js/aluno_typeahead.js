@@ -0,0 +1,57 @@
+// Typeahead de alunos ativos (GET /admin/alunos/buscar?q=...)
+//
+// alunoTypeahead(input, lista, onSelect): busca a cada digitação (com debounce),
+// mostra os resultados em `lista` (.list-group) e chama onSelect(aluno) no clique.
+// Retorna a função de busca para reaproveitar os resultados em outros lugares.
+function alunoTypeahead(input, lista, onSelect, options = {}) {
+  const delay = options.delay || 150;
+  const limite = options.limite || 10;
+  let timer = null;
+  let ultimaConsulta = 0;
+
+  function render(resultados) {
+    lista.innerHTML = '';
+    resultados.forEach(aluno => {
+      const item = document.createElement('button');
+      item.type = 'button';
+      item.className = 'list-group-item list-group-item-action';
+      const nome = document.createElement('strong');
+      nome.textContent = aluno.nome;
+      const email = document.createElement('small');
+      email.className = 'text-muted ms-2';
+      email.textContent = aluno.email;
+      item.append(nome, email);
+      item.addEventListener('click', () => {
+        lista.innerHTML = '';
+        onSelect(aluno);
+      });
+      lista.appendChild(item);
+    });
+    if (!resultados.length && input.value.trim()) {
+      lista.innerHTML = '<div class="list-group-item text-muted">Nenhum aluno encontrado</div>';
+    }
+  }
+
+  async function buscar(termo) {
+    const consulta = ++ultimaConsulta;
+    const response = await fetch(`/admin/alunos/buscar?q=${encodeURIComponent(termo)}&limite=${limite}`);
+    const data = await response.json();
+    if (consulta === ultimaConsulta) {  // ignora respostas de digitações anteriores
+      render(data.resultados || []);
+    }
+    return data.resultados || [];
+  }
+
+  input.addEventListener('input', () => {
+    clearTimeout(timer);
+    const termo = input.value.trim();
+    if (!termo) {
+      ultimaConsulta++;
+      lista.innerHTML = '';
+      return;
+    }
+    timer = setTimeout(() => buscar(termo).catch(() => {}), delay);
+  });
+
+  return buscar;
+}
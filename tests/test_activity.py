@@ -0,0 +1,92 @@
+"""
+Tests for the daily_activity rollup table
+"""
+import sys
+import os
+from datetime import timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.database import Base
+from app.models import Aluno, Avaliacao, DailyActivity
+from app.services.activity_service import ActivityService
+from app.utils.datetime_utils import now_sao_paulo
+
+
+def _session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'activity.db'}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def _seed(db):
+    agora = now_sao_paulo().replace(tzinfo=None)
+    aluno = Aluno(nome="Ana", email="ana@example.com", senha_hash="x", created_at=agora)
+    db.add(aluno)
+    db.flush()
+    for dias_atras, imc in [(0, 22.0), (0, 31.0), (3, 17.0), (10, None), (40, 26.0)]:
+        db.add(Avaliacao(aluno_id=aluno.id, nome="Ana", imc=imc, data=agora - timedelta(days=dias_atras)))
+    db.commit()
+
+
+def test_inserts_increment_rollup_and_windows(tmp_path):
+    """Each insert bumps its day; window totals sum the rollup"""
+    db = _session(tmp_path)
+    _seed(db)
+
+    hoje = db.get(DailyActivity, now_sao_paulo().date())
+    assert (hoje.avaliacoes, hoje.novos_alunos, hoje.imc_normal, hoje.imc_obesidade) == (2, 1, 1, 1)
+
+    totals = ActivityService.window_totals(db, {"hoje": 1, "semana": 7, "mes": 30})
+    assert totals == {"hoje": 2, "semana": 3, "mes": 4}
+    assert round(ActivityService.imc_medio(db), 2) == round((22 + 31 + 17 + 26) / 4, 2)
+
+    series = ActivityService.daily_series(db, 7)
+    assert len(series) == 7 and series[-1]["avaliacoes"] == 2 and series[0]["avaliacoes"] == 0
+
+
+def test_reconcile_matches_incremental_rollup(tmp_path):
+    """A full rebuild from the source tables reproduces the incremental rows"""
+    db = _session(tmp_path)
+    _seed(db)
+    columns = [c.name for c in DailyActivity.__table__.columns]
+
+    def snapshot():
+        db.expire_all()
+        return sorted(tuple(getattr(r, c) for c in columns) for r in db.query(DailyActivity))
+
+    incremental = snapshot()
+    db.query(DailyActivity).delete()
+    db.commit()
+
+    assert ActivityService.reconcile(db) == 4
+    assert snapshot() == incremental
+
+    # Reconciliação parcial só reescreve os últimos dias
+    assert ActivityService.reconcile(db, dias=7) == 2
+    assert snapshot() == incremental
+
+
+def test_reconcile_buckets_late_evenings_by_local_day(tmp_path):
+    """An evening evaluation lands on the same São Paulo day in both paths"""
+    from sqlalchemy.dialects import postgresql
+    from app.services.activity_service import local_date_expr
+
+    db = _session(tmp_path)
+    noite = (now_sao_paulo() - timedelta(days=1)).replace(hour=22, minute=30)
+    aluno = Aluno(nome="Bia", email="bia@example.com", senha_hash="x", created_at=noite)
+    db.add(aluno)
+    db.flush()
+    db.add(Avaliacao(aluno_id=aluno.id, nome="Bia", imc=22.0, data=noite))
+    db.commit()
+
+    assert ActivityService.reconcile(db, dias=3) == 1
+    db.expire_all()
+    assert [(r.dia, r.avaliacoes, r.novos_alunos) for r in db.query(DailyActivity)] == [(noite.date(), 1, 1)]
+
+    # No PostgreSQL a coluna (gravada no fuso da sessão) é convertida para São Paulo
+    sql = str(local_date_expr(Avaliacao.data, "postgresql").compile(dialect=postgresql.dialect()))
+    assert "timezone(" in sql and "TIMESTAMP WITH TIME ZONE" in sql
@@ -0,0 +1,66 @@
+"""
+Tests for the vectorised cohort analytics kernels
+"""
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.analytics_service import (
+    AnalyticsService, first_last_valid, imc_histogram, period_changes, trend_slopes
+)
+
+NAN = np.nan
+
+
+def test_trend_slopes_match_per_student_polyfit():
+    """Grouped least squares equals np.polyfit per student; single points are dropped"""
+    ids = np.array([1, 1, 1, 1, 2, 2, 2, 3], dtype=np.int32)
+    days = np.array([0, 7, 14, 30, 100, 110, 125, 5], dtype=np.float64)
+    peso = np.array([80, 79.5, NAN, 77, 60, 61, 61.5, 90], dtype=np.float32)
+
+    slope_ids, slopes = trend_slopes(ids, days, peso)
+
+    assert slope_ids.tolist() == [1, 2]
+    assert np.allclose(slopes[0], np.polyfit([0, 7, 30], [80, 79.5, 77], 1)[0])
+    assert np.allclose(slopes[1], np.polyfit([100, 110, 125], [60, 61, 61.5], 1)[0])
+
+
+def test_first_last_and_period_changes_skip_missing_values():
+    """Consecutive deltas only pair evaluations of the same student"""
+    ids = np.array([1, 1, 1, 2, 2], dtype=np.int32)
+    months = np.array(["2024-01", "2024-02", "2024-03", "2024-02", "2024-03"], dtype="datetime64[M]")
+    peso = np.array([80, NAN, 78, 70, 71], dtype=np.float32)
+
+    alunos, primeiro, ultimo, n = first_last_valid(ids, peso)
+    assert alunos.tolist() == [1, 2]
+    assert (ultimo - primeiro).tolist() == [-2, 1]
+    assert n.tolist() == [2, 2]
+
+    changes = period_changes(ids, months, peso)
+    assert changes["meses"].astype(str).tolist() == ["2024-03"]
+    assert changes["media"].tolist() == [-0.5]
+    assert changes["n"].tolist() == [2]
+
+
+def test_imc_histogram_uses_who_bands():
+    """Band edges match the previous per-row classification"""
+    imc = np.array([17, 18.5, 24.9, 25, 29.99, 30, 42, NAN], dtype=np.float32)
+    assert imc_histogram(imc) == {"baixo_peso": 1, "normal": 2, "sobrepeso": 2, "obesidade": 2}
+
+
+def test_compute_handles_empty_dataset():
+    """No evaluations yields an empty but JSON-serialisable result"""
+    columns = {
+        "aluno_id": np.empty(0, dtype=np.int32),
+        "data": np.empty(0, dtype="datetime64[D]"),
+        "peso_kg": np.empty(0, dtype=np.float32),
+        "imc": np.empty(0, dtype=np.float32),
+        "percentual_gordura": np.empty(0, dtype=np.float32),
+    }
+    result = AnalyticsService.to_json(AnalyticsService.compute(columns))
+    assert result["n_alunos"] == 0
+    assert result["percentis"]["imc"] == [None] * 5
+    assert result["coortes"]["meses"] == []
@@ -0,0 +1,96 @@
+"""
+Tests for body-composition formulas, the insert hook and the schema migration
+"""
+import sys
+import os
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.database import Base
+from app.core.migrate import ensure_schema
+from app.models import Aluno, Avaliacao
+from app.services.body_composition import BodyCompositionService, INPUT_COLUMNS, compute_body_composition
+
+NAN = np.nan
+
+
+def _columns(**values):
+    return {name: np.array(values.get(name, [NAN, NAN]), dtype=float) for name in INPUT_COLUMNS}
+
+
+def test_compute_prefers_jp7_and_falls_back_to_jp3():
+    """Row 0 has all seven sites (JP7); row 1 only the female three-site set (JP3)"""
+    columns = _columns(
+        dobra_peitoral=[10, NAN], dobra_axilar_media=[12, NAN], dobra_tricipital=[15, 20],
+        dobra_subescapular=[18, NAN], dobra_abdominal=[25, NAN], dobra_suprailiaca=[12, 18],
+        dobra_coxa=[8, 25], peso_kg=[80, 60], circunferencia_cintura=[90, 70], circunferencia_quadril=[100, 100],
+    )
+    result = compute_body_composition(columns, np.array([1.0, 0.0]), np.array([30.0, 25.0]), np.array([NAN, NAN]))
+
+    d7 = 1.112 - 0.00043499 * 100 + 0.00000055 * 100 ** 2 - 0.00028826 * 30
+    d3 = 1.0994921 - 0.0009929 * 63 + 0.0000023 * 63 ** 2 - 0.0001392 * 25
+    assert result["protocolo_composicao"].tolist() == ["JP7", "JP3"]
+    assert np.allclose(result["densidade_corporal"], [d7, d3], atol=1e-5)
+    assert np.allclose(result["percentual_gordura"], [495 / d7 - 450, 495 / d3 - 450], atol=0.01)
+    assert np.allclose(result["massa_magra_kg"] + result["massa_gorda_kg"], [80, 60], atol=0.02)
+    assert result["relacao_cintura_quadril"].tolist() == [0.9, 0.7]
+
+
+def test_manual_percentage_wins_and_unknown_sex_skips_formulas():
+    """Typed body fat is kept; without sex the skinfold formulas are not applied"""
+    columns = _columns(dobra_tricipital=[15, 15], dobra_suprailiaca=[12, 12], dobra_coxa=[20, 20], peso_kg=[70, 70])
+    result = compute_body_composition(columns, np.array([0.0, NAN]), np.array([40.0, 40.0]), np.array([22.0, NAN]))
+
+    assert result["protocolo_composicao"].tolist() == ["manual", None]
+    assert result["percentual_gordura"][0] == 22.0
+    assert np.isnan(result["percentual_gordura"][1])
+
+
+def test_insert_hook_and_batch_recompute(tmp_path):
+    """Derived columns are filled on insert and by the batch recompute"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'bc.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        aluno = Aluno(nome="Ana", email="ana@x.com", senha_hash="x", sexo="F", data_nascimento=datetime(1990, 1, 1))
+        db.add(aluno)
+        db.flush()
+        av = Avaliacao(
+            aluno_id=aluno.id, data=datetime(2024, 1, 1), peso_kg=60.0,
+            dobra_tricipital=20.0, dobra_suprailiaca=18.0, dobra_coxa=25.0,
+        )
+        db.add(av)
+        db.commit()
+        assert av.protocolo_composicao == "JP3"
+        calculated = av.percentual_gordura
+
+        # Computed values change with the student's data; typed ones are preserved
+        db.execute(text("UPDATE alunos SET data_nascimento = '1970-01-01 00:00:00'"))
+        db.add(Avaliacao(aluno_id=aluno.id, data=datetime(2024, 1, 2), peso_kg=60.0, percentual_gordura=30.0))
+        db.commit()
+        assert BodyCompositionService.recompute_all(db, batch_size=1) == 2
+
+        rows = db.query(Avaliacao.percentual_gordura, Avaliacao.protocolo_composicao).order_by(Avaliacao.id).all()
+        assert rows[0][1] == "JP3" and rows[0][0] > calculated
+        assert rows[1] == (30.0, "manual")
+
+
+def test_ensure_schema_adds_missing_columns(tmp_path):
+    """Legacy tables gain the new columns without touching existing data"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE alunos (id INTEGER PRIMARY KEY, nome VARCHAR(100), email VARCHAR(100), senha_hash VARCHAR(255))"))
+        conn.execute(text("INSERT INTO alunos (nome, email, senha_hash) VALUES ('Ana', 'a@x.com', 'x')"))
+
+    added = ensure_schema(engine)
+
+    assert "alunos.sexo" in added
+    assert "sexo" in {c["name"] for c in inspect(engine).get_columns("alunos")}
+    assert ensure_schema(engine) == []
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT nome FROM alunos")).scalar() == "Ana"
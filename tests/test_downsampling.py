@@ -0,0 +1,64 @@
+"""
+Tests for LTTB time-series downsampling and the progress series cache
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.utils.downsampling import lttb
+
+
+def test_lttb_keeps_endpoints_and_threshold():
+    """Downsampled series has exactly `threshold` points and keeps first/last"""
+    xs = list(range(1000))
+    ys = [(x % 50) * 1.5 for x in xs]
+
+    sx, sy = lttb(xs, ys, 50)
+    assert len(sx) == len(sy) == 50
+    assert (sx[0], sx[-1]) == (0, 999)
+    assert sx == sorted(sx)
+
+
+def test_lttb_preserves_spikes():
+    """A single outlier survives downsampling"""
+    xs = list(range(200))
+    ys = [70.0] * 200
+    ys[123] = 95.0
+
+    _, sy = lttb(xs, ys, 10)
+    assert 95.0 in sy
+
+
+def test_lttb_returns_short_series_unchanged():
+    assert lttb([1, 2], [3.0, 4.0], 10) == ([1, 2], [3.0, 4.0])
+
+
+def test_series_cache_sees_evaluations_committed_elsewhere(tmp_path):
+    """An insert that bypasses this process's session (another worker) still refreshes the series"""
+    from datetime import datetime
+    from sqlalchemy import create_engine, insert
+    from app.core.database import Base, SessionLocal
+    from app.models import Aluno, Avaliacao
+    from app.services.series_service import SeriesService, series_cache
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'series.db'}")
+    Base.metadata.create_all(bind=engine)
+    series_cache.clear()
+    with SessionLocal(bind=engine) as db:
+        db.add(Aluno(id=1, nome="Ana", email="ana@example.com", senha_hash="x"))
+        db.add(Avaliacao(aluno_id=1, nome="Ana", peso_kg=70.0, data=datetime(2025, 1, 1)))
+        db.commit()
+
+        hits = series_cache.hits
+        assert SeriesService.get_student_series(db, 1, ["peso_kg"])["total_avaliacoes"] == 1
+        assert SeriesService.get_student_series(db, 1, ["peso_kg"])["total_avaliacoes"] == 1
+        assert series_cache.hits == hits + 1
+
+        # Core insert: nenhum listener de sessão deste processo é disparado
+        with engine.begin() as connection:
+            connection.execute(insert(Avaliacao.__table__).values(
+                aluno_id=1, nome="Ana", peso_kg=69.0, data=datetime(2025, 2, 1), created_at=datetime(2025, 2, 1)
+            ))
+        assert SeriesService.get_student_series(db, 1, ["peso_kg"])["series"]["peso_kg"]["y"] == [70.0, 69.0]
+    series_cache.clear()
@@ -0,0 +1,50 @@
+"""
+Tests for the lazy import facility and the import-time guarantees of main
+"""
+import sys
+import os
+import subprocess
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.utils.lazy_import import lazy_import, lazy_import_stats
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+
+def test_module_is_imported_on_first_attribute_access(tmp_path, monkeypatch):
+    """Nothing runs until an attribute is read; afterwards the proxy holds the attributes"""
+    (tmp_path / "pesado_fake.py").write_text("CARREGADO = True\ndef dobro(x):\n    return 2 * x\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "pesado_fake", raising=False)
+
+    modulo = lazy_import("pesado_fake")
+    assert lazy_import("pesado_fake") is modulo
+    assert "pesado_fake" not in sys.modules
+    assert lazy_import_stats()["pesado_fake"] == {"loaded": False, "load_ms": None}
+
+    assert modulo.dobro(21) == 42
+    assert "pesado_fake" in sys.modules
+    assert "dobro" in modulo.__dict__
+    assert lazy_import_stats()["pesado_fake"]["loaded"] is True
+
+
+def test_missing_optional_dependency_raises_with_install_hint():
+    """A missing package surfaces as ImportError naming the pip package"""
+    modulo = lazy_import("pacote_inexistente_xyz", install_hint="pacote-xyz")
+    with pytest.raises(ImportError, match="pip install pacote-xyz"):
+        modulo.qualquer
+
+
+def test_importing_main_keeps_heavy_dependencies_unloaded(tmp_path):
+    """`import main` must not pull numpy or the PDF/cloud libraries"""
+    probe = (
+        "import sys; import main; "
+        "print(','.join(m for m in ('numpy', 'weasyprint', 'reportlab', 'opentelemetry') if m in sys.modules))"
+    )
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'import.db'}", SCHEDULER_ENABLED="false")
+    result = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1:] in ([], [""])
@@ -0,0 +1,59 @@
+"""
+Tests for the admission-control (load shedding) middleware
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware.load_shedding import AdmissionControlMiddleware, AdmissionMetrics
+
+
+def build_client(metrics):
+    app = FastAPI()
+
+    @app.get("/admin/stats")
+    async def stats():
+        return {"ok": True}
+
+    @app.get("/login")
+    async def login():
+        return {"ok": True}
+
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        max_in_flight=1,
+        max_pool_waiters=100,
+        retry_after=7,
+        critical_paths=("/login",),
+        sheddable_prefixes=("/admin/stats",),
+        metrics=metrics
+    )
+    return TestClient(app)
+
+
+def test_non_critical_route_is_shed_when_saturated():
+    """Sheddable routes fail fast with 503 + Retry-After under saturation"""
+    metrics = AdmissionMetrics()
+    client = build_client(metrics)
+    metrics.in_flight = 1  # simula uma requisição em andamento
+
+    response = client.get("/admin/stats")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "7"
+    assert metrics.shed == 1
+
+
+def test_critical_route_is_always_admitted():
+    """Critical routes are admitted even when the instance is saturated"""
+    metrics = AdmissionMetrics()
+    client = build_client(metrics)
+    metrics.in_flight = 1
+
+    assert client.get("/login").status_code == 200
+
+    metrics.in_flight = 0
+    assert client.get("/admin/stats").status_code == 200
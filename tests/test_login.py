@@ -0,0 +1,150 @@
+"""
+Tests for the single-query login lookup and the unknown-email cache
+"""
+import sys
+import os
+import hashlib
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.config import PASSWORD_HASH
+from app.core.database import Base, SessionLocal, get_db
+from app.models import Aluno, Usuario
+from app.routes.auth import router as auth_router
+from app.services.auth_service import hash_password
+from app.services.login_service import LoginService, unknown_emails
+
+
+def _engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'login.db'}")
+    Base.metadata.create_all(bind=engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    unknown_emails.clear()
+    with SessionLocal(bind=engine) as db:
+        db.add(Usuario(id=1, nome="Admin", email="ambos@example.com", senha_hash=hash_password("admin123"), tipo="admin"))
+        db.add(Aluno(id=1, nome="Ana", email="ambos@example.com", senha_hash=hash_password("aluno123")))
+        db.add(Aluno(id=2, nome="Inativa", email="inativa@example.com", senha_hash="x", ativo=False))
+        db.commit()
+    statements.clear()
+    return engine, statements
+
+
+def test_candidates_come_from_one_query_admin_first(tmp_path):
+    """Both tables are searched in one round-trip and inactive accounts are skipped"""
+    engine, statements = _engine(tmp_path)
+    with SessionLocal(bind=engine) as db:
+        candidates = LoginService.find_candidates(db, "ambos@example.com")
+        assert [(c.user_type, c.user_id) for c in candidates] == [("admin", 1), ("aluno", 1)]
+        assert len(statements) == 1
+        assert LoginService.find_candidates(db, "inativa@example.com") == []
+
+
+def test_unknown_email_is_cached_until_registration_commits(tmp_path):
+    """Repeated misses skip the database; a committed signup clears the entry"""
+    engine, statements = _engine(tmp_path)
+    with SessionLocal(bind=engine) as db:
+        for _ in range(unknown_emails.min_misses + 2):
+            assert LoginService.find_candidates(db, "novo@example.com") == []
+        assert len(statements) == unknown_emails.min_misses
+
+        db.add(Aluno(nome="Novo", email="novo@example.com", senha_hash="x"))
+        db.rollback()
+        assert "novo@example.com" in unknown_emails
+
+        db.add(Aluno(nome="Novo", email="novo@example.com", senha_hash="x"))
+        db.commit()
+        assert [c.user_type for c in LoginService.find_candidates(db, "novo@example.com")] == ["aluno"]
+
+
+def test_single_miss_does_not_block_signup_from_another_worker(tmp_path):
+    """One failed attempt is not cached, so an account created elsewhere can log in right away"""
+    from sqlalchemy import insert
+
+    engine, _ = _engine(tmp_path)
+    with SessionLocal(bind=engine) as db:
+        assert LoginService.find_candidates(db, "outro@example.com") == []
+        # Cadastro confirmado em outro worker: nenhum listener deste processo roda
+        with engine.begin() as connection:
+            connection.execute(insert(Aluno.__table__).values(
+                nome="Outro", email="outro@example.com", senha_hash="x", ativo=True, created_at=datetime(2025, 1, 1)
+            ))
+        assert [c.user_type for c in LoginService.find_candidates(db, "outro@example.com")] == ["aluno"]
+    unknown_emails.clear()
+
+
+def _client(engine):
+    app = FastAPI()
+    app.include_router(auth_router)
+    app.mount("/static", StaticFiles(directory="static"), name="static")
+
+    def override_db():
+        with SessionLocal(bind=engine) as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_db
+    return TestClient(app)
+
+
+def test_login_route_picks_account_by_password_and_form_type(tmp_path):
+    """Admin password logs in as admin; the student password only on the student form"""
+    engine, _ = _engine(tmp_path)
+    client = _client(engine)
+
+    def login(password, user_type):
+        data = {"email": "ambos@example.com", "password": password, "user_type": user_type}
+        return client.post("/login", data=data, follow_redirects=False)
+
+    assert login("admin123", "admin").headers["location"] == "/admin/dashboard"
+    assert login("aluno123", "aluno").headers["location"] == "/meu-historico"
+    assert login("aluno123", "admin").status_code == 200  # formulário com erro
+    unknown_emails.clear()
+
+
+def test_login_rehashes_legacy_password(tmp_path, monkeypatch):
+    """A successful login upgrades an unsalted SHA-256 hash to bcrypt"""
+    monkeypatch.setitem(PASSWORD_HASH, "rounds", 4)
+    engine, _ = _engine(tmp_path)
+    with SessionLocal(bind=engine) as db:
+        db.add(Aluno(id=3, nome="Legado", email="legado@example.com",
+                     senha_hash=hashlib.sha256(b"antiga").hexdigest()))
+        db.commit()
+
+    data = {"email": "legado@example.com", "password": "antiga", "user_type": "aluno"}
+    client = _client(engine)
+    assert client.post("/login", data=data, follow_redirects=False).headers["location"] == "/meu-historico"
+    with SessionLocal(bind=engine) as db:
+        assert db.get(Aluno, 3).senha_hash.startswith("$2b$04$")
+    assert client.post("/login", data=data, follow_redirects=False).headers["location"] == "/meu-historico"
+    unknown_emails.clear()
+
+
+def test_login_verifies_password_off_the_event_loop(tmp_path, monkeypatch):
+    """bcrypt runs in the threadpool so the worker keeps serving other requests"""
+    import asyncio
+    from app.services.password_service import PasswordService
+
+    engine, _ = _engine(tmp_path)
+    verify = PasswordService.verify_and_update
+    on_loop = []
+
+    def spy(password, senha_hash):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return verify(password, senha_hash)
+
+    monkeypatch.setattr(PasswordService, "verify_and_update", staticmethod(spy))
+    data = {"email": "ambos@example.com", "password": "admin123", "user_type": "admin"}
+    assert _client(engine).post("/login", data=data, follow_redirects=False).status_code == 303
+    assert on_loop == [False]
+    unknown_emails.clear()
@@ -0,0 +1,59 @@
+"""
+Tests for the microbenchmark harness (measurement and regression verdicts)
+"""
+import sys
+import os
+import json
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.microbench import (
+    BASELINE_PATH, CASES, case_threshold, compare_case, confirm_regression, mann_whitney_greater, measure
+)
+
+
+def test_measure_returns_per_op_and_relative_samples():
+    """Every repeat yields a positive per-op time and a time relative to the reference"""
+    samples, relative = measure(lambda: sum(range(100)), ops=1, repeats=4, warmup=1, target_s=0.002)
+    assert len(samples) == len(relative) == 4
+    assert all(s > 0 for s in samples) and all(r > 0 for r in relative)
+
+
+def test_verdict_needs_threshold_and_significance():
+    """A clear 50% slowdown regresses; noise of the same distribution does not"""
+    rng = random.Random(0)
+    baseline = [1.0 + rng.gauss(0, 0.03) for _ in range(15)]
+    same = [1.0 + rng.gauss(0, 0.03) for _ in range(15)]
+    slower = [1.5 + rng.gauss(0, 0.03) for _ in range(15)]
+
+    assert compare_case(slower, baseline, threshold=0.25)["regression"] is True
+    assert compare_case(same, baseline, threshold=0.25)["regression"] is False
+    # Significativo mas abaixo do limite: não falha
+    assert compare_case([v * 1.1 for v in baseline], baseline, threshold=0.25)["regression"] is False
+    assert mann_whitney_greater(baseline, slower) > 0.99
+
+
+def test_regression_must_reproduce_on_rerun():
+    """A one-off slow run passes when the re-measurement is clean; a repeated one still fails"""
+    flagged = {"ratio": 1.261, "p_value": 0.0035, "regression": True}
+    clean = {"ratio": 1.016, "p_value": 0.4, "regression": False}
+
+    verdict = confirm_regression(flagged, lambda: clean, runs=1)
+    assert verdict["regression"] is False and verdict["reruns"][0]["ratio"] == 1.016
+    assert confirm_regression(flagged, lambda: flagged, runs=2)["regression"] is True
+    assert confirm_regression(flagged, lambda: clean, runs=0)["regression"] is True
+
+    calls = []
+    confirm_regression(clean, lambda: calls.append(1), runs=1)
+    assert calls == []  # caso aprovado não é medido de novo
+
+    # Casos de fração de microssegundo têm limite maior
+    assert case_threshold({"median_ns": 256.6}, 0.25) == 0.40
+    assert case_threshold({"median_ns": 7141.8}, 0.25) == 0.25
+def test_baseline_covers_every_case():
+    """The stored baseline has samples for all registered cases"""
+    with open(BASELINE_PATH) as f:
+        baseline = json.load(f)
+    assert set(CASES) <= set(baseline["cases"])
+    assert all(len(baseline["cases"][name]["relative_samples"]) >= 5 for name in CASES)
@@ -0,0 +1,61 @@
+"""
+Tests for full-text search over evaluation notes (SQLite FTS5 backend)
+"""
+import sys
+import os
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.database import Base
+from app.models import Avaliacao
+from app.services.note_search import NoteSearchService, ensure_fulltext
+
+
+def _session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'notes.db'}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    # Linha anterior ao índice: entra pela carga inicial ('rebuild')
+    db.add(Avaliacao(nome="Ana", observacoes_medidas="Relatou dor no joelho direito"))
+    db.commit()
+    with engine.begin() as connection:
+        assert ensure_fulltext(connection)
+        assert not ensure_fulltext(connection)
+    return db
+
+
+def test_search_ranks_highlights_and_tracks_inserts(tmp_path):
+    db = _session(tmp_path)
+    db.add(Avaliacao(nome="Bruno", faltou_algo="Joelho dói", pedido_especial="Treino <leve> de joelho e joelho"))
+    db.add(Avaliacao(nome="Carla", alimentacao="Comendo bem"))
+    db.commit()
+
+    result = NoteSearchService.search(db, "JOELHO")
+    assert result["total"] == 2
+    assert {r["nome"] for r in result["resultados"]} == {"Ana", "Bruno"}
+    assert result["resultados"][0]["nome"] == "Bruno"  # mais ocorrências, maior relevância
+
+    bruno = result["resultados"][0]["destaque"]
+    assert "<mark>" in bruno and "&lt;leve&gt;" in bruno
+
+    assert NoteSearchService.search(db, "dor joelho")["total"] == 1
+    assert NoteSearchService.search(db, 'joelho" *')["total"] == 2
+    assert NoteSearchService.search(db, "   ")["total"] == 0
+
+
+def test_search_paginates_and_follows_updates(tmp_path):
+    db = _session(tmp_path)
+    for i in range(5):
+        db.add(Avaliacao(nome=f"Aluno {i}", sugestao_geral="mais treinos de mobilidade"))
+    db.commit()
+
+    pagina = NoteSearchService.search(db, "mobilidade", pagina=2, por_pagina=2)
+    assert pagina["total"] == 5 and len(pagina["resultados"]) == 2
+
+    avaliacao = db.query(Avaliacao).filter(Avaliacao.nome == "Aluno 0").one()
+    avaliacao.sugestao_geral = "nada a declarar"
+    db.commit()
+    assert NoteSearchService.search(db, "mobilidade")["total"] == 4
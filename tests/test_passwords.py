@@ -0,0 +1,55 @@
+"""
+Tests for the unified password hashing service
+"""
+import sys
+import os
+import hashlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.config import PASSWORD_HASH
+from app.services.password_service import PasswordService, password_metrics
+
+
+def test_bcrypt_hash_uses_configured_cost(monkeypatch):
+    """New hashes are bcrypt with the configured rounds and verify correctly"""
+    monkeypatch.setitem(PASSWORD_HASH, "rounds", 4)
+    hashed = PasswordService.hash("segredo")
+    assert hashed.startswith("$2b$04$")
+    assert PasswordService.verify("segredo", hashed)
+    assert not PasswordService.verify("errada", hashed)
+    assert not PasswordService.needs_rehash(hashed)
+
+    # Senhas acima de 72 bytes são aceitas (truncadas como no bcrypt clássico)
+    longa = "á" * 60
+    assert PasswordService.verify(longa, PasswordService.hash(longa))
+    assert not PasswordService.verify("x", "não é um hash")
+
+
+def test_legacy_and_outdated_hashes_are_upgraded(monkeypatch):
+    """Unsalted SHA-256 and bcrypt with another cost verify once and get rehashed"""
+    monkeypatch.setitem(PASSWORD_HASH, "rounds", 4)
+    legacy = hashlib.sha256(b"antiga").hexdigest()
+    before = password_metrics.snapshot()
+
+    ok, new_hash = PasswordService.verify_and_update("antiga", legacy)
+    assert ok and new_hash.startswith("$2b$04$") and PasswordService.verify("antiga", new_hash)
+    assert PasswordService.verify_and_update("errada", legacy) == (False, None)
+    assert PasswordService.verify_and_update("antiga", new_hash) == (True, None)
+
+    monkeypatch.setitem(PASSWORD_HASH, "rounds", 5)
+    ok, upgraded = PasswordService.verify_and_update("antiga", new_hash)
+    assert ok and upgraded.startswith("$2b$05$")
+
+    after = password_metrics.snapshot()
+    assert after["verifications"] - before["verifications"] == 5
+    assert after["rehashed"] - before["rehashed"] == 2
+    assert after["p95_ms"] is not None
+
+
+def test_calibration_stays_within_bounds():
+    """The suggested cost is clamped and its estimate does not exceed a reachable target"""
+    result = PasswordService.calibrate_rounds(target_ms=0.001, samples=1)
+    assert result["rounds"] == 10
+    result = PasswordService.calibrate_rounds(target_ms=10 ** 9, samples=1)
+    assert result["rounds"] == 16
@@ -0,0 +1,112 @@
+"""
+Tests for connection pool sizing and background validation
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import create_engine, text
+
+from app.core.pool import InstrumentedQueuePool, PoolValidator, compute_pool_size, instrument_engine, pool_metrics
+
+
+def test_compute_pool_size_splits_budget_between_workers():
+    """Each worker gets budget // workers connections, half of them pooled"""
+    assert compute_pool_size(16, 2) == (4, 4)
+    assert compute_pool_size(9, 2) == (2, 2)
+    assert compute_pool_size(1, 4) == (1, 0)
+
+
+def test_validator_recycles_idle_connections(tmp_path):
+    """Idle connections past max_idle are invalidated outside the request path"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=2,
+        max_overflow=0
+    )
+    instrument_engine(engine)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    validator = PoolValidator(engine, interval=60, max_age=3600, max_idle=-1)
+    assert validator.validate_idle_connections() == 1
+
+    stats = pool_metrics.snapshot(engine.pool)
+    assert stats["checked_out"] == 0
+    assert stats["connections_recycled"] >= 1
+
+
+def test_validator_never_waits_for_or_opens_connections(tmp_path):
+    """With every pooled connection checked out the validator does nothing instead of blocking"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'busy.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=30
+    )
+    instrument_engine(engine)
+    validator = PoolValidator(engine, interval=60, max_age=3600, max_idle=-1)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert validator.validate_idle_connections() == 0
+        assert engine.pool.overflow() == 0  # nenhuma conexão de overflow aberta
+    assert engine.pool.checkedin() == 1 and validator.validate_idle_connections() == 1
+    assert engine.pool.checkedin() == 1
+
+    # A conexão invalidada reconecta no próximo checkout
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_only_blocked_checkouts_count_as_waiters(tmp_path):
+    """Immediate checkouts are not waiters; one blocked on an exhausted pool is"""
+    import threading
+    import time
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'waiters.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=5
+    )
+    instrument_engine(engine)
+    seen = []
+    with engine.connect():
+        seen.append(pool_metrics.waiters)  # checkout imediato
+        blocked = threading.Thread(target=lambda: engine.connect().close())
+        blocked.start()
+        for _ in range(100):
+            if pool_metrics.waiters:
+                break
+            time.sleep(0.01)
+        seen.append(pool_metrics.waiters)
+    blocked.join(timeout=5)
+    assert seen == [0, 1] and pool_metrics.waiters == 0
+
+
+def test_ping_rolls_back_so_the_connection_is_not_idle_in_transaction():
+    """The validator's SELECT 1 ends its implicit transaction before returning the connection"""
+    calls = []
+
+    class Cursor:
+        def execute(self, sql):
+            calls.append(sql)
+
+        def close(self):
+            calls.append("close")
+
+    class Connection:
+        def cursor(self):
+            return Cursor()
+
+        def rollback(self):
+            calls.append("rollback")
+
+    assert PoolValidator._ping(Connection()) is True
+    assert calls == ["SELECT 1", "close", "rollback"]
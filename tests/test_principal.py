@@ -0,0 +1,167 @@
+"""
+Tests for per-request principal resolution and the identity cache
+"""
+import sys
+import os
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.config import SESSION_COOKIE_NAME
+from app.core.database import Base, SessionLocal, get_db
+from app.middleware import auth as auth_middleware
+from app.middleware.auth import Principal, get_principal, require_admin, require_principal
+from app.models import Aluno
+from app.services.auth_service import create_simple_jwt
+from app.services.identity_cache import IdentityCache, identity_cache
+
+
+def _engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'principal.db'}")
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def _count_selects(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    return statements
+
+
+def _app(engine):
+    identity_cache.clear()  # cache global do processo; cada teste usa outro banco
+    app = FastAPI()
+
+    def override_db():
+        db = SessionLocal(bind=engine)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_db
+
+    @app.get("/eu")
+    async def eu(
+        principal: Principal = Depends(require_principal(['aluno'], load_user=True)),
+        again=Depends(get_principal)
+    ):
+        assert again is principal
+        return {"id": principal.user.id, "nome": principal.user.nome}
+
+    @app.post("/eu")
+    async def eu_post(principal: Principal = Depends(require_principal(['aluno']))):
+        return {"id": principal.user_id}
+
+    @app.get("/admin/painel")
+    @require_admin()
+    async def painel(request: Request, session_data=None, jwt_data=None):
+        return {"jwt": jwt_data["user_type"], "session": session_data}
+
+    return app
+
+
+def test_token_is_verified_once_per_request(tmp_path, monkeypatch):
+    """Several dependencies on the same request share one token verification"""
+    engine = _engine(tmp_path)
+    with SessionLocal(bind=engine) as db:
+        db.add(Aluno(id=1, nome="Ana", email="ana@example.com", senha_hash="x"))
+        db.commit()
+
+    calls = []
+    original = auth_middleware.verify_simple_jwt
+    monkeypatch.setattr(auth_middleware, "verify_simple_jwt", lambda token: calls.append(token) or original(token))
+
+    client = TestClient(_app(engine))
+    client.cookies.set(SESSION_COOKIE_NAME, create_simple_jwt("aluno", 1))
+    response = client.get("/eu")
+    assert response.status_code == 200 and response.json() == {"id": 1, "nome": "Ana"}
+    assert len(calls) == 1
+
+
+def test_unauthenticated_and_forbidden_responses(tmp_path):
+    """Missing token redirects to the right login page; a wrong user type gets 403"""
+    client = TestClient(_app(_engine(tmp_path)))
+
+    response = client.get("/eu", follow_redirects=False)
+    assert response.status_code == 307 and response.headers["location"] == "/login"
+    response = client.post("/eu", follow_redirects=False)
+    assert response.status_code == 303 and response.headers["location"] == "/login"
+    response = client.get("/admin/painel", follow_redirects=False)
+    assert response.headers["location"] == "/admin-login"
+
+    client.cookies.set(SESSION_COOKIE_NAME, create_simple_jwt("aluno", 1))
+    assert client.get("/admin/painel").status_code == 403
+
+    # Aluno autenticado cuja linha não existe mais volta ao login
+    assert client.get("/eu", follow_redirects=False).headers["location"] == "/login"
+
+
+def test_rejected_requests_open_no_session_and_log_no_db_error(tmp_path, capsys):
+    """A wrong-role hit fails before get_db; HTTP errors inside get_db are not logged as DB errors"""
+    from fastapi import HTTPException
+
+    app = _app(_engine(tmp_path))
+    opened = []
+    override = app.dependency_overrides[get_db]
+
+    def counting_db():
+        opened.append(1)
+        yield from override()
+
+    app.dependency_overrides[get_db] = counting_db
+    client = TestClient(app)
+    client.cookies.set(SESSION_COOKIE_NAME, create_simple_jwt("admin", 1))
+    assert client.get("/eu").status_code == 403
+    assert opened == []
+
+    db = get_db()
+    next(db)
+    try:
+        db.throw(HTTPException(status_code=403, detail="Acesso negado"))
+    except HTTPException:
+        pass
+    assert "Erro na sessão do banco" not in capsys.readouterr().out
+def test_require_admin_passes_token_data_without_query_params(tmp_path):
+    """The compatibility decorator injects jwt_data and hides it from the API schema"""
+    app = _app(_engine(tmp_path))
+    client = TestClient(app)
+    client.cookies.set(SESSION_COOKIE_NAME, create_simple_jwt("admin", 1))
+    assert client.get("/admin/painel", params={"jwt_data": "x"}).json() == {"jwt": "admin", "session": None}
+
+    parameters = app.openapi()["paths"]["/admin/painel"]["get"].get("parameters", [])
+    assert not [p for p in parameters if p["name"] in ("session_data", "jwt_data", "_principal")]
+
+
+def test_identity_cache_skips_select_and_invalidates_on_commit(tmp_path):
+    """A cached row is merged without a SELECT and dropped once an update commits"""
+    engine = _engine(tmp_path)
+    cache = IdentityCache(ttl=60)
+    with SessionLocal(bind=engine) as db:
+        db.add(Aluno(id=7, nome="Bia", email="bia@example.com", senha_hash="x"))
+        db.commit()
+
+    with SessionLocal(bind=engine) as db:
+        assert cache.load(db, Aluno, 7).nome == "Bia"
+
+    statements = _count_selects(engine)
+    with SessionLocal(bind=engine) as db:
+        aluno = cache.load(db, Aluno, 7)
+        assert aluno.nome == "Bia" and aluno in db
+        assert statements == []
+        assert cache.snapshot()["hits"] == 1
+
+    # A invalidação pós-commit usa o cache global da aplicação
+    with SessionLocal(bind=engine) as db:
+        identity_cache.load(db, Aluno, 7)
+    with SessionLocal(bind=engine) as db:
+        aluno = identity_cache.load(db, Aluno, 7)
+        aluno.nome = "Beatriz"
+        db.commit()
+    with SessionLocal(bind=engine) as db:
+        assert identity_cache.load(db, Aluno, 7).nome == "Beatriz"
+    identity_cache.clear()
@@ -0,0 +1,138 @@
+"""
+Tests for the PDF artifact store and the report rendering job manager
+"""
+import sys
+import os
+import asyncio
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.artifact_store import ArtifactStore
+from app.services.report_service import ReportJobManager, ReportQueueFullError
+
+
+def fake_render(context):
+    """Picklable stand-in for the WeasyPrint renderer"""
+    time.sleep(context.get("delay", 0))
+    return f"PDF {context['nome']}".encode()
+
+
+def test_artifact_store_evicts_least_recently_used(tmp_path):
+    """Oldest artifacts are evicted once the size budget is exceeded"""
+    store = ArtifactStore(str(tmp_path), max_bytes=25)
+    store.put("a", b"x" * 10)
+    os.utime(store.path_for("a"), (1, 1))
+    store.put("b", b"x" * 10)
+    store.put("c", b"x" * 10)
+
+    assert store.get("a") is None
+    assert store.get("b") and store.get("c")
+    assert store.snapshot()["bytes"] <= 25
+
+
+def test_job_manager_renders_and_reuses_artifact(tmp_path):
+    """A finished render is written to disk and later submits start as done"""
+    manager = ReportJobManager(ArtifactStore(str(tmp_path), 10_000), render=fake_render)
+
+    async def scenario():
+        job = manager.submit("k1", {"nome": "Ana"}, owner_id=1, download_url="/x")
+        duplicate = manager.submit("k1", {"nome": "Ana"}, owner_id=1, download_url="/x")
+        assert duplicate is job
+        await manager.wait(job, timeout=30)
+        return job, manager.submit("k1", {"nome": "Ana"}, owner_id=1, download_url="/x")
+
+    try:
+        job, cached = asyncio.run(scenario())
+    finally:
+        manager.shutdown()
+
+    assert job.status == "done"
+    with open(job.path, "rb") as f:
+        assert f.read() == b"PDF Ana"
+    assert cached.status == "done" and cached.task is None
+    assert manager.rendered == 1
+
+
+def test_job_manager_rejects_when_queue_full(tmp_path):
+    """Submits beyond max_pending raise instead of queueing unbounded work"""
+    manager = ReportJobManager(ArtifactStore(str(tmp_path), 10_000), render=fake_render, max_pending=1)
+
+    async def scenario():
+        job = manager.submit("k1", {"nome": "Ana", "delay": 0.2}, owner_id=1, download_url="/x")
+        try:
+            manager.submit("k2", {"nome": "Bia"}, owner_id=2, download_url="/y")
+            rejected = False
+        except ReportQueueFullError:
+            rejected = True
+        await manager.wait(job, timeout=30)
+        return rejected
+
+    try:
+        assert asyncio.run(scenario())
+    finally:
+        manager.shutdown()
+    assert manager.rejected == 1
+
+
+def test_monthly_batch_zips_one_report_per_active_student(tmp_path):
+    """The monthly batch renders only active students with evaluations in the month"""
+    import zipfile
+    from datetime import datetime
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.core.database import Base
+    from app.models import Aluno, Avaliacao
+    from app.services.batch_report_service import MonthlyReportBatch
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'batch.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        ana = Aluno(nome="Ana Júlia", email="ana@x.com", senha_hash="x", ativo=True)
+        bia = Aluno(nome="Bia", email="bia@x.com", senha_hash="x", ativo=True)
+        inativo = Aluno(nome="Caio", email="caio@x.com", senha_hash="x", ativo=False)
+        db.add_all([ana, bia, inativo])
+        db.flush()
+        db.add_all([
+            Avaliacao(aluno_id=ana.id, nome=ana.nome, data=datetime(2024, 3, 5), peso_kg=60.0),
+            Avaliacao(aluno_id=ana.id, nome=ana.nome, data=datetime(2024, 3, 25), peso_kg=59.0),
+            Avaliacao(aluno_id=bia.id, nome=bia.nome, data=datetime(2024, 4, 1), peso_kg=70.0),
+            Avaliacao(aluno_id=inativo.id, nome=inativo.nome, data=datetime(2024, 3, 9), peso_kg=80.0),
+        ])
+        db.commit()
+
+    seen = []
+    batch = MonthlyReportBatch(2024, 3, "html", output_path=str(tmp_path / "lote.zip"))
+    path = batch.run(workers=2, session_factory=Session, progress=lambda b: seen.append(b.done))
+
+    with zipfile.ZipFile(path) as zf:
+        names = zf.namelist()
+        html = zf.read(names[0]).decode()
+    assert names == ["00001_Ana_Julia.html"]
+    assert "03/2024" in html and html.count("Data:") == 2
+    assert batch.status == "done" and (batch.total, batch.done, batch.failed) == (1, 1, 0)
+    assert seen[-1] == 1
+
+
+def test_batch_runner_rejects_other_month_and_leaves_a_cpu_free(monkeypatch):
+    """A second request for another period conflicts; in-server batches keep one core for requests"""
+    import pytest
+    import app.services.batch_report_service as batch_module
+    from app.services.batch_report_service import BatchConflictError, MonthlyBatchRunner, server_batch_workers
+
+    runner = MonthlyBatchRunner()
+    monkeypatch.setattr(runner, "_run", lambda batch: None)  # lote fica "pending"
+    lote = runner.start(2024, 3, "pdf")
+    assert runner.start(2024, 3, "pdf") is lote
+    with pytest.raises(BatchConflictError) as excinfo:
+        runner.start(2024, 4, "pdf")
+    assert excinfo.value.running is lote
+    with pytest.raises(BatchConflictError):
+        runner.start(2024, 3, "html")
+
+    monkeypatch.setitem(batch_module.REPORTS, "batch_server_workers", 0)
+    monkeypatch.setattr(batch_module, "available_cpus", lambda: 8)
+    assert server_batch_workers() == 7
+    monkeypatch.setattr(batch_module, "available_cpus", lambda: 1)
+    assert server_batch_workers() == 1
@@ -0,0 +1,69 @@
+"""
+Tests for the circuit breaker and stale-while-revalidate cache
+"""
+import asyncio
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.utils.resilience import CircuitBreaker, CircuitOpenError, StaleWhileRevalidateCache
+
+
+def test_serves_last_good_value_when_loader_fails():
+    """A failing refresh returns the previous value flagged as stale"""
+    async def scenario():
+        cache = StaleWhileRevalidateCache("test", ttl=0, deadline=1, breaker=CircuitBreaker("test"))
+        assert await cache.get("k", lambda: 1) == (1, False)
+
+        def boom():
+            raise RuntimeError("db down")
+
+        return await cache.get("k", boom)
+
+    assert asyncio.run(scenario()) == (1, True)
+
+
+def test_open_circuit_skips_the_database():
+    """After enough failures the circuit opens and the loader is not called"""
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise RuntimeError("db down")
+
+    async def scenario():
+        breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+        cache = StaleWhileRevalidateCache("test", ttl=0, deadline=1, breaker=breaker)
+        for _ in range(2):
+            try:
+                await cache.get("k", failing)
+            except RuntimeError:
+                pass
+        assert breaker.state == CircuitBreaker.OPEN
+        try:
+            await cache.get("k", failing)
+        except CircuitOpenError:
+            return True
+        return False
+
+    assert asyncio.run(scenario())
+    assert len(calls) == 2
+
+
+def test_cold_cache_waits_for_slow_first_load():
+    """With nothing cached yet a load slower than the deadline is awaited, not failed"""
+    import time
+
+    def slow():
+        time.sleep(0.2)
+        return 42
+
+    async def scenario():
+        cache = StaleWhileRevalidateCache("test", ttl=0, deadline=0.05, breaker=CircuitBreaker("test"))
+        first = await cache.get("k", slow)
+        # Com valor anterior, o prazo volta a valer e o último valor bom é servido
+        second = await cache.get("k", slow)
+        return first, second, cache.timeouts
+
+    assert asyncio.run(scenario()) == ((42, False), (42, True), 1)
@@ -0,0 +1,107 @@
+"""
+Tests for the orjson default response class and direct-serialising routes
+"""
+import sys
+import os
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import numpy as np
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import HTMLResponse
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.responses import FastJSONResponse, FastJSONRoute, dumps
+
+
+class PontoDTO:
+    __slots__ = ("t", "y")
+
+    def __init__(self, t, y):
+        self.t = t
+        self.y = y
+
+
+@dataclass
+class Resumo:
+    total: int
+    media: Decimal
+
+
+def _rows():
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT 1 AS id, 'Ana' AS nome UNION ALL SELECT 2, 'Bia'")).all()
+
+
+def test_dumps_handles_rows_decimals_slots_and_numpy():
+    """Types the handlers return are serialised without manual conversion"""
+    payload = {
+        "linhas": _rows(),
+        "valor": Decimal("72.50"),
+        "ponto": PontoDTO(datetime(2025, 1, 2, 3, 4, tzinfo=timezone.utc), 80.5),
+        "resumo": Resumo(2, Decimal("1.5")),
+        "serie": np.array([1.5, 2.0], dtype=np.float32),
+        "tags": {"a"},
+        1: "chave inteira",
+    }
+    assert json.loads(dumps(payload)) == {
+        "linhas": [{"id": 1, "nome": "Ana"}, {"id": 2, "nome": "Bia"}],
+        "valor": 72.5,
+        "ponto": {"t": "2025-01-02T03:04:00+00:00", "y": 80.5},
+        "resumo": {"total": 2, "media": 1.5},
+        "serie": [1.5, 2.0],
+        "tags": ["a"],
+        "1": "chave inteira",
+    }
+
+
+def test_routes_skip_jsonable_encoder_and_keep_status(monkeypatch):
+    """Plain JSON routes go straight to orjson; response models and HTML keep FastAPI's path"""
+    import fastapi.routing
+
+    def fail(*args, **kwargs):
+        raise AssertionError("jsonable_encoder não deveria ser chamado")
+
+    router = APIRouter(route_class=FastJSONRoute)
+
+    class Item(BaseModel):
+        nome: str
+
+    @router.get("/linhas")
+    async def linhas():
+        return {"linhas": _rows(), "ponto": PontoDTO(1, Decimal("2.5"))}
+
+    @router.post("/criado", status_code=201)
+    def criado():
+        return [PontoDTO(1, 2)]
+
+    @router.get("/modelo", response_model=Item)
+    async def modelo():
+        return {"nome": "Ana", "extra": 1}
+
+    @router.get("/pagina", response_class=HTMLResponse)
+    async def pagina():
+        return "<p>ok</p>"
+
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.include_router(router)
+    client = TestClient(app)
+
+    monkeypatch.setattr(fastapi.routing, "jsonable_encoder", fail)
+    response = client.get("/linhas")
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {"linhas": [{"id": 1, "nome": "Ana"}, {"id": 2, "nome": "Bia"}],
+                               "ponto": {"t": 1, "y": 2.5}}
+    response = client.post("/criado")
+    assert response.status_code == 201 and response.json() == [{"t": 1, "y": 2}]
+
+    monkeypatch.undo()
+    assert client.get("/modelo").json() == {"nome": "Ana"}
+    assert client.get("/pagina").text == "<p>ok</p>"
@@ -0,0 +1,99 @@
+"""
+Tests for the leader-elected scheduler and the overdue-reassessment job
+"""
+import sys
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.database import Base
+from app.core.scheduler import LockRowLeader, Scheduler
+from app.models import Aluno, Avaliacao, Lembrete
+from app.services.reminder_service import ReminderService
+
+
+def _session_factory(tmp_path, name):
+    engine = create_engine(f"sqlite:///{tmp_path / name}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def test_lock_row_elects_single_leader_until_lease_expires(tmp_path):
+    """A second owner only takes over after the first releases or its lease expires"""
+    Session = _session_factory(tmp_path, "lock.db")
+    first = LockRowLeader(Session, "jobs", ttl=60)
+    second = LockRowLeader(Session, "jobs", ttl=60)
+    second.owner = "other-host:1"
+
+    assert first.acquire() and first.acquire()
+    assert not second.acquire()
+    first.release()
+    assert second.acquire()
+    assert not first.acquire()
+
+
+def test_scheduler_runs_due_jobs_only_on_leader():
+    """Followers skip jobs; the leader runs each job once per interval"""
+    class FakeLeader:
+        is_leader = False
+
+        def acquire(self):
+            return self.is_leader
+
+    calls = []
+    leader = FakeLeader()
+    scheduler = Scheduler(leader, tick=1)
+    scheduler.every("job", 3600, lambda: calls.append(1) or len(calls), run_at_start=True)
+    scheduler.every("job", 3600, lambda: None)  # duplicate names are ignored
+
+    assert scheduler.run_pending() == 0
+    leader.is_leader = True
+    assert scheduler.run_pending() == 1
+    assert scheduler.run_pending() == 0
+    assert calls == [1]
+    assert scheduler.snapshot()["jobs"][0]["last_result"] == 1
+
+
+def test_overdue_reminders_are_enqueued_once(tmp_path):
+    """Only active students past the threshold get a reminder, and reruns do not duplicate it"""
+    Session = _session_factory(tmp_path, "lembretes.db")
+    agora = datetime.now()
+    with Session() as db:
+        atrasado = Aluno(nome="Ana", email="ana@x.com", senha_hash="x", ativo=True)
+        em_dia = Aluno(nome="Bia", email="bia@x.com", senha_hash="x", ativo=True)
+        inativo = Aluno(nome="Caio", email="caio@x.com", senha_hash="x", ativo=False)
+        db.add_all([atrasado, em_dia, inativo])
+        db.flush()
+        db.add_all([
+            Avaliacao(aluno_id=atrasado.id, data=agora - timedelta(days=90)),
+            Avaliacao(aluno_id=atrasado.id, data=agora - timedelta(days=45)),
+            Avaliacao(aluno_id=em_dia.id, data=agora - timedelta(days=60)),
+            Avaliacao(aluno_id=em_dia.id, data=agora - timedelta(days=5)),
+            Avaliacao(aluno_id=inativo.id, data=agora - timedelta(days=120)),
+        ])
+        db.commit()
+
+        assert ReminderService.enqueue_overdue_reassessments(db, dias=30) == 1
+        assert ReminderService.enqueue_overdue_reassessments(db, dias=30) == 0
+
+        lembrete = db.query(Lembrete).one()
+        assert lembrete.aluno_id == atrasado.id and lembrete.status == "pendente"
+        assert abs((lembrete.referencia - (agora - timedelta(days=45))).total_seconds()) < 1
+
+
+
+def test_leader_lock_engine_is_outside_the_request_pool():
+    """The advisory-lock connection comes from a NullPool engine, not the request pool"""
+    from sqlalchemy.pool import NullPool
+    from app.core.database import create_dedicated_engine, engine
+    from app.core.scheduler import AdvisoryLockLeader, create_scheduler
+
+    leader = create_scheduler(
+        create_dedicated_engine("monipersonal-scheduler"), None, True, tick=30, lock_ttl=60
+    ).leader
+    assert isinstance(leader, AdvisoryLockLeader)
+    assert isinstance(leader.engine.pool, NullPool) and leader.engine.pool is not engine.pool
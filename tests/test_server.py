@@ -0,0 +1,48 @@
+"""
+Tests for the gunicorn runner configuration and the process resource helpers
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.utils import system
+from app.core.server import gunicorn_options, post_fork
+
+
+def test_cpu_quota_reads_cgroup_v2_and_v1(tmp_path, monkeypatch):
+    """cpu.max (v2) wins; 'max' means unlimited; v1 uses quota/period"""
+    cpu_max = tmp_path / "cpu.max"
+    quota, period = tmp_path / "quota", tmp_path / "period"
+    monkeypatch.setattr(system, "_CGROUP_V2_CPU_MAX", str(cpu_max))
+    monkeypatch.setattr(system, "_CGROUP_V1_QUOTA", str(quota))
+    monkeypatch.setattr(system, "_CGROUP_V1_PERIOD", str(period))
+
+    cpu_max.write_text("150000 100000\n")
+    assert system.cpu_quota() == 1.5
+    cpu_max.write_text("max 100000\n")
+    assert system.cpu_quota() is None
+
+    cpu_max.unlink()
+    quota.write_text("-1")
+    period.write_text("100000")
+    assert system.cpu_quota() is None
+    quota.write_text("50000")
+    assert system.cpu_quota() == 0.5
+    assert system.available_cpus() == 1
+
+
+def test_memory_usage_reports_rss():
+    """RSS is always reported on Linux; the split fields come from smaps_rollup"""
+    usage = system.memory_usage()
+    assert set(usage) == {"rss_kb", "pss_kb", "shared_kb", "private_kb"}
+    assert usage["rss_kb"] and usage["rss_kb"] > 0
+
+
+def test_gunicorn_options_preload_uvicorn_workers():
+    """The runner preloads the app, recycles workers and wires the fork hook"""
+    options = gunicorn_options()
+    assert options["worker_class"] == "uvicorn.workers.UvicornWorker"
+    assert options["preload_app"] is True
+    assert options["workers"] >= 1 and options["max_requests"] > 0
+    assert options["post_fork"] is post_fork
@@ -0,0 +1,50 @@
+"""
+Tests for single-flight request coalescing
+"""
+import threading
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.utils.singleflight import SingleFlight, single_flight
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    """Threads calling with the same key wait for the leader's result"""
+    group = SingleFlight()
+    calls = []
+
+    @single_flight(group=group)
+    def compute(db, periodo):
+        calls.append(periodo)
+        time.sleep(0.1)
+        return {"periodo": periodo}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda i=i: results.append(compute(object(), 30)))
+        for i in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == [30]
+    assert results == [{"periodo": 30}] * 5
+    assert group.snapshot()["shared"] == 4
+
+
+def test_different_arguments_are_not_coalesced():
+    """Distinct argument values run independently"""
+    group = SingleFlight()
+
+    @single_flight(group=group)
+    def compute(db, periodo):
+        return periodo
+
+    assert compute(None, 7) == 7
+    assert compute(None, 30) == 30
+    assert group.executed == 2
@@ -0,0 +1,44 @@
+"""
+Tests for the cold-start timing report
+"""
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.startup import StartupTimer, process_start_time
+
+
+def test_process_start_precedes_now():
+    assert process_start_time() <= time.time()
+
+
+def test_first_byte_recorded_once_against_budget():
+    timer = StartupTimer(budget_ms=10 ** 9)
+    timer.mark("imports")
+    timer.record_first_byte("/ping")
+    first = timer.first_byte_ms
+    timer.record_first_byte("/login")
+
+    report = timer.report()
+    assert report["first_byte_ms"] == first and report["first_path"] == "/ping"
+    assert report["within_budget"] is True
+    assert report["marks_ms"]["python"] <= report["marks_ms"]["imports"] <= first
+
+
+def test_forked_worker_measures_from_the_fork():
+    """A worker forked long after the master's exec is timed from the fork, keeping the master's marks"""
+    timer = StartupTimer(budget_ms=5000)
+    timer.process_start -= 3600  # master em execução há uma hora
+    timer.mark("imports")
+    timer.record_first_byte("/ping")
+    assert timer.report()["within_budget"] is False
+
+    timer.restart_after_fork()
+    timer.record_first_byte("/health")
+    report = timer.report()
+    assert report["origin"] == "fork" and report["first_path"] == "/health"
+    assert report["within_budget"] is True
+    assert report["master_marks_ms"]["imports"] >= 3600 * 1000
+    assert list(report["marks_ms"]) == ["fork"]
@@ -0,0 +1,81 @@
+"""
+Tests for bulk student provisioning from CSV
+"""
+import sys
+import os
+import io
+
+from sqlalchemy import create_engine, func, select
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.config import PASSWORD_HASH
+from app.core.database import Base
+from app.models import Aluno, DailyActivity
+from app.services.auth_service import verify_password
+from app.services.student_import import StudentImporter, parse_students_csv
+
+CSV = """Nome;Email;Senha;Telefone;Data_Nascimento;Sexo
+Ana Souza;ANA@example.com;senha1;11999990000;1990-05-01;f
+Bruno Lima;bruno@example.com;;;15/08/1985;M
+Ana de Novo;ana@example.com;x;;;
+Sem Email;;;;;
+Carla Dias;carla@example.com;senha3;;;X
+Existente;existente@example.com;senha4;;;
+"""
+
+
+def _engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'import.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(Aluno.__table__.insert(), [
+            {"nome": "Existente", "email": "Existente@Example.com", "senha_hash": "x"}
+        ])
+    return engine
+
+
+def test_parse_validates_rows_and_reports_errors():
+    """Semicolon CSV is parsed; bad e-mail and sex values are reported by line"""
+    alunos, erros = parse_students_csv(io.StringIO(CSV))
+    assert [a["email"] for a in alunos] == [
+        "ana@example.com", "bruno@example.com", "ana@example.com", "existente@example.com"
+    ]
+    assert alunos[0]["sexo"] == "F" and alunos[1]["data_nascimento"].year == 1985
+    assert [(e["linha"], e["email"]) for e in erros] == [(5, ""), (6, "carla@example.com")]
+
+
+def test_dry_run_reports_without_writing(tmp_path):
+    """Dry-run dedupes against the file and the database but inserts nothing"""
+    engine = _engine(tmp_path)
+    alunos, _ = parse_students_csv(io.StringIO(CSV))
+    resultado = StudentImporter(engine, workers=1).run(alunos, dry_run=True)
+
+    assert resultado["a_inserir"] == 2 and resultado["inseridos"] == 0
+    assert [r["linha"] for r in resultado["repetidos_no_arquivo"]] == [4]
+    # Cadastrado pelo /registro com maiúsculas: mesmo e-mail, não entra de novo
+    assert [r["email"] for r in resultado["ja_cadastrados"]] == ["existente@example.com"]
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count(Aluno.id))).scalar() == 1
+
+
+def test_import_hashes_in_pool_and_inserts_batches(tmp_path, monkeypatch):
+    """New students are inserted in batches with bcrypt hashes from the process pool"""
+    monkeypatch.setitem(PASSWORD_HASH, "rounds", 4)
+    engine = _engine(tmp_path)
+    alunos, _ = parse_students_csv(io.StringIO(CSV))
+    resultado = StudentImporter(engine, batch_size=1, workers=2).run(alunos)
+
+    assert resultado["inseridos"] == 2
+    assert list(resultado["senhas_geradas"]) == ["bruno@example.com"]
+    with engine.connect() as conn:
+        rows = {r.email: r for r in conn.execute(select(Aluno)).all()}
+    assert verify_password("senha1", rows["ana@example.com"].senha_hash)
+    assert verify_password(resultado["senhas_geradas"]["bruno@example.com"], rows["bruno@example.com"].senha_hash)
+    assert rows["ana@example.com"].nome_normalizado == "ana souza"
+    # O INSERT via Core não dispara os listeners: o dia é reconciliado ao final
+    with engine.connect() as conn:
+        assert conn.execute(select(DailyActivity.novos_alunos)).scalar_one() == 3
+
+    # Reimportar o mesmo arquivo não duplica ninguém
+    assert StudentImporter(engine, workers=1).run(alunos)["inseridos"] == 0
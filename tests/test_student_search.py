@@ -0,0 +1,115 @@
+"""
+Tests for the normalised-name student lookup
+"""
+import sys
+import os
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.database import Base
+from app.models import Aluno
+from app.services.student_search import StudentSearchService
+from app.utils.text import normalize_name
+
+
+def _session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    for i, nome in enumerate(["José da Silva", "Josefa Andrade", "Maria José Souza", "Ana Luísa"]):
+        db.add(Aluno(nome=nome, email=f"aluno{i}@example.com", senha_hash="x"))
+    db.commit()
+    return db
+
+
+def test_normalize_name():
+    assert normalize_name("  JOSÉ   da  Silva ") == "jose da silva"
+    assert normalize_name("") == ""
+
+
+def test_column_maintained_on_insert_and_update(tmp_path):
+    db = _session(tmp_path)
+    aluno = db.query(Aluno).filter(Aluno.nome == "Ana Luísa").one()
+    assert aluno.nome_normalizado == "ana luisa"
+
+    aluno.nome = "Ana Lúcia"
+    db.commit()
+    assert aluno.nome_normalizado == "ana lucia"
+
+
+def test_resolve_prefers_id_then_exact_then_ranked_fuzzy(tmp_path):
+    db = _session(tmp_path)
+    ana = db.query(Aluno).filter(Aluno.nome == "Ana Luísa").one()
+
+    assert StudentSearchService.resolve(db, str(ana.id)).id == ana.id
+    assert StudentSearchService.resolve(db, "jose da silva").nome == "José da Silva"
+    # Prefixo do nome vence início de palavra ("Maria José") e substring
+    assert StudentSearchService.resolve(db, "JOSÉ").nome == "José da Silva"
+    assert StudentSearchService.resolve(db, "andrade").nome == "Josefa Andrade"
+    assert StudentSearchService.resolve(db, "100%") is None
+    assert StudentSearchService.resolve(db, "inexistente") is None
+
+
+def test_sqlite_fuzzy_uses_trigram_table_kept_in_sync_by_triggers(tmp_path):
+    """The FTS5 trigram table serves the fuzzy filter and follows ORM and Core writes"""
+    from sqlalchemy import insert, text
+    from app.services.student_search import SQLITE_TABLE, ensure_trigram_table
+
+    db = _session(tmp_path)
+    with db.get_bind().begin() as connection:
+        assert ensure_trigram_table(connection)
+        assert not ensure_trigram_table(connection)
+
+    sql = str(StudentSearchService.fuzzy_query("andrade", postgresql=False, sqlite_fts=True))
+    where = sql.split("WHERE", 1)[1].split("ORDER BY", 1)[0]
+    assert f"{SQLITE_TABLE} MATCH" in where and "LIKE" not in where
+
+    assert StudentSearchService.resolve(db, "andrade").nome == "Josefa Andrade"
+    assert StudentSearchService.resolve(db, "JOSÉ").nome == "José da Silva"
+    assert StudentSearchService.resolve(db, "100%") is None
+
+    db.execute(insert(Aluno.__table__).values(
+        nome="Carla Pereira", nome_normalizado="carla pereira", email="carla@example.com", senha_hash="x"
+    ))
+    ana = db.query(Aluno).filter(Aluno.nome == "Ana Luísa").one()
+    ana.nome = "Ana Beatriz"
+    db.commit()
+    assert StudentSearchService.resolve(db, "pereira").nome == "Carla Pereira"
+    assert StudentSearchService.resolve(db, "beatriz").nome == "Ana Beatriz"
+    assert StudentSearchService.resolve(db, "luisa") is None
+    # Menos de 3 caracteres não forma trigrama: volta ao LIKE
+    assert StudentSearchService.resolve(db, "ca").nome == "Carla Pereira"
+    assert db.execute(text(f"SELECT count(*) FROM {SQLITE_TABLE}")).scalar() == 5
+def test_postgresql_fuzzy_filter_uses_only_trigram_indexable_operators():
+    """similarity() only ranks; the WHERE clause is LIKE OR % so the GIN index applies"""
+    from sqlalchemy.dialects import postgresql
+
+    sql = str(StudentSearchService.fuzzy_query("jose", postgresql=True).compile(dialect=postgresql.dialect()))
+    where, order_by = sql.split("WHERE", 1)[1].split("ORDER BY", 1)
+    assert "similarity" not in where and "%%" in where
+    assert "similarity(alunos.nome_normalizado" in order_by
+
+
+def test_prefix_index_matches_any_word_and_email():
+    """Prefix search covers every word of the name and the e-mail, with incremental updates"""
+    from app.services.student_search import StudentPrefixIndex
+
+    index = StudentPrefixIndex(ttl=60, max_results=10)
+    index.load([(1, "José da Silva", "jose@example.com"), (2, "Maria José Souza", "mjs@example.com")])
+
+    assert [r["id"] for r in index.search("JOSÉ")] == [1, 2]
+    assert [r["id"] for r in index.search("silv")] == [1]
+    assert [r["id"] for r in index.search("mjs@")] == [2]
+    assert index.search("") == []
+
+    index.upsert(3, "Joana Prado", "joana@example.com", True)
+    assert [r["id"] for r in index.search("jo")] == [3, 1, 2]
+    assert len(index.search("jo", limit=1)) == 1
+
+    index.upsert(1, "José da Silva", "jose@example.com", False)  # desativado
+    assert [r["id"] for r in index.search("jose")] == [2]
+    index.remove(3)
+    assert index.search("joana") == []
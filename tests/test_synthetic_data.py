@@ -0,0 +1,77 @@
+"""
+Tests for the deterministic synthetic data generator
+"""
+import sys
+import os
+from datetime import datetime
+
+from sqlalchemy import create_engine, func, select
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.database import Base
+from app.models import Aluno, Avaliacao, DailyActivity, Usuario
+from app.services.auth_service import verify_password
+from app.services.synthetic_data import (
+    SENHA_PADRAO, SyntheticDataLoader, clear_synthetic_data, email_aluno, generate_student
+)
+
+
+def _engine(tmp_path, name):
+    engine = create_engine(f"sqlite:///{tmp_path / name}")
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def test_generation_is_deterministic_per_student():
+    """Same seed and index give the same student regardless of call order"""
+    agora = datetime(2025, 6, 1, 12, 0)
+    generate_student(7, 0, 10, agora)
+    assert generate_student(7, 3, 10, agora) == generate_student(7, 3, 10, agora)
+    assert generate_student(7, 3, 10, agora) != generate_student(8, 3, 10, agora)
+
+    aluno, avaliacoes = generate_student(7, 3, 10, agora)
+    datas = [a["data"] for a in avaliacoes]
+    assert datas == sorted(datas) and datas[-1] <= agora
+    assert aluno["email"] == email_aluno(3)
+
+
+def test_loader_inserts_batches_with_derived_columns(tmp_path):
+    """Batched load writes students, evaluations, admins, body composition and the rollup"""
+    engine = _engine(tmp_path, "synthetic.db")
+    loader = SyntheticDataLoader(engine, alunos=40, avaliacoes_por_aluno=6, admins=2, seed=1, batch_size=50)
+    resultado = loader.run()
+
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count(Aluno.id))).scalar() == 40 == resultado["alunos"]
+        assert conn.execute(select(func.count(Avaliacao.id))).scalar() == resultado["avaliacoes"]
+        assert conn.execute(select(func.sum(DailyActivity.avaliacoes))).scalar() == resultado["avaliacoes"]
+        assert conn.execute(
+            select(func.count(Avaliacao.id)).where(Avaliacao.protocolo_composicao == "JP7")
+        ).scalar() > 0
+        hashes = set(conn.execute(select(Aluno.senha_hash)).scalars())
+        assert len(hashes) == 1 and verify_password(SENHA_PADRAO, hashes.pop())
+        assert conn.execute(select(func.count(Usuario.id))).scalar() == 2
+
+    # Mesmo conjunto em outro banco, com lotes de outro tamanho
+    other = _engine(tmp_path, "other.db")
+    SyntheticDataLoader(other, alunos=40, avaliacoes_por_aluno=6, admins=2, seed=1, batch_size=7).run()
+    query = select(Avaliacao.aluno_id, Avaliacao.peso_kg, Avaliacao.dobra_coxa).order_by(Avaliacao.id)
+    with engine.connect() as a, other.connect() as b:
+        assert a.execute(query).all() == b.execute(query).all()
+
+    assert clear_synthetic_data(engine)["alunos"] == 40
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count(Avaliacao.id))).scalar() == 0
+
+
+def test_second_run_without_clearing_continues_the_set(tmp_path):
+    """Re-running skips students that already exist and only adds the missing indices"""
+    engine = _engine(tmp_path, "rerun.db")
+    SyntheticDataLoader(engine, alunos=10, avaliacoes_por_aluno=3, admins=1, seed=1).run()
+    resultado = SyntheticDataLoader(engine, alunos=15, avaliacoes_por_aluno=3, admins=1, seed=1).run()
+
+    assert (resultado["alunos"], resultado["ja_existentes"], resultado["admins"]) == (5, 10, 0)
+    with engine.connect() as conn:
+        emails = conn.execute(select(Aluno.email).order_by(Aluno.id)).scalars().all()
+    assert emails == [email_aluno(i) for i in range(15)]